@@ -4,11 +4,20 @@
 # Last modified: 2025-05-23 03:57:11 by dannyaudian
 
 import frappe
+import base64
 import json
 import re
 from frappe import _
 from frappe.utils import getdate, cint, flt, strip_html
 
+from payroll_indonesia.utilities.response_cache import (
+    cached_response,
+    employee_slips_version,
+    salary_slip_version,
+    tax_summary_version,
+)
+from payroll_indonesia.utilities.read_replica import replica_reads
+
 #
 # EMPLOYEE API ENDPOINTS
 #
@@ -77,6 +86,7 @@ def get_employee(name=None, filters=None):
 
 
 @frappe.whitelist(allow_guest=False)
+@cached_response(employee_slips_version)
 def get_salary_slips_by_employee(employee, year=None):
     """API to get all salary slips for a specific employee"""
     if not frappe.has_permission("Salary Slip", "read"):
@@ -94,30 +104,31 @@ def get_salary_slips_by_employee(employee, year=None):
             )
 
         # Get all salary slips for this employee
-        salary_slips = frappe.get_all(
-            "Salary Slip",
-            filters=filters,
-            fields=[
-                "name",
-                "employee",
-                "employee_name",
-                "start_date",
-                "end_date",
-                "gross_pay",
-                "net_pay",
-                "total_deduction",
-                "posting_date",
-                "company",
-                "month",
-                "is_using_ter",
-                "ter_rate",
-                "total_working_days",
-                "total_bpjs",
-                "npwp",
-                "ktp",
-            ],
-            order_by="posting_date DESC",
-        )
+        with replica_reads():
+            salary_slips = frappe.get_all(
+                "Salary Slip",
+                filters=filters,
+                fields=[
+                    "name",
+                    "employee",
+                    "employee_name",
+                    "start_date",
+                    "end_date",
+                    "gross_pay",
+                    "net_pay",
+                    "total_deduction",
+                    "posting_date",
+                    "company",
+                    "month",
+                    "is_using_ter",
+                    "ter_rate",
+                    "total_working_days",
+                    "total_bpjs",
+                    "npwp",
+                    "ktp",
+                ],
+                order_by="posting_date DESC",
+            )
 
         # Group salary slips by year and month
         results = {}
@@ -217,6 +228,7 @@ def get_salary_slips_by_employee(employee, year=None):
 
 
 @frappe.whitelist(allow_guest=False)
+@cached_response(salary_slip_version)
 def get_salary_slip(name):
     """API to get a specific salary slip with details"""
     if not frappe.has_permission("Salary Slip", "read"):
@@ -358,6 +370,20 @@ def get_recent_salary_slips(limit=10, company=None):
             limit_page_length=cint(limit),
         )
 
+        # Fetch department and designation for all employees at once
+        employee_details = (
+            {
+                e.name: e
+                for e in frappe.get_all(
+                    "Employee",
+                    filters={"name": ["in", list({slip["employee"] for slip in salary_slips})]},
+                    fields=["name", "department", "designation"],
+                )
+            }
+            if salary_slips
+            else {}
+        )
+
         # Enhance each slip with formatted data
         for slip in salary_slips:
             slip["formatted_gross_pay"] = frappe.format(
@@ -369,8 +395,9 @@ def get_recent_salary_slips(limit=10, company=None):
             )
 
             # Add department and designation
-            slip["department"] = frappe.db.get_value("Employee", slip["employee"], "department")
-            slip["designation"] = frappe.db.get_value("Employee", slip["employee"], "designation")
+            details = employee_details.get(slip["employee"]) or {}
+            slip["department"] = details.get("department")
+            slip["designation"] = details.get("designation")
 
         return {"status": "success", "count": len(salary_slips), "data": salary_slips}
     except Exception as e:
@@ -611,6 +638,7 @@ def refresh_tax_summary(employee=None, year=None, salary_slip=None, force=False)
 
 
 @frappe.whitelist(allow_guest=False)
+@cached_response(tax_summary_version)
 def get_tax_summary_status(employee, year=None):
     """
     Get the status of tax summaries for an employee
@@ -687,9 +715,10 @@ def get_tax_summary_status(employee, year=None):
             )
 
             # Process monthly data
+            monthly_by_month = {m.month: m for m in monthly_data}
             result["monthly_data"] = []
             for month in range(1, 13):
-                month_data = next((m for m in monthly_data if m.month == month), None)
+                month_data = monthly_by_month.get(month)
 
                 month_status = {
                     "month": month,
@@ -787,6 +816,158 @@ def get_tax_summary_status(employee, year=None):
         }
 
 
+@frappe.whitelist(allow_guest=False)
+def get_tax_summary_status_bulk(year=None, company=None, department=None, employees=None):
+    """
+    Get tax summary coverage for many employees as a month-by-employee matrix
+
+    Args:
+        year: Tax year (defaults to current year)
+        company: Company to include all active employees of (optional)
+        department: Department to include all active employees of (optional)
+        employees: List or JSON list of employee codes (optional)
+
+    Returns:
+        dict: Per-employee monthly cells with has_slip, has_data and mismatch
+    """
+    if not frappe.has_permission("Employee Tax Summary", "read"):
+        frappe.throw(_("Not permitted to view Tax Summary data"), frappe.PermissionError)
+
+    try:
+        year = cint(year) or getdate().year
+
+        if isinstance(employees, str):
+            try:
+                employees = json.loads(employees)
+            except ValueError:
+                employees = [employees]
+
+        # Resolve employees
+        employee_filters = {}
+        if employees:
+            employee_filters["name"] = ["in", employees]
+        else:
+            if not company and not department:
+                return {
+                    "status": "error",
+                    "message": _("Specify a company, department or list of employees"),
+                }
+            employee_filters["status"] = "Active"
+            if company:
+                employee_filters["company"] = company
+            if department:
+                employee_filters["department"] = department
+
+        employee_rows = frappe.get_all(
+            "Employee",
+            filters=employee_filters,
+            fields=["name", "employee_name", "department"],
+            order_by="name ASC",
+        )
+        if not employee_rows:
+            return {"status": "success", "year": year, "employee_count": 0, "data": []}
+
+        values = {
+            "employees": tuple(e.name for e in employee_rows),
+            "year": year,
+            "year_start": f"{year}-01-01",
+            "year_end": f"{year}-12-31",
+        }
+
+        # Submitted salary slips per employee and month
+        slip_rows = frappe.db.sql(
+            """
+            SELECT employee, MONTH(start_date) AS month, GROUP_CONCAT(name) AS slips
+            FROM `tabSalary Slip`
+            WHERE employee IN %(employees)s
+                AND docstatus = 1
+                AND start_date >= %(year_start)s
+                AND end_date <= %(year_end)s
+            GROUP BY employee, MONTH(start_date)
+            """,
+            values,
+            as_dict=True,
+        )
+        slips = {(r.employee, cint(r.month)): set((r.slips or "").split(",")) for r in slip_rows}
+
+        # Tax summary monthly rows per employee and month
+        summary_rows = frappe.db.sql(
+            """
+            SELECT ets.employee, ets.name AS tax_summary, etd.month,
+                etd.gross_pay, etd.tax_amount, etd.salary_slip
+            FROM `tabEmployee Tax Summary` ets
+            LEFT JOIN `tabEmployee Monthly Tax Detail` etd ON etd.parent = ets.name
+            WHERE ets.employee IN %(employees)s AND ets.year = %(year)s
+            """,
+            values,
+            as_dict=True,
+        )
+        summaries = {}
+        details = {}
+        for r in summary_rows:
+            summaries[r.employee] = r.tax_summary
+            if r.month and flt(r.gross_pay) > 0:
+                details[(r.employee, cint(r.month))] = r
+
+        data = []
+        totals = {"missing_data": 0, "orphan_data": 0, "mismatch": 0}
+        for emp in employee_rows:
+            cells = []
+            for month in range(1, 13):
+                month_slips = slips.get((emp.name, month))
+                detail = details.get((emp.name, month))
+                cell = {
+                    "month": month,
+                    "has_slip": bool(month_slips),
+                    "has_data": bool(detail),
+                    "mismatch": False,
+                }
+                if month_slips and not detail:
+                    totals["missing_data"] += 1
+                    cell["mismatch"] = True
+                elif detail and not month_slips:
+                    totals["orphan_data"] += 1
+                    cell["mismatch"] = True
+                elif detail and detail.salary_slip and detail.salary_slip not in month_slips:
+                    cell["mismatch"] = True
+
+                if detail:
+                    cell["tax_amount"] = detail.tax_amount
+                if cell["mismatch"]:
+                    totals["mismatch"] += 1
+                cells.append(cell)
+
+            data.append(
+                {
+                    "employee": emp.name,
+                    "employee_name": emp.employee_name,
+                    "department": emp.department,
+                    "tax_summary": summaries.get(emp.name),
+                    "needs_refresh": any(c["mismatch"] for c in cells),
+                    "months": cells,
+                }
+            )
+
+        return {
+            "status": "success",
+            "year": year,
+            "employee_count": len(data),
+            "totals": totals,
+            "data": data,
+        }
+
+    except Exception as e:
+        frappe.log_error(
+            f"Error getting bulk tax summary status for {year}: {str(e)}\n{frappe.get_traceback()}",
+            "Tax Summary API Error",
+        )
+
+        return {
+            "status": "error",
+            "message": _("Error retrieving tax summary status: {0}").format(str(e)),
+        }
+
+
 @frappe.whitelist(allow_guest=False)
 def bulk_refresh_tax_summaries(employees=None, year=None, company=None):
     """
@@ -859,3 +1040,221 @@ def bulk_refresh_tax_summaries(employees=None, year=None, company=None):
         )
 
         return {"status": "error", "message": _("Error starting bulk refresh: {0}").format(str(e))}
+
+
+#
+# SALARY SLIP API V2 (keyset pagination, field projection)
+#
+
+# Projectable fields and their SQL expressions. Employee fields are read
+# through a join instead of one lookup per slip.
+SALARY_SLIP_V2_FIELDS = {
+    "name": "`tabSalary Slip`.name",
+    "employee": "`tabSalary Slip`.employee",
+    "employee_name": "`tabSalary Slip`.employee_name",
+    "company": "`tabSalary Slip`.company",
+    "posting_date": "`tabSalary Slip`.posting_date",
+    "start_date": "`tabSalary Slip`.start_date",
+    "end_date": "`tabSalary Slip`.end_date",
+    "gross_pay": "`tabSalary Slip`.gross_pay",
+    "net_pay": "`tabSalary Slip`.net_pay",
+    "total_deduction": "`tabSalary Slip`.total_deduction",
+    "total_working_days": "`tabSalary Slip`.total_working_days",
+    "is_using_ter": "`tabSalary Slip`.is_using_ter",
+    "ter_rate": "`tabSalary Slip`.ter_rate",
+    "total_bpjs": "`tabSalary Slip`.total_bpjs",
+    "npwp": "`tabSalary Slip`.npwp",
+    "ktp": "`tabSalary Slip`.ktp",
+    "department": "emp.department",
+    "designation": "emp.designation",
+    "employment_type": "emp.employment_type",
+}
+
+SALARY_SLIP_V2_DEFAULT_FIELDS = (
+    "name",
+    "employee",
+    "employee_name",
+    "posting_date",
+    "start_date",
+    "end_date",
+    "gross_pay",
+    "net_pay",
+    "company",
+)
+
+# Currency fields that get a formatted_* companion when formatting is requested
+SALARY_SLIP_V2_CURRENCY_FIELDS = ("gross_pay", "net_pay", "total_deduction", "total_bpjs")
+
+SALARY_SLIP_V2_MAX_PAGE_SIZE = 100
+
+
+def _parse_v2_fields(fields):
+    """Validate the requested projection, accepting a list, JSON list or comma string"""
+    if not fields:
+        return list(SALARY_SLIP_V2_DEFAULT_FIELDS)
+
+    if isinstance(fields, str):
+        try:
+            fields = json.loads(fields)
+        except ValueError:
+            fields = fields.split(",")
+
+    requested = []
+    for field in fields:
+        field = str(field).strip()
+        if not field or field in requested:
+            continue
+        if field not in SALARY_SLIP_V2_FIELDS:
+            frappe.throw(_("Field {0} is not available").format(field), frappe.ValidationError)
+        requested.append(field)
+
+    return requested or list(SALARY_SLIP_V2_DEFAULT_FIELDS)
+
+
+def _encode_slip_cursor(posting_date, name):
+    """Encode the (posting_date, name) keyset position as an opaque cursor"""
+    payload = json.dumps([str(posting_date), name]).encode()
+    return base64.urlsafe_b64encode(payload).decode()
+
+
+def _decode_slip_cursor(cursor):
+    """Decode a cursor produced by _encode_slip_cursor"""
+    try:
+        posting_date, name = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return getdate(posting_date), name
+    except Exception:
+        frappe.throw(_("Invalid cursor"), frappe.ValidationError)
+
+
+def query_salary_slips_v2(filters, fields=None, limit=20, cursor=None, formatted=False, user=None):
+    """
+    Read one page of submitted salary slips the user may read, ordered by posting date
+
+    Args:
+        filters: Dict with optional employee, company and year
+        fields: Fields to return (see SALARY_SLIP_V2_FIELDS)
+        limit: Page size, capped at SALARY_SLIP_V2_MAX_PAGE_SIZE
+        cursor: Cursor from the previous page's next_cursor
+        formatted: Add formatted_* values for currency fields
+        user: User whose permissions restrict the slips (default: session user)
+
+    Returns:
+        dict: data, next_cursor and has_more
+    """
+    from frappe.desk.reportview import build_match_conditions
+
+    fields = _parse_v2_fields(fields)
+    limit = min(max(cint(limit) or 20, 1), SALARY_SLIP_V2_MAX_PAGE_SIZE)
+
+    conditions = ["`tabSalary Slip`.docstatus = 1"]
+    values = {"limit": limit + 1}
+
+    if filters.get("employee"):
+        conditions.append("`tabSalary Slip`.employee = %(employee)s")
+        values["employee"] = filters["employee"]
+    if filters.get("company"):
+        conditions.append("`tabSalary Slip`.company = %(company)s")
+        values["company"] = filters["company"]
+    if filters.get("year"):
+        year = cint(filters["year"])
+        conditions.append(
+            "`tabSalary Slip`.start_date >= %(year_start)s"
+            " AND `tabSalary Slip`.end_date <= %(year_end)s"
+        )
+        values.update({"year_start": f"{year}-01-01", "year_end": f"{year}-12-31"})
+
+    # User Permissions and permission query conditions, as frappe.get_list
+    # would apply them. They reference the unaliased `tabSalary Slip`.
+    match_conditions = build_match_conditions("Salary Slip", user=user)
+    if match_conditions:
+        conditions.append(f"({match_conditions})")
+
+    if cursor:
+        values["cursor_date"], values["cursor_name"] = _decode_slip_cursor(cursor)
+        conditions.append(
+            "(`tabSalary Slip`.posting_date < %(cursor_date)s"
+            " OR (`tabSalary Slip`.posting_date = %(cursor_date)s"
+            " AND `tabSalary Slip`.name < %(cursor_name)s))"
+        )
+
+    # Keyset columns are always selected so the next cursor can be built
+    select = [
+        "`tabSalary Slip`.name AS `_cursor_name`",
+        "`tabSalary Slip`.posting_date AS `_cursor_date`",
+    ]
+    select += [f"{SALARY_SLIP_V2_FIELDS[field]} AS `{field}`" for field in fields]
+
+    join = ""
+    if any(SALARY_SLIP_V2_FIELDS[field].startswith("emp.") for field in fields):
+        join = "LEFT JOIN `tabEmployee` emp ON emp.name = `tabSalary Slip`.employee"
+
+    rows = frappe.db.sql(
+        f"""
+        SELECT {", ".join(select)}
+        FROM `tabSalary Slip`
+        {join}
+        WHERE {" AND ".join(conditions)}
+        ORDER BY `tabSalary Slip`.posting_date DESC, `tabSalary Slip`.name DESC
+        LIMIT %(limit)s
+        """,
+        values,
+        as_dict=True,
+    )
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    next_cursor = (
+        _encode_slip_cursor(rows[-1]._cursor_date, rows[-1]._cursor_name) if has_more else None
+    )
+
+    currency_fields = (
+        [f for f in SALARY_SLIP_V2_CURRENCY_FIELDS if f in fields] if formatted else []
+    )
+    data = []
+    for row in rows:
+        slip = {field: row[field] for field in fields}
+        for field in currency_fields:
+            slip[f"formatted_{field}"] = frappe.format(row[field], {"fieldtype": "Currency"})
+        data.append(slip)
+
+    return {"data": data, "next_cursor": next_cursor, "has_more": has_more}
+
+
+@frappe.whitelist(allow_guest=False)
+def get_salary_slips_v2(
+    employee=None, company=None, year=None, fields=None, limit=20, cursor=None, formatted=0
+):
+    """
+    API to page through submitted salary slips with cursor pagination
+
+    Args:
+        employee: Employee code (optional)
+        company: Company (optional)
+        year: Tax year (optional)
+        fields: List, JSON list or comma separated field names (optional)
+        limit: Page size, max 100
+        cursor: next_cursor from the previous page (optional)
+        formatted: 1 to include formatted currency values
+
+    Returns:
+        dict: status, count, data, next_cursor and has_more
+    """
+    if not frappe.has_permission("Salary Slip", "read"):
+        frappe.throw(_("Not permitted to read Salary Slip data"), frappe.PermissionError)
+
+    try:
+        page = query_salary_slips_v2(
+            {"employee": employee, "company": company, "year": year},
+            fields=fields,
+            limit=limit,
+            cursor=cursor,
+            formatted=cint(formatted),
+        )
+        return dict(page, status="success", count=len(page["data"]))
+    except frappe.ValidationError:
+        raise
+    except Exception as e:
+        frappe.log_error(
+            f"Error getting salary slips (v2): {str(e)}\n{frappe.get_traceback()}", "API Error"
+        )
+        frappe.throw(_("Error retrieving salary slips: {0}").format(str(e)))
@@ -0,0 +1,373 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025, PT. Innovasi Terbaik Bangsa and contributors
+# For license information, please see license.txt
+
+"""
+Diff-based provisioning of the payroll chart of accounts.
+
+The accounts Payroll Indonesia needs are described once as a plan. For each
+company the existing account tree is loaded with a single query, parent
+accounts are resolved and missing accounts are computed in memory, and only
+the missing accounts are inserted, group accounts first, in one transaction
+per company. A company that already has every account costs one query.
+
+Parent resolution mirrors utils.find_parent_account: configured candidate
+group names first, then the first group account of the root type, then the
+standard ERPNext root account.
+"""
+
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+import frappe
+from frappe.utils import cint
+
+from payroll_indonesia.payroll_indonesia.utils import (
+    _get_parent_account_candidates,
+    debug_log,
+    get_default_config,
+    get_settings,
+)
+
+__all__ = [
+    "build_account_plan",
+    "load_account_tree",
+    "diff_company_accounts",
+    "provision_accounts",
+]
+
+# Standard ERPNext root accounts, the last resort parent
+ROOT_ACCOUNTS = {
+    "Asset": "Application of Funds (Assets)",
+    "Liability": "Source of Funds (Liabilities)",
+    "Expense": "Expenses",
+    "Income": "Income",
+    "Equity": "Equity",
+}
+
+BPJS_LIABILITY_ACCOUNTS = (
+    "BPJS Kesehatan Payable",
+    "BPJS JHT Payable",
+    "BPJS JP Payable",
+    "BPJS JKK Payable",
+    "BPJS JKM Payable",
+)
+
+BPJS_EXPENSE_ACCOUNTS = (
+    "BPJS Kesehatan Expense",
+    "BPJS JHT Expense",
+    "BPJS JP Expense",
+    "BPJS JKK Expense",
+    "BPJS JKM Expense",
+)
+
+
+def _get_bpjs_parent_names() -> Tuple[str, str]:
+    """Names of the BPJS liability and expense group accounts from settings."""
+    liability, expense = "BPJS Payable", "BPJS Expenses"
+    try:
+        gl_accounts = getattr(get_settings(), "gl_accounts", None) or {}
+        if isinstance(gl_accounts, str):
+            gl_accounts = json.loads(gl_accounts)
+        parents = gl_accounts.get("parent_accounts") or {}
+        liability = (parents.get("bpjs_payable") or {}).get("account_name") or liability
+        expense = (parents.get("bpjs_expenses") or {}).get("account_name") or expense
+    except (ValueError, AttributeError):
+        debug_log("Error parsing GL accounts data from settings", "Account Setup")
+
+    return liability, expense
+
+
+def build_account_plan(config: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+    """
+    Describe every account to provision, group accounts first
+
+    Each entry has account_name, account_type, root_type, is_group and
+    parent, where parent is either ("group", <account_name of a planned
+    group>) or ("root", <root_type>) for a parent resolved from the tree.
+
+    Args:
+        config: Configuration dictionary, defaults to get_default_config()
+
+    Returns:
+        list: Planned accounts in dependency order
+    """
+    if config is None:
+        config = get_default_config()
+
+    liability_parent, expense_parent = _get_bpjs_parent_names()
+    plan = [
+        {
+            "account_name": liability_parent,
+            "account_type": None,
+            "root_type": "Liability",
+            "is_group": 1,
+            "parent": ("root", "Liability"),
+        },
+        {
+            "account_name": expense_parent,
+            "account_type": None,
+            "root_type": "Expense",
+            "is_group": 1,
+            "parent": ("root", "Expense"),
+        },
+    ]
+
+    for account_name in BPJS_LIABILITY_ACCOUNTS:
+        plan.append(
+            {
+                "account_name": account_name,
+                "account_type": "Payable",
+                "root_type": "Liability",
+                "is_group": 0,
+                "parent": ("group", liability_parent),
+            }
+        )
+
+    for account_name in BPJS_EXPENSE_ACCOUNTS:
+        plan.append(
+            {
+                "account_name": account_name,
+                "account_type": "Expense Account",
+                "root_type": "Expense",
+                "is_group": 0,
+                "parent": ("group", expense_parent),
+            }
+        )
+
+    gl_accounts = config.get("gl_accounts", {})
+    for category, default_type, default_root in (
+        ("expense_accounts", "Expense Account", "Expense"),
+        ("payable_accounts", "Payable", "Liability"),
+    ):
+        for account_data in (gl_accounts.get(category) or {}).values():
+            account_name = account_data.get("account_name")
+            if not account_name:
+                continue
+
+            account_type = account_data.get("account_type", default_type)
+            root_type = account_data.get("root_type", default_root)
+            plan.append(
+                {
+                    "account_name": account_name,
+                    "account_type": (
+                        "Expense Account" if account_type == "Expense" else account_type
+                    ),
+                    "root_type": root_type,
+                    "is_group": 0,
+                    "parent": ("root", root_type),
+                }
+            )
+
+    return plan
+
+
+def load_account_tree(company: str) -> List[Dict[str, Any]]:
+    """
+    Load the account tree of a company with a single query
+
+    Args:
+        company: Company name
+
+    Returns:
+        list: Account rows ordered by lft
+    """
+    return frappe.db.sql(
+        """
+        SELECT name, account_name, parent_account, is_group, root_type, account_type
+        FROM `tabAccount`
+        WHERE company = %s
+        ORDER BY lft
+        """,
+        company,
+        as_dict=1,
+    )
+
+
+def _resolve_parent(accounts: List[Dict[str, Any]], root_type: str, abbr: str) -> Optional[str]:
+    """In-memory equivalent of utils.find_parent_account for one root type."""
+    by_name = {acc.name: acc for acc in accounts}
+    groups_by_account_name = {}
+    for acc in accounts:
+        if cint(acc.is_group):
+            groups_by_account_name.setdefault(acc.account_name, acc.name)
+
+    for candidate in _get_parent_account_candidates(root_type):
+        if candidate in groups_by_account_name:
+            return groups_by_account_name[candidate]
+        if f"{candidate} - {abbr}" in by_name:
+            return f"{candidate} - {abbr}"
+
+    for acc in accounts:
+        if cint(acc.is_group) and acc.root_type == root_type:
+            return acc.name
+
+    root_account = ROOT_ACCOUNTS.get(root_type)
+    if root_account and f"{root_account} - {abbr}" in by_name:
+        return f"{root_account} - {abbr}"
+
+    return None
+
+
+def diff_company_accounts(
+    company: str, abbr: str, accounts: List[Dict[str, Any]], plan: List[Dict[str, Any]]
+) -> Dict[str, Any]:
+    """
+    Compare the plan against a company's account tree
+
+    Args:
+        company: Company name
+        abbr: Company abbreviation
+        accounts: Account rows from load_account_tree
+        plan: Planned accounts from build_account_plan
+
+    Returns:
+        dict: missing (accounts to insert with resolved parent), existing
+            (full names already present), to_group (existing accounts that
+            must become groups) and errors
+    """
+    by_name = {acc.name: acc for acc in accounts}
+    root_parents = {}
+    diff = {"missing": [], "existing": [], "to_group": [], "errors": []}
+
+    for spec in plan:
+        full_name = f"{spec['account_name']} - {abbr}"
+        existing = by_name.get(full_name)
+        if existing:
+            diff["existing"].append(full_name)
+            if spec["is_group"] and not cint(existing.is_group):
+                diff["to_group"].append(full_name)
+            continue
+
+        kind, ref = spec["parent"]
+        if kind == "group":
+            parent = f"{ref} - {abbr}"
+        else:
+            if ref not in root_parents:
+                root_parents[ref] = _resolve_parent(accounts, ref, abbr)
+            parent = root_parents[ref]
+
+        if not parent:
+            diff["errors"].append(
+                f"Could not find suitable parent account for {spec['account_name']} in {company}"
+            )
+            continue
+
+        diff["missing"].append(dict(spec, name=full_name, parent_account=parent))
+
+    return diff
+
+
+def _insert_account(company: str, currency: Optional[str], spec: Dict[str, Any]) -> None:
+    """Insert one planned account."""
+    account_fields = {
+        "doctype": "Account",
+        "account_name": spec["account_name"],
+        "company": company,
+        "parent_account": spec["parent_account"],
+        "is_group": cint(spec["is_group"]),
+        "root_type": spec["root_type"],
+        "account_currency": currency,
+    }
+    if not spec["is_group"] and spec["account_type"]:
+        account_fields["account_type"] = spec["account_type"]
+
+    doc = frappe.get_doc(account_fields)
+    doc.flags.ignore_permissions = True
+    doc.flags.ignore_mandatory = True
+    doc.insert(ignore_permissions=True)
+
+
+def _convert_to_group(account: str) -> None:
+    """Turn an existing ledger account into a group account."""
+    doc = frappe.get_doc("Account", account)
+    doc.is_group = 1
+    doc.account_type = None
+    doc.flags.ignore_permissions = True
+    doc.save()
+
+
+def provision_accounts(
+    config: Optional[Dict[str, Any]] = None, specific_company: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Create missing payroll accounts for all companies or one company
+
+    Args:
+        config: Configuration dictionary, defaults to get_default_config()
+        specific_company: Only provision this company (optional)
+
+    Returns:
+        dict: success flag and created, skipped and errors lists
+    """
+    results = {"success": True, "created": [], "skipped": [], "errors": []}
+
+    filters = {"name": specific_company} if specific_company else {}
+    companies = frappe.get_all(
+        "Company", filters=filters, fields=["name", "abbr", "default_currency"]
+    )
+    if not companies:
+        debug_log("No companies found for account setup", "Account Setup")
+        results["success"] = False
+        results["errors"].append("No companies found")
+        return results
+
+    plan = build_account_plan(config)
+
+    for company in companies:
+        if not company.abbr:
+            results["errors"].append(f"Company {company.name} does not have an abbreviation")
+            continue
+
+        try:
+            diff = diff_company_accounts(
+                company.name, company.abbr, load_account_tree(company.name), plan
+            )
+        except Exception as e:
+            results["success"] = False
+            results["errors"].append(f"Error reading accounts for {company.name}: {str(e)}")
+            debug_log(f"Error reading accounts for {company.name}: {str(e)}", "Account Setup")
+            continue
+
+        results["skipped"].extend(diff["existing"])
+        results["errors"].extend(diff["errors"])
+        if not (diff["missing"] or diff["to_group"]):
+            continue
+
+        debug_log(
+            f"Provisioning {len(diff['missing'])} accounts for {company.name}", "Account Setup"
+        )
+
+        failed = set()
+        for account in diff["to_group"]:
+            try:
+                _convert_to_group(account)
+                debug_log(f"Updated {account} to be a group account", "Account Fix")
+            except Exception as e:
+                results["errors"].append(f"Could not convert {account} to group account: {e}")
+
+        for spec in diff["missing"]:
+            if spec["parent_account"] in failed:
+                failed.add(spec["name"])
+                results["errors"].append(
+                    f"Skipped {spec['name']}: parent {spec['parent_account']} was not created"
+                )
+                continue
+
+            try:
+                _insert_account(company.name, company.default_currency, spec)
+                results["created"].append(spec["name"])
+            except Exception as e:
+                failed.add(spec["name"])
+                results["errors"].append(f"Error creating {spec['name']}: {str(e)}")
+                debug_log(f"Error creating {spec['name']}: {str(e)}", "Account Setup", trace=True)
+
+        # One commit per company instead of one per account
+        frappe.db.commit()
+
+    debug_log(
+        f"Account setup completed with: {len(results['created'])} created, "
+        f"{len(results['skipped'])} skipped, {len(results['errors'])} errors",
+        "Account Setup",
+    )
+    return results
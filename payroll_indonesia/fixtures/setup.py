@@ -427,7 +427,9 @@ def setup_accounts(config=None, specific_company=None):
     """
     Set up GL accounts required for Indonesian payroll from configuration
     
-    This is the single source of truth for account creation during installation
+    This is the single source of truth for account creation during installation.
+    Each company's account tree is read once and only missing accounts are
+    inserted, see fixtures.account_provisioning.
     
     Args:
         config: Configuration dictionary with account settings
@@ -437,7 +439,7 @@ def setup_accounts(config=None, specific_company=None):
     Returns:
         dict: Setup results
     """
-    from payroll_indonesia.payroll_indonesia.utils import debug_log, create_account, get_default_config, find_parent_account
+    from payroll_indonesia.fixtures.account_provisioning import provision_accounts
     
     # Get config if not provided
     if config is None:
@@ -445,285 +447,8 @@ def setup_accounts(config=None, specific_company=None):
     
     debug_log("Starting account setup from fixtures/setup.py", "Account Setup")
     
-    results = {
-        "success": True,
-        "created": [],
-        "skipped": [],
-        "errors": []
-    }
-    
-    # Get companies to process
-    if specific_company:
-        # Get specific company
-        companies = frappe.get_all(
-            "Company", 
-            filters={"name": specific_company},
-            fields=["name", "abbr"]
-        )
-        debug_log(f"Setting up accounts for specific company: {specific_company}", "Account Setup")
-    else:
-        # Get all active companies
-        companies = frappe.get_all("Company", fields=["name", "abbr"])
-        debug_log(f"Setting up accounts for all companies: {len(companies)} found", "Account Setup")
-    
-    if not companies:
-        debug_log("No companies found for account setup", "Account Setup")
-        results["success"] = False
-        results["errors"].append("No companies found")
-        return results
-    
-    # Setup accounts for each company
-    for company in companies:
-        try:
-            debug_log(f"Setting up accounts for company: {company.name}", "Account Setup")
-            
-            # Create BPJS liability accounts
-            liability_parent = _create_bpjs_liability_parent(company.name)
-            if not liability_parent:
-                debug_log(f"Failed to create liability parent account for {company.name}", "Account Setup")
-                results["errors"].append(f"Failed to create liability parent for {company.name}")
-                continue
-                
-            # Create expense accounts
-            expense_parent = _create_bpjs_expense_parent(company.name)
-            if not expense_parent:
-                debug_log(f"Failed to create expense parent account for {company.name}", "Account Setup")
-                results["errors"].append(f"Failed to create expense parent for {company.name}")
-                continue
-            
-            # Create BPJS liability accounts
-            _create_bpjs_liability_accounts(company.name, liability_parent, results)
-            
-            # Create BPJS expense accounts
-            _create_bpjs_expense_accounts(company.name, expense_parent, results)
-            
-            # Create payroll expense accounts from defaults.json
-            _create_expense_accounts_from_config(company.name, config, results)
-            
-            # Create payroll payable accounts from defaults.json
-            _create_payable_accounts_from_config(company.name, config, results)
-            
-            debug_log(f"Completed account setup for company: {company.name}", "Account Setup")
-            
-        except Exception as e:
-            results["success"] = False
-            results["errors"].append(f"Error setting up accounts for {company.name}: {str(e)}")
-            debug_log(f"Error setting up accounts for {company.name}: {str(e)}", "Account Setup", trace=True)
-            
-    debug_log(f"Account setup completed with: {len(results['created'])} created, {len(results['skipped'])} skipped, {len(results['errors'])} errors", "Account Setup")
-    return results
-
+    return provision_accounts(config, specific_company=specific_company)
 
-def _create_expense_accounts_from_config(company, config, results):
-    """
-    Create expense accounts from configuration
-    
-    Args:
-        company: Company name
-        config: Configuration dictionary
-        results: Results dictionary to update
-    """
-    from payroll_indonesia.payroll_indonesia.utils import create_account, debug_log, find_parent_account
-    
-    # Get expense accounts from config
-    expense_accounts = config.get("gl_accounts", {}).get("expense_accounts", {})
-    if not expense_accounts:
-        debug_log("No expense accounts found in configuration", "Account Setup")
-        return
-    
-    # Find expense parent account
-    parent = find_parent_account(company, "Expense Account", "Expense")
-    if not parent:
-        debug_log(f"Could not find suitable expense parent account for {company}", "Account Setup")
-        results["errors"].append(f"Failed to find expense parent account for {company}")
-        return
-    
-    # Create each expense account
-    for key, account_data in expense_accounts.items():
-        try:
-            account_name = account_data.get("account_name", "")
-            account_type = account_data.get("account_type", "Expense Account")
-            root_type = account_data.get("root_type", "Expense")
-            
-            if not account_name:
-                continue
-                
-            debug_log(f"Creating expense account {account_name} for {company}", "Account Setup")
-            
-            account = create_account(
-                company=company,
-                account_name=account_name,
-                account_type=account_type,
-                parent=parent,
-                root_type=root_type,
-                is_group=0
-            )
-            
-            if account:
-                results["created"].append(account)
-                debug_log(f"Created expense account: {account}", "Account Setup")
-            else:
-                results["skipped"].append(account_name)
-                debug_log(f"Account {account_name} already exists or creation failed", "Account Setup")
-        except Exception as e:
-            results["errors"].append(f"Error creating {account_name}: {str(e)}")
-            debug_log(f"Error creating {account_name}: {str(e)}", "Account Setup", trace=True)
-
-
-def _create_payable_accounts_from_config(company, config, results):
-    """
-    Create payable accounts from configuration
-    
-    Args:
-        company: Company name
-        config: Configuration dictionary
-        results: Results dictionary to update
-    """
-    from payroll_indonesia.payroll_indonesia.utils import create_account, debug_log, find_parent_account
-    
-    # Get payable accounts from config
-    payable_accounts = config.get("gl_accounts", {}).get("payable_accounts", {})
-    if not payable_accounts:
-        debug_log("No payable accounts found in configuration", "Account Setup")
-        return
-    
-    # Find liability parent account
-    parent = find_parent_account(company, "Tax", "Liability")
-    if not parent:
-        # Try with Payable type if Tax type doesn't find anything
-        parent = find_parent_account(company, "Payable", "Liability")
-        
-    if not parent:
-        debug_log(f"Could not find suitable liability parent account for {company}", "Account Setup")
-        results["errors"].append(f"Failed to find liability parent account for {company}")
-        return
-    
-    # Create each payable account
-    for key, account_data in payable_accounts.items():
-        try:
-            account_name = account_data.get("account_name", "")
-            account_type = account_data.get("account_type", "Payable")
-            root_type = account_data.get("root_type", "Liability")
-            
-            if not account_name:
-                continue
-                
-            debug_log(f"Creating payable account {account_name} for {company}", "Account Setup")
-            
-            account = create_account(
-                company=company,
-                account_name=account_name,
-                account_type=account_type,
-                parent=parent,
-                root_type=root_type,
-                is_group=0
-            )
-            
-            if account:
-                results["created"].append(account)
-                debug_log(f"Created payable account: {account}", "Account Setup")
-            else:
-                results["skipped"].append(account_name)
-                debug_log(f"Account {account_name} already exists or creation failed", "Account Setup")
-        except Exception as e:
-            results["errors"].append(f"Error creating {account_name}: {str(e)}")
-            debug_log(f"Error creating {account_name}: {str(e)}", "Account Setup", trace=True)
-
-def _create_bpjs_liability_parent(company):
-    """Create or get BPJS liability parent account"""
-    from payroll_indonesia.payroll_indonesia.utils import create_parent_liability_account, debug_log
-    
-    debug_log(f"Creating BPJS liability parent account for company: {company}", "Account Setup")
-    parent = create_parent_liability_account(company)
-    if parent:
-        debug_log(f"BPJS liability parent account: {parent}", "Account Setup")
-    else:
-        debug_log(f"Failed to create BPJS liability parent account for company: {company}", "Account Setup")
-    
-    return parent
-
-def _create_bpjs_expense_parent(company):
-    """Create or get BPJS expense parent account"""
-    from payroll_indonesia.payroll_indonesia.utils import create_parent_expense_account, debug_log
-    
-    debug_log(f"Creating BPJS expense parent account for company: {company}", "Account Setup")
-    parent = create_parent_expense_account(company)
-    if parent:
-        debug_log(f"BPJS expense parent account: {parent}", "Account Setup")
-    else:
-        debug_log(f"Failed to create BPJS expense parent account for company: {company}", "Account Setup")
-    
-    return parent
-
-
-def _create_bpjs_liability_accounts(company, parent, results):
-    """Create BPJS liability accounts"""
-    from payroll_indonesia.payroll_indonesia.utils import create_account, debug_log
-    
-    # Accounts to create
-    accounts = [
-        ("BPJS Kesehatan Payable", "Payable"),
-        ("BPJS JHT Payable", "Payable"),
-        ("BPJS JP Payable", "Payable"),
-        ("BPJS JKK Payable", "Payable"),
-        ("BPJS JKM Payable", "Payable"),
-    ]
-    
-    for account_name, account_type in accounts:
-        try:
-            debug_log(f"Creating {account_name} for {company}", "Account Setup")
-            account = create_account(
-                company=company,
-                account_name=account_name,
-                account_type=account_type,
-                parent=parent,
-                root_type="Liability"
-            )
-            
-            if account:
-                results["created"].append(account)
-                debug_log(f"Created account: {account}", "Account Setup")
-            else:
-                results["skipped"].append(account_name)
-                debug_log(f"Account {account_name} already exists or creation failed", "Account Setup")
-        except Exception as e:
-            results["errors"].append(f"Error creating {account_name}: {str(e)}")
-            debug_log(f"Error creating {account_name}: {str(e)}", "Account Setup", trace=True)
-
-
-def _create_bpjs_expense_accounts(company, parent, results):
-    """Create BPJS expense accounts"""
-    from payroll_indonesia.payroll_indonesia.utils import create_account, debug_log
-    
-    # Accounts to create
-    accounts = [
-        ("BPJS Kesehatan Expense", "Expense Account"),
-        ("BPJS JHT Expense", "Expense Account"),
-        ("BPJS JP Expense", "Expense Account"),
-        ("BPJS JKK Expense", "Expense Account"),
-        ("BPJS JKM Expense", "Expense Account"),
-    ]
-    
-    for account_name, account_type in accounts:
-        try:
-            debug_log(f"Creating {account_name} for {company}", "Account Setup")
-            account = create_account(
-                company=company,
-                account_name=account_name,
-                account_type=account_type,
-                parent=parent,
-                root_type="Expense"
-            )
-            
-            if account:
-                results["created"].append(account)
-                debug_log(f"Created account: {account}", "Account Setup")
-            else:
-                results["skipped"].append(account_name)
-                debug_log(f"Account {account_name} already exists or creation failed", "Account Setup")
-        except Exception as e:
-            results["errors"].append(f"Error creating {account_name}: {str(e)}")
-            debug_log(f"Error creating {account_name}: {str(e)}", "Account Setup", trace=True)
 
 def create_supplier_group():
     """
@@ -18,10 +18,9 @@ required_apps = ["erpnext", "hrms"]
 before_install = "payroll_indonesia.install.before_install"
 after_install = "payroll_indonesia.install.after_install"
 # before_migrate = "payroll_indonesia.install.create_required_doctypes"
+# Account setup runs from install.after_migrate, gated by the migrate manifest
 after_migrate = [
     "payroll_indonesia.install.after_migrate",
-    # Panggil fungsi yang tidak memerlukan parameter
-    "payroll_indonesia.fixtures.setup.setup_all_accounts" 
 ]
 # List view JS
 doctype_list_js = {
@@ -34,16 +33,30 @@ doctype_list_js = {
 doc_events = {
     "Employee": {
         "validate": "payroll_indonesia.override.employee.validate",
-        "on_update": "payroll_indonesia.override.employee.on_update",
+        "on_update": [
+            "payroll_indonesia.override.employee.on_update",
+            "payroll_indonesia.override.auth_hooks.on_employee_change",
+        ],
+        "on_trash": "payroll_indonesia.override.auth_hooks.on_employee_change",
     },
     "Payroll Entry": {
-        "before_validate": "payroll_indonesia.override.payroll_entry_functions.before_validate"
+        "before_validate": "payroll_indonesia.override.payroll_entry_functions.before_validate",
+        "before_submit": "payroll_indonesia.override.payroll_entry_functions.before_submit",
     },
     "Salary Slip": {
         "validate": "payroll_indonesia.override.salary_slip_functions.validate_salary_slip",
         "on_submit": "payroll_indonesia.override.salary_slip_functions.on_submit_salary_slip",
-        "on_cancel": "payroll_indonesia.override.salary_slip_functions.on_cancel_salary_slip",
-        "after_insert": "payroll_indonesia.override.salary_slip_functions.after_insert_salary_slip",
+        "on_cancel": [
+            "payroll_indonesia.override.salary_slip_functions.on_cancel_salary_slip",
+            "payroll_indonesia.utilities.response_cache.invalidate_for_doc",
+        ],
+        "after_insert": [
+            "payroll_indonesia.override.salary_slip_functions.after_insert_salary_slip",
+            "payroll_indonesia.utilities.response_cache.invalidate_for_doc",
+        ],
+    },
+    "Employee Tax Summary": {
+        "on_update": "payroll_indonesia.utilities.response_cache.invalidate_for_doc"
     },
     "PPh 21 Settings": {
         "on_update": "payroll_indonesia.payroll_indonesia.tax.pph21_settings.on_update"
@@ -71,8 +84,10 @@ doc_events = {
     # },
     "Account": {"on_update": "payroll_indonesia.payroll_indonesia.account_hooks.account_on_update"},
     "Company": {
-        "after_insert": "payroll_indonesia.fixtures.setup.setup_company_accounts"
-    }
+        "after_insert": "payroll_indonesia.fixtures.setup.setup_company_accounts",
+        "on_update": "payroll_indonesia.override.auth_hooks.on_company_change",
+        "on_trash": "payroll_indonesia.override.auth_hooks.on_company_change",
+    },
 }
 
 # Fixtures - dengan filter sesuai dengan kebutuhan
@@ -145,9 +160,11 @@ scheduler_events = {
         "payroll_indonesia.utilities.cache_utils.clear_all_caches",
         "payroll_indonesia.utilities.cache_utils.clear_salary_slip_caches",
     ],
+    "hourly": ["payroll_indonesia.utilities.cache_metrics.log_cache_metrics"],
     "cron": {
         "0 */4 * * *": ["payroll_indonesia.utilities.cache_utils.clear_all_caches"],
         "30 1 * * *": ["payroll_indonesia.utilities.cache_utils.clear_salary_slip_caches"],
+        "*/10 * * * *": ["payroll_indonesia.utilities.tax_summary_queue.drain_tax_summary_queue"],
     },
     "monthly": ["payroll_indonesia.payroll_indonesia.tax.monthly_tasks.update_tax_summaries"],
     "yearly": ["payroll_indonesia.payroll_indonesia.tax.yearly_tasks.prepare_tax_report"],
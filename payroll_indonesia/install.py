@@ -84,8 +84,42 @@ def after_update():
 
 
 def after_migrate():
-    """Run after app migrations"""
-    migrate_from_json_to_doctype()
+    """
+    Run after app migrations
+
+    Each step is skipped when the defaults.json, fixture, settings and company
+    inputs it depends on, the app version and the step's code are unchanged
+    since it last succeeded.
+    """
+    from payroll_indonesia.fixtures.setup import setup_all_accounts
+    from payroll_indonesia.utilities.migrate_manifest import run_step
+
+    run_step(
+        "settings",
+        migrate_from_json_to_doctype,
+        groups=("defaults", "fixtures", "settings"),
+        modules=("payroll_indonesia.payroll_indonesia.utils",),
+    )
+    run_step(
+        "accounts",
+        setup_all_accounts,
+        groups=("defaults", "settings", "companies"),
+        modules=(
+            "payroll_indonesia.fixtures.account_provisioning",
+            "payroll_indonesia.config.gl_account_mapper",
+        ),
+        succeeded=lambda result: bool(result) and not result.get("errors"),
+    )
+
+    # Cheap to check, so run on every migrate in case a table was rebuilt
+    try:
+        from payroll_indonesia.utilities.db_indexes import ensure_payroll_indexes
+
+        result = ensure_payroll_indexes()
+        if result["created"]:
+            frappe.logger().info(f"[PI-Install] Created indexes: {', '.join(result['created'])}")
+    except Exception as e:
+        frappe.logger().error(f"[PI-Install] Error ensuring payroll indexes: {str(e)}")
 
 
 def setup_payroll_components():
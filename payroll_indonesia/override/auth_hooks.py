@@ -5,6 +5,81 @@
 
 import frappe
 
+from payroll_indonesia.constants import CACHE_LONG
+
+# Redis hash of user -> (employee, company, country), shared by all workers
+USER_REGION_CACHE_KEY = "payroll_indonesia:user_region"
+
+# Cached marker for users without an employee record, avoids repeat lookups
+NO_EMPLOYEE = ("", "", "")
+
+
+def get_user_region(user):
+    """
+    Resolve the employee, company and company country of a user
+
+    Loaded with a single join on first use and kept in Redis until the
+    employee or company changes.
+
+    Args:
+        user: User ID
+
+    Returns:
+        tuple: (employee, company, country), empty strings when not linked
+    """
+    cache = frappe.cache()
+    region = cache.hget(USER_REGION_CACHE_KEY, user)
+    if region is not None:
+        return tuple(region)
+
+    rows = frappe.db.sql(
+        """
+        SELECT emp.name, emp.company, IFNULL(comp.country, '')
+        FROM `tabEmployee` emp
+        LEFT JOIN `tabCompany` comp ON comp.name = emp.company
+        WHERE emp.user_id = %s
+        ORDER BY emp.status = 'Active' DESC, emp.modified DESC
+        LIMIT 1
+        """,
+        user,
+    )
+    region = tuple(value or "" for value in rows[0]) if rows else NO_EMPLOYEE
+
+    cache.hset(USER_REGION_CACHE_KEY, user, region)
+    cache.expire(cache.make_key(USER_REGION_CACHE_KEY), CACHE_LONG)
+    return region
+
+
+def clear_user_region_cache(users=None):
+    """
+    Drop cached user regions
+
+    Args:
+        users: User IDs to drop, or None to clear all entries
+    """
+    cache = frappe.cache()
+    if users is None:
+        cache.delete_value(USER_REGION_CACHE_KEY)
+        return
+
+    for user in users:
+        if user:
+            cache.hdel(USER_REGION_CACHE_KEY, user)
+
+
+def on_employee_change(doc, method=None):
+    """Invalidate cached regions for the current and previous user of an employee"""
+    users = {doc.get("user_id")}
+    previous = doc.get_doc_before_save() if hasattr(doc, "get_doc_before_save") else None
+    if previous:
+        users.add(previous.get("user_id"))
+    clear_user_region_cache(users)
+
+
+def on_company_change(doc, method=None):
+    """Invalidate all cached regions when a company (and its country) changes"""
+    clear_user_region_cache()
+
 
 def on_session_creation(login_manager):
     """Hook that runs when a new session is created"""
@@ -15,31 +90,16 @@ def on_session_creation(login_manager):
         return
 
     try:
-        # Get the employee linked to this user
-        employee = frappe.db.get_value("Employee", {"user_id": user}, "name")
-        if not employee:
-            return
-
-        # Get company of this employee
-        company = frappe.db.get_value("Employee", employee, "company")
-        if not company:
+        employee, company, country = get_user_region(user)
+        if not employee or not company:
             return
 
-        # Get company country
-        country = frappe.db.get_value("Company", company, "country")
-
         # If company is in Indonesia, set regional settings
         if country == "Indonesia":
             # Add this information to the session
             if hasattr(frappe.local, "session"):
                 frappe.local.session.data.payroll_region = "Indonesia"
 
-            # Log access in a safe way
-            frappe.log_error(
-                "User {0} (Employee: {1}) logged in - Region Indonesia".format(user, employee),
-                "Region-specific Login",
-            )
-
     except Exception as e:
         # This is non-critical - log error but allow login to continue
         frappe.log_error(
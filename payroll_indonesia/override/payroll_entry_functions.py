@@ -5,6 +5,18 @@
 
 import frappe
 from frappe import _
+from frappe.utils import cint, getdate
+
+from payroll_indonesia.constants import DECEMBER_MONTH
+from payroll_indonesia.override.salary_slip.input_fingerprint import (
+    get_settings_version,
+    is_calculation_current,
+)
+from payroll_indonesia.payroll_indonesia.tax.december_correction import (
+    compute_december_corrections,
+)
+
+RECALCULATE_METHOD = "payroll_indonesia.override.payroll_entry_functions.recalculate_salary_slips"
 
 
 def before_validate(doc, method=None):
@@ -40,3 +52,117 @@ def before_validate(doc, method=None):
         )
         # This is not a user-initiated action, so throw to prevent silent failures
         frappe.throw(_("Error in payroll entry validation hook: {0}").format(str(e)))
+
+
+def before_submit(doc, method=None):
+    """
+    Event hook that runs before submitting a Payroll Entry document.
+
+    For December payroll entries, year-end PPh 21 corrections for all
+    employees are computed in bulk before salary slips are created, so each
+    December slip picks up its precomputed result instead of querying its
+    own year-to-date totals.
+
+    Args:
+        doc: The Payroll Entry document instance
+        method: The method being called (not used)
+    """
+    try:
+        if not doc.get("end_date") or getdate(doc.end_date).month != DECEMBER_MONTH:
+            return
+
+        employees = [row.employee for row in doc.get("employees") or [] if row.employee]
+        if not employees:
+            return
+
+        compute_december_corrections(
+            getdate(doc.end_date).year, payroll_entry=doc.name, employees=employees
+        )
+    except Exception as e:
+        # Non-critical: slips fall back to per-slip December calculation
+        frappe.log_error(
+            "Error preparing December corrections for Payroll Entry {0}: {1}".format(
+                doc.name if hasattr(doc, "name") else "New", str(e)
+            ),
+            "Payroll Entry Hook Error",
+        )
+
+
+def recalculate_salary_slips(payroll_entry, force=False):
+    """
+    Recalculate the draft salary slips of a Payroll Entry whose inputs changed
+
+    Slips whose input fingerprint still matches (same employee tax fields,
+    earnings, settings and YTD figures) are not saved again. Changes the
+    fingerprint does not cover, such as a new salary structure assignment
+    or attendance, need force.
+
+    Args:
+        payroll_entry: Payroll Entry name
+        force: Recalculate every draft slip
+
+    Returns:
+        dict: Number of total, recalculated, unchanged and failed slips
+    """
+    slips = frappe.get_all(
+        "Salary Slip",
+        filters={"payroll_entry": payroll_entry, "docstatus": 0},
+        pluck="name",
+        order_by="name asc",
+    )
+    result = {"total": len(slips), "recalculated": 0, "unchanged": 0, "failed": 0}
+    settings_version = get_settings_version()
+
+    frappe.flags.force_slip_recalculation = bool(force)
+    try:
+        for name in slips:
+            try:
+                slip = frappe.get_doc("Salary Slip", name)
+                if is_calculation_current(slip, settings_version=settings_version):
+                    result["unchanged"] += 1
+                    continue
+
+                slip.save()
+                frappe.db.commit()
+                result["recalculated"] += 1
+            except Exception as e:
+                frappe.db.rollback()
+                result["failed"] += 1
+                frappe.log_error(
+                    "Error recalculating Salary Slip {0} of Payroll Entry {1}: {2}".format(
+                        name, payroll_entry, str(e)
+                    ),
+                    "Payroll Entry Recalculation Error",
+                )
+    finally:
+        frappe.flags.force_slip_recalculation = False
+
+    return result
+
+
+@frappe.whitelist()
+def recalculate_payroll_entry_slips(payroll_entry, force=0):
+    """
+    Queue recalculation of the changed draft salary slips of a Payroll Entry
+
+    Args:
+        payroll_entry: Payroll Entry name
+        force: Recalculate every draft slip, not only changed ones
+
+    Returns:
+        dict: Whether the job was queued (False if one is already running)
+    """
+    if not frappe.has_permission("Payroll Entry", "write", payroll_entry):
+        frappe.throw(_("Not permitted to recalculate this Payroll Entry"), frappe.PermissionError)
+
+    from payroll_indonesia.utilities.job_registry import enqueue_registered
+
+    queued = enqueue_registered(
+        RECALCULATE_METHOD,
+        job_name=f"recalculate_salary_slips:{payroll_entry}",
+        queue="long",
+        timeout=3600,
+        payroll_entry=payroll_entry,
+        force=bool(cint(force)),
+    )
+    return {"queued": queued}
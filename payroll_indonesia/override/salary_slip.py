@@ -20,6 +20,13 @@ from payroll_indonesia.override.salary_slip.tax_calculator import calculate_tax_
 # Import standardized cache utilities
 from payroll_indonesia.utilities.cache_utils import get_cached_value, cache_value, clear_cache
 
+# Import coalescing tax summary queue and job registry
+from payroll_indonesia.utilities.tax_summary_queue import (
+    queue_tax_summary_update,
+    queue_tax_summary_revert,
+)
+from payroll_indonesia.utilities.job_registry import enqueue_registered
+
 # Import constants
 from payroll_indonesia.constants import (
     CACHE_MEDIUM,
@@ -450,22 +457,10 @@ class IndonesiaPayrollSalarySlip(SalarySlip):
             if self.docstatus != 1:
                 return
 
-            # Use background job to update tax summary for better performance
-            # This prevents the salary slip submission from being blocked by tax summary updates
-            frappe.enqueue(
-                method="payroll_indonesia.payroll_indonesia.doctype.employee_tax_summary.employee_tax_summary.create_from_salary_slip",
-                queue="long",
-                timeout=600,
-                salary_slip=self.name,
-                is_async=True,
-                job_name=f"tax_summary_update_{self.name}",
-                now=False,  # Run in background
-            )
-
-            # Add note that tax summary update was queued
-            self.add_payroll_note(
-                f"Tax summary update queued in background job: tax_summary_update_{self.name}"
-            )
+            # Coalesce with other pending slips; a single background drain job
+            # updates each employee's tax summary once
+            if queue_tax_summary_update(self):
+                self.add_payroll_note("Tax summary update queued for background processing")
 
         except Exception as e:
             # Non-critical error - log and continue
@@ -511,28 +506,13 @@ class IndonesiaPayrollSalarySlip(SalarySlip):
             if self.docstatus != 2:  # 2 = Cancelled
                 return
 
-            # Use a background job to update tax summary
-            year = getdate(self.end_date).year if hasattr(self, "end_date") else None
-
-            if not year:
+            if not getattr(self, "end_date", None):
                 self.add_payroll_note("Could not determine year for tax summary reversion")
                 return
 
-            frappe.enqueue(
-                method="payroll_indonesia.payroll_indonesia.doctype.employee_tax_summary.employee_tax_summary.update_on_salary_slip_cancel",
-                queue="long",
-                timeout=300,
-                salary_slip=self.name,
-                year=year,
-                is_async=True,
-                job_name=f"tax_summary_revert_{self.name}",
-                now=False,  # Run in background
-            )
-
-            # Add note that tax summary reversion was queued
-            self.add_payroll_note(
-                f"Tax summary reversion queued in background job: tax_summary_revert_{self.name}"
-            )
+            # Coalesce with other pending slips, reverted by the background drain job
+            if queue_tax_summary_revert(self):
+                self.add_payroll_note("Tax summary reversion queued for background processing")
 
         except Exception as e:
             # Non-critical error - log and continue
@@ -1091,22 +1071,9 @@ def _enqueue_tax_summary_update(doc: Any) -> None:
         if not hasattr(doc, "docstatus") or doc.docstatus != 1:
             return
 
-        # Queue background job
-        frappe.enqueue(
-            method="payroll_indonesia.payroll_indonesia.doctype.employee_tax_summary.employee_tax_summary.create_from_salary_slip",
-            queue="long",
-            timeout=600,
-            salary_slip=doc.name,
-            is_async=True,
-            job_name=f"tax_summary_update_{doc.name}",
-            now=False,
-        )
-
-        # Add note about job
-        if hasattr(doc, "add_payroll_note"):
-            doc.add_payroll_note(
-                f"Tax summary update queued in background job: tax_summary_update_{doc.name}"
-            )
+        # Add to the coalescing queue drained by a single background job
+        if queue_tax_summary_update(doc) and hasattr(doc, "add_payroll_note"):
+            doc.add_payroll_note("Tax summary update queued for background processing")
 
     except Exception as e:
         get_logger().warning(f"Error queueing tax summary update for {doc.name}: {e}")
@@ -1135,23 +1102,9 @@ def _enqueue_tax_summary_revert(doc: Any) -> None:
             get_logger().warning(f"Could not determine year for tax summary reversion: {doc.name}")
             return
 
-        # Queue background job
-        frappe.enqueue(
-            method="payroll_indonesia.payroll_indonesia.doctype.employee_tax_summary.employee_tax_summary.update_on_salary_slip_cancel",
-            queue="long",
-            timeout=300,
-            salary_slip=doc.name,
-            year=year,
-            is_async=True,
-            job_name=f"tax_summary_revert_{doc.name}",
-            now=False,
-        )
-
-        # Add note about job
-        if hasattr(doc, "add_payroll_note"):
-            doc.add_payroll_note(
-                f"Tax summary reversion queued in background job: tax_summary_revert_{doc.name}"
-            )
+        # Add to the coalescing queue drained by a single background job
+        if queue_tax_summary_revert(doc) and hasattr(doc, "add_payroll_note"):
+            doc.add_payroll_note("Tax summary reversion queued for background processing")
 
     except Exception as e:
         get_logger().warning(f"Error queueing tax summary reversion for {doc.name}: {e}")
@@ -1333,14 +1286,13 @@ def refresh_multiple_tax_summaries(
             for i in range(0, len(salary_slips), batch_size):
                 batch = salary_slips[i : i + batch_size]
 
-                # Queue a job for each batch
-                frappe.enqueue(
-                    method="_process_tax_summary_batch",
+                # Queue a job for each batch unless the same batch is already queued
+                enqueue_registered(
+                    "payroll_indonesia.override.salary_slip._process_tax_summary_batch",
+                    job_name=f"tax_summary_batch_{batch[0]}_{batch[-1]}_{len(batch)}",
                     queue="long",
                     timeout=1800,  # 30 minutes timeout for large batches
                     slips=batch,
-                    job_name=f"tax_summary_batch_{i}_{i+len(batch)}",
-                    now=False,
                 )
 
             return {
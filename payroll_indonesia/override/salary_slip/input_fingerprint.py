@@ -0,0 +1,217 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025, PT. Innovasi Terbaik Bangsa and contributors
+# For license information, please see license.txt
+
+"""
+Input fingerprint of a salary slip's BPJS and tax calculation.
+
+The fingerprint is a hash over everything the BPJS and PPh 21 calculators
+read: the employee's tax fields, the slip period and earnings rows, the
+settings version (PPh 21, BPJS and Payroll Indonesia Settings plus the TER
+table version) and the YTD version (the employee's tax summary and other
+submitted slips of the year). It also covers the calculated fields and
+deduction rows, so a slip whose results were reset by the standard salary
+slip validation is recalculated.
+
+The fingerprint is stored on the slip after each calculation. When it still
+matches on the next validate the calculation is skipped.
+"""
+
+import hashlib
+import json
+from typing import Any, Optional, Tuple
+
+import frappe
+from frappe.utils import getdate
+
+import payroll_indonesia
+from payroll_indonesia.payroll_indonesia.tax.pph_ter import get_ter_table_version
+from payroll_indonesia.utilities.response_cache import get_employee_generation
+
+__all__ = [
+    "FINGERPRINT_FIELD",
+    "get_settings_version",
+    "compute_input_fingerprint",
+    "is_calculation_current",
+    "store_input_fingerprint",
+]
+
+FINGERPRINT_FIELD = "input_fingerprint"
+
+# Bump when the calculators change in a way that invalidates stored results
+FINGERPRINT_VERSION = 1
+
+SETTINGS_DOCTYPES = ("Payroll Indonesia Settings", "PPh 21 Settings", "BPJS Settings")
+
+EMPLOYEE_TAX_FIELDS = (
+    "status_pajak",
+    "override_tax_method",
+    "tipe_karyawan",
+    "npwp",
+    "ktp",
+    "npwp_gabung_suami",
+    "gender",
+    "ikut_bpjs_kesehatan",
+    "ikut_bpjs_ketenagakerjaan",
+)
+
+SLIP_INPUT_FIELDS = (
+    "employee",
+    "company",
+    "start_date",
+    "end_date",
+    "payroll_entry",
+    "gross_pay",
+    "bypass_annual_detection",
+)
+
+# Fields written by the BPJS and tax calculators
+SLIP_RESULT_FIELDS = (
+    "total_bpjs",
+    "kesehatan_employee",
+    "jht_employee",
+    "jp_employee",
+    "is_using_ter",
+    "ter_rate",
+    "ter_category",
+    "biaya_jabatan",
+    "netto",
+    "koreksi_pph21",
+)
+
+
+def get_settings_version() -> Tuple:
+    """
+    Version of the settings the calculators read
+
+    Returns:
+        tuple: Modified timestamps of the settings DocTypes and the TER
+            table version
+    """
+    modified = frappe.db.sql(
+        """
+        SELECT doctype, value FROM `tabSingles`
+        WHERE field = 'modified' AND doctype IN %(doctypes)s
+        ORDER BY doctype
+        """,
+        {"doctypes": SETTINGS_DOCTYPES},
+    )
+    return tuple((doctype, str(value)) for doctype, value in modified), get_ter_table_version()
+
+
+def _ytd_version(doc: Any) -> Tuple:
+    """Version of the year-to-date figures the slip's tax depends on."""
+    if not doc.get("employee") or not doc.get("start_date"):
+        return ()
+
+    year = getdate(doc.start_date).year
+    slips = frappe.db.sql(
+        """
+        SELECT COUNT(*), MAX(modified) FROM `tabSalary Slip`
+        WHERE employee = %(employee)s AND docstatus = 1 AND name != %(name)s
+            AND start_date BETWEEN %(year_start)s AND %(year_end)s
+        """,
+        {
+            "employee": doc.employee,
+            "name": doc.get("name") or "",
+            "year_start": f"{year}-01-01",
+            "year_end": f"{year}-12-31",
+        },
+    )
+    summary_modified = frappe.db.get_value(
+        "Employee Tax Summary", {"employee": doc.employee, "year": year}, "modified"
+    )
+    return (
+        tuple(str(value) for value in slips[0]),
+        str(summary_modified),
+        get_employee_generation(doc.employee),
+    )
+
+
+def _value(value: Any) -> str:
+    """Normalize a field value so it hashes the same before and after saving."""
+    if value is None:
+        return ""
+    if isinstance(value, (int, float)):
+        return f"{value:.6f}"
+    return str(value)
+
+
+def _rows(doc: Any, table: str) -> list:
+    return [
+        (
+            row.get("salary_component"),
+            _value(row.get("amount")),
+            _value(row.get("additional_salary")),
+        )
+        for row in doc.get(table) or []
+    ]
+
+
+def compute_input_fingerprint(
+    doc: Any, employee: Any = None, settings_version: Optional[Tuple] = None
+) -> Optional[str]:
+    """
+    Compute the input fingerprint of a salary slip
+
+    Args:
+        doc: Salary Slip document
+        employee: Employee document (optional, loaded when not given)
+        settings_version: Result of get_settings_version, to reuse it for a
+            batch of slips (optional)
+
+    Returns:
+        str: Hex digest, None when the slip has no employee
+    """
+    if not doc.get("employee"):
+        return None
+
+    if employee is None:
+        employee = frappe.get_cached_doc("Employee", doc.employee)
+
+    payload = {
+        "version": (FINGERPRINT_VERSION, payroll_indonesia.__version__),
+        "employee": [_value(employee.get(field)) for field in EMPLOYEE_TAX_FIELDS],
+        "slip": [_value(doc.get(field)) for field in SLIP_INPUT_FIELDS],
+        "earnings": _rows(doc, "earnings"),
+        "results": [_value(doc.get(field)) for field in SLIP_RESULT_FIELDS],
+        "deductions": _rows(doc, "deductions"),
+        "settings": settings_version if settings_version is not None else get_settings_version(),
+        "ytd": _ytd_version(doc),
+    }
+    return hashlib.sha1(
+        json.dumps(payload, sort_keys=True, default=str).encode("utf-8")
+    ).hexdigest()
+
+
+def is_calculation_current(
+    doc: Any, employee: Any = None, settings_version: Optional[Tuple] = None
+) -> bool:
+    """
+    Check whether the stored calculation of a slip is still current
+
+    Args:
+        doc: Salary Slip document
+        employee: Employee document (optional)
+        settings_version: Result of get_settings_version (optional)
+
+    Returns:
+        bool: True if the stored fingerprint matches the slip's inputs
+    """
+    stored = doc.get(FINGERPRINT_FIELD)
+    if not stored or frappe.flags.get("force_slip_recalculation"):
+        return False
+    return stored == compute_input_fingerprint(doc, employee, settings_version)
+
+
+def store_input_fingerprint(doc: Any, employee: Any = None) -> None:
+    """
+    Record the fingerprint of a slip after its BPJS and tax calculation
+
+    Args:
+        doc: Salary Slip document
+        employee: Employee document (optional)
+    """
+    if not doc.meta.has_field(FINGERPRINT_FIELD):
+        return
+    doc.set(FINGERPRINT_FIELD, compute_input_fingerprint(doc, employee))
@@ -51,6 +51,9 @@ from payroll_indonesia.payroll_indonesia.tax.ter_logic import (
     should_use_ter_method,
     add_tax_info_to_note,
 )
+from payroll_indonesia.payroll_indonesia.tax.december_correction import (
+    get_precomputed_december_correction,
+)
 
 # Import TER functions from pph_ter (single source of truth)
 # from payroll_indonesia.payroll_indonesia.tax.pph_ter import map_ptkp_to_ter_category
@@ -242,18 +245,8 @@ def calculate_monthly_pph_progressive(doc, employee):
         annual_netto = monthly_netto * MONTHS_PER_YEAR
         pkp = max(annual_netto - ptkp, 0)
 
-        # Calculate annual PPh using centralized function
-        cache_key = f"progressive_tax:{pkp}"
-        tax_result = get_cached_value(cache_key)
-
-        if tax_result is None:
-            annual_pph, tax_details = calculate_progressive_tax(pkp, pph_settings)
-            tax_result = {"annual_pph": annual_pph, "tax_details": tax_details}
-            # Cache for 1 hour
-            cache_value(cache_key, tax_result, CACHE_MEDIUM)
-        else:
-            annual_pph = tax_result["annual_pph"]
-            tax_details = tax_result["tax_details"]
+        # Calculate annual PPh using the compiled bracket table
+        annual_pph, tax_details = calculate_progressive_tax(pkp, pph_settings)
 
         # Calculate monthly PPh
         monthly_pph = annual_pph / MONTHS_PER_YEAR
@@ -310,29 +303,6 @@ def calculate_december_pph(doc, employee):
                     _("PPh 21 Settings not found. Please configure PPh 21 Settings properly.")
                 )
 
-        # For December, always use progressive method even if TER is enabled (PMK 168/2023)
-        # Get year-to-date totals from tax summary with improved caching
-        month = getdate(doc.start_date).month
-        cache_key = f"ytd_totals:{doc.employee}:{year}:{month}"
-        ytd = get_cached_value(cache_key)
-
-        if ytd is None:
-            # Make sure we're passing the right parameters
-            ytd = get_ytd_totals_from_tax_summary(doc, year, month)
-            # Cache for 30 minutes
-            cache_value(cache_key, ytd, CACHE_SHORT)
-
-        # Initialize ytd with default values if not found
-        ytd = ytd or {"gross": 0, "bpjs": 0, "pph21": 0}
-
-        # Calculate annual totals
-        annual_gross = ytd.get("gross", 0) + doc.gross_pay
-        annual_bpjs = ytd.get("bpjs", 0) + doc.total_bpjs
-
-        # Biaya Jabatan is 5% of annual gross, max 500k/year according to regulations
-        annual_biaya_jabatan = min(annual_gross * (BIAYA_JABATAN_PERCENT / 100), BIAYA_JABATAN_MAX)
-        annual_netto = annual_gross - annual_biaya_jabatan - annual_bpjs
-
         # Get PTKP value using centralized function
         if not hasattr(employee, "status_pajak") or not employee.status_pajak:
             employee.status_pajak = "TK0"  # Default to TK0 if not set
@@ -340,21 +310,49 @@ def calculate_december_pph(doc, employee):
                 _("Warning: Employee tax status not set, using TK0 as default"), indicator="orange"
             )
 
-        ptkp = get_ptkp_amount(employee.status_pajak, pph_settings)
-        pkp = max(annual_netto - ptkp, 0)
+        # Use the batch result prepared for the December payroll entry when available
+        batch = get_precomputed_december_correction(doc, pph_settings)
+        if batch and batch.get("status_pajak") == employee.status_pajak:
+            ytd = batch["ytd"]
+            annual_gross = batch["annual_gross"]
+            annual_bpjs = batch["annual_bpjs"]
+            annual_biaya_jabatan = batch["annual_biaya_jabatan"]
+            annual_netto = batch["annual_netto"]
+            ptkp = batch["ptkp"]
+            pkp = batch["pkp"]
+            annual_pph = batch["annual_pph"]
+            tax_details = calculate_progressive_tax(pkp, pph_settings)[1]
+        else:
+            # For December, always use progressive method even if TER is enabled (PMK 168/2023)
+            # Get year-to-date totals from tax summary with improved caching
+            month = getdate(doc.start_date).month
+            cache_key = f"ytd_totals:{doc.employee}:{year}:{month}"
+            ytd = get_cached_value(cache_key)
+
+            if ytd is None:
+                # Make sure we're passing the right parameters
+                ytd = get_ytd_totals_from_tax_summary(doc, year, month)
+                # Cache for 30 minutes
+                cache_value(cache_key, ytd, CACHE_SHORT)
+
+            # Initialize ytd with default values if not found
+            ytd = ytd or {"gross": 0, "bpjs": 0, "pph21": 0}
+
+            # Calculate annual totals
+            annual_gross = ytd.get("gross", 0) + doc.gross_pay
+            annual_bpjs = ytd.get("bpjs", 0) + doc.total_bpjs
+
+            # Biaya Jabatan is 5% of annual gross, max 500k/year according to regulations
+            annual_biaya_jabatan = min(
+                annual_gross * (BIAYA_JABATAN_PERCENT / 100), BIAYA_JABATAN_MAX
+            )
+            annual_netto = annual_gross - annual_biaya_jabatan - annual_bpjs
 
-        # Calculate annual PPh using centralized function
-        tax_cache_key = f"progressive_tax:{pkp}"
-        tax_result = get_cached_value(tax_cache_key)
+            ptkp = get_ptkp_amount(employee.status_pajak, pph_settings)
+            pkp = max(annual_netto - ptkp, 0)
 
-        if tax_result is None:
+            # Calculate annual PPh using the compiled bracket table
             annual_pph, tax_details = calculate_progressive_tax(pkp, pph_settings)
-            tax_result = {"annual_pph": annual_pph, "tax_details": tax_details}
-            # Cache for 1 hour
-            cache_value(tax_cache_key, tax_result, CACHE_MEDIUM)
-        else:
-            annual_pph = tax_result["annual_pph"]
-            tax_details = tax_result["tax_details"]
 
         # Calculate correction
         correction = annual_pph - ytd.get("pph21", 0)
@@ -14,8 +14,9 @@ functions for TER category mapping and rate retrieval.
 from __future__ import annotations
 
 import decimal
+import zlib
 from dataclasses import dataclass
-from typing import Any, Dict, Optional, Union
+from typing import Any, Dict, Optional, Tuple, Union
 
 import frappe
 from frappe import _
@@ -62,6 +63,13 @@ TER_REQUIRED_FIELDS = {
     "payroll_note": "",
 }
 
+# Largest difference tolerated between a stored and an expected amount
+TER_INTEGRITY_TOLERANCE = 0.01
+
+# site_config.json key: percentage (0-100) of slips created by a Payroll Entry
+# that get the full integrity check, defaults to all of them
+TER_VERIFY_SAMPLE_CONFIG_KEY = "payroll_indonesia_ter_verify_sample_percent"
+
 
 @dataclass
 class TerCalculationContext:
@@ -160,15 +168,10 @@ def ensure_ter_fields(doc) -> bool:
         return False
 
     try:
+        # In-memory only, the values are saved with the document
         for field, default_value in TER_REQUIRED_FIELDS.items():
             if not hasattr(doc, field) or getattr(doc, field) is None:
                 setattr(doc, field, default_value)
-                try:
-                    # Persist to database if possible
-                    doc.db_set(field, default_value, update_modified=False)
-                except Exception:
-                    # Continue if db_set fails - we already set in-memory value
-                    pass
         return True
     except Exception as e:
         log_ter_error("Field Initialization", str(e), doc)
@@ -261,22 +264,10 @@ def calculate_monthly_pph_with_ter(doc: Any, employee: Any) -> bool:
             if hasattr(doc, "payroll_note") and doc.payroll_note is not None:
                 doc.payroll_note += f"\n[TER] {reason}. Using monthly value: {monthly_gross_pay}"
 
-        # Set and save monthly and annual values safely
+        # Set monthly and annual values, saved with the document
         annual_taxable_income = flt(monthly_gross_pay * MONTHS_PER_YEAR)
-
-        # Save monthly_gross_for_ter with safety checks
         doc.monthly_gross_for_ter = monthly_gross_pay
-        try:
-            doc.db_set("monthly_gross_for_ter", monthly_gross_pay, update_modified=False)
-        except Exception as e:
-            log_ter_error("Field Update", f"Could not save monthly_gross_for_ter: {str(e)}", doc)
-
-        # Save annual_taxable_income with safety checks
         doc.annual_taxable_income = annual_taxable_income
-        try:
-            doc.db_set("annual_taxable_income", annual_taxable_income, update_modified=False)
-        except Exception as e:
-            log_ter_error("Field Update", f"Could not save annual_taxable_income: {str(e)}", doc)
 
         # Determine TER category using centralized mapping function
         ter_category = ""
@@ -372,19 +363,11 @@ def calculate_monthly_pph_with_ter(doc: Any, employee: Any) -> bool:
                     _("Warning: TER calculation failed, using default 5% tax rate"), indicator="red"
                 )
 
-        # Set and save TER info safely
+        # Set TER info, saved with the document
         doc.is_using_ter = 1
         doc.ter_rate = flt(ter_rate * 100)  # Store as percentage
         doc.ter_category = ter_category
 
-        # Save TER info to database with error handling
-        try:
-            doc.db_set("is_using_ter", 1, update_modified=False)
-            doc.db_set("ter_rate", flt(ter_rate * 100), update_modified=False)
-            doc.db_set("ter_category", ter_category, update_modified=False)
-        except Exception as e:
-            log_ter_error("Database Update", f"Could not save TER fields: {str(e)}", doc)
-
         # Update PPh 21 component with error handling
         try:
             update_component_amount(doc, "PPh 21", monthly_tax, "deductions")
@@ -533,6 +516,82 @@ def calculate_simple_pph_with_ter(
     return tax_amount
 
 
+def get_ter_integrity_diff(
+    doc: Any,
+    original_values: Dict[str, Any],
+    monthly_gross_pay: float,
+    ter_rate: float,
+    ter_category: str,
+) -> Dict[str, Tuple[Any, Any]]:
+    """
+    Compare the TER fields of a salary slip with the calculated values.
+
+    Pure check: the document is only read, never changed or saved.
+
+    Args:
+        doc: Salary slip document
+        original_values: Dict of original values before calculation
+        monthly_gross_pay: Calculated monthly gross pay
+        ter_rate: Calculated TER rate (decimal)
+        ter_category: Determined TER category
+
+    Returns:
+        dict: {field: (actual, expected)} for every field that does not hold
+            its expected value, empty when the slip is consistent
+    """
+    expected = {
+        "monthly_gross_for_ter": flt(monthly_gross_pay),
+        "annual_taxable_income": flt(monthly_gross_pay * MONTHS_PER_YEAR),
+        "ter_rate": flt(ter_rate * 100),
+    }
+    if "gross_pay" in original_values:
+        expected["gross_pay"] = flt(original_values.get("gross_pay", 0))
+
+    diff = {}
+    for field, value in expected.items():
+        if hasattr(doc, field) and abs(flt(getattr(doc, field)) - value) > TER_INTEGRITY_TOLERANCE:
+            diff[field] = (getattr(doc, field), value)
+
+    if hasattr(doc, "is_using_ter") and not doc.is_using_ter:
+        diff["is_using_ter"] = (doc.is_using_ter, 1)
+
+    if hasattr(doc, "ter_category") and doc.ter_category != ter_category:
+        diff["ter_category"] = (doc.ter_category, ter_category)
+
+    return diff
+
+
+def should_verify_slip(doc: Any) -> bool:
+    """
+    Decide whether a salary slip gets the full integrity check.
+
+    Slips created one by one are always checked. Slips created by a Payroll
+    Entry are sampled with the percentage set in site_config.json; the choice
+    is derived from employee and period so reruns check the same slips.
+
+    Args:
+        doc: Salary slip document
+
+    Returns:
+        bool: True if the slip should be verified
+    """
+    if not frappe.flags.get("via_payroll_entry"):
+        return True
+
+    percent = frappe.conf.get(TER_VERIFY_SAMPLE_CONFIG_KEY)
+    if percent is None:
+        return True
+
+    percent = flt(percent)
+    if percent >= 100:
+        return True
+    if percent <= 0:
+        return False
+
+    seed = f"{getattr(doc, 'employee', '')}:{getattr(doc, 'start_date', '')}"
+    return zlib.crc32(seed.encode()) % 10000 < percent * 100
+
+
 def verify_calculation_integrity(
     doc: Any,
     original_values: Dict[str, Any],
@@ -545,7 +604,9 @@ def verify_calculation_integrity(
     """
     Verify integrity of TER calculation results and fix any inconsistencies.
 
-    This ensures all values are consistent with the calculation and properly saved.
+    Mismatches found by get_ter_integrity_diff are corrected on the document
+    object only; they are persisted when the slip is saved. In bulk runs only
+    a sample of slips is checked, see should_verify_slip.
 
     Args:
         doc: Salary slip document
@@ -557,112 +618,42 @@ def verify_calculation_integrity(
         monthly_tax: Calculated monthly tax amount
 
     Returns:
-        bool: True if integrity is verified or issues were fixed
-
-    Raises:
-        frappe.ValidationError: If verification fails and cannot be fixed
+        bool: True if integrity is verified, issues were fixed or the slip
+            was not sampled
     """
     if not doc:
         return False
 
     try:
-        errors = []
+        if not should_verify_slip(doc):
+            return True
 
-        # Ensure critical fields exist before checking them
-        ensure_ter_fields(doc)
+        diff = get_ter_integrity_diff(
+            doc, original_values, monthly_gross_pay, ter_rate, ter_category
+        )
+        if not diff:
+            return True
 
-        # Only verify gross_pay if it exists in both doc and original_values
-        if hasattr(doc, "gross_pay") and "gross_pay" in original_values:
-            if abs(flt(doc.gross_pay) - flt(original_values.get("gross_pay", 0))) > 0.01:
-                errors.append(
-                    f"gross_pay changed: {original_values.get('gross_pay', 0)} → {doc.gross_pay}"
-                )
-                doc.gross_pay = flt(original_values.get("gross_pay", 0))
-                try:
-                    doc.db_set(
-                        "gross_pay", flt(original_values.get("gross_pay", 0)), update_modified=False
-                    )
-                except Exception:
-                    # Continue if db_set fails
-                    pass
-
-        # Verify monthly_gross_for_ter
-        if hasattr(doc, "monthly_gross_for_ter"):
-            # Only do comparison if values actually differ significantly
-            if abs(flt(doc.monthly_gross_for_ter) - flt(monthly_gross_pay)) > 0.01:
-                errors.append(
-                    f"monthly_gross_for_ter mismatch: expected {monthly_gross_pay}, "
-                    f"got {doc.monthly_gross_for_ter}"
-                )
-                doc.monthly_gross_for_ter = flt(monthly_gross_pay)
-                try:
-                    doc.db_set(
-                        "monthly_gross_for_ter", flt(monthly_gross_pay), update_modified=False
-                    )
-                except Exception:
-                    # Continue if db_set fails
-                    pass
-
-        # Verify annual_taxable_income
-        if hasattr(doc, "annual_taxable_income"):
-            expected_annual = flt(monthly_gross_pay * MONTHS_PER_YEAR)
-            if abs(flt(doc.annual_taxable_income) - expected_annual) > 0.01:
-                errors.append(
-                    f"annual_taxable_income mismatch: expected {expected_annual}, "
-                    f"got {doc.annual_taxable_income}"
-                )
-                doc.annual_taxable_income = expected_annual
-                try:
-                    doc.db_set("annual_taxable_income", expected_annual, update_modified=False)
-                except Exception:
-                    # Continue if db_set fails
-                    pass
-
-        # Verify TER values
-        if hasattr(doc, "is_using_ter") and not doc.is_using_ter:
-            errors.append("is_using_ter not set to 1")
-            doc.is_using_ter = 1
-            try:
-                doc.db_set("is_using_ter", 1, update_modified=False)
-            except Exception:
-                # Continue if db_set fails
-                pass
-
-        if hasattr(doc, "ter_rate"):
-            if abs(flt(doc.ter_rate) - flt(ter_rate * 100)) > 0.01:
-                errors.append(f"ter_rate mismatch: expected {ter_rate * 100}, got {doc.ter_rate}")
-                doc.ter_rate = flt(ter_rate * 100)
-                try:
-                    doc.db_set("ter_rate", flt(ter_rate * 100), update_modified=False)
-                except Exception:
-                    # Continue if db_set fails
-                    pass
-
-        if hasattr(doc, "ter_category") and doc.ter_category != ter_category:
-            errors.append(f"ter_category mismatch: expected {ter_category}, got {doc.ter_category}")
-            doc.ter_category = ter_category
-            try:
-                doc.db_set("ter_category", ter_category, update_modified=False)
-            except Exception:
-                # Continue if db_set fails
-                pass
+        for field, (_actual, expected) in diff.items():
+            setattr(doc, field, expected)
 
         # Log all errors found in a clean format
-        if errors:
-            error_list = "\n".join(f"- {err}" for err in errors)
-            log_ter_error("Integrity Check", f"Issues found and fixed:\n{error_list}", doc)
+        errors = [
+            f"{field} mismatch: expected {expected}, got {actual}"
+            for field, (actual, expected) in diff.items()
+        ]
+        error_list = "\n".join(f"- {err}" for err in errors)
+        log_ter_error("Integrity Check", f"Issues found and fixed:\n{error_list}", doc)
 
-            # Add minimal message to user
-            frappe.msgprint(
-                _("Some TER calculation values were automatically corrected."),
-                indicator="orange",
-            )
+        # Add minimal message to user
+        frappe.msgprint(
+            _("Some TER calculation values were automatically corrected."),
+            indicator="orange",
+        )
 
-            # Add to payroll_note if available
-            if hasattr(doc, "payroll_note") and doc.payroll_note is not None:
-                doc.payroll_note += "\n[TER] Fixed calculation issues:\n" + "\n".join(
-                    f"- {err}" for err in errors
-                )
+        # Add to payroll_note if available
+        if hasattr(doc, "payroll_note") and doc.payroll_note is not None:
+            doc.payroll_note += "\n[TER] Fixed calculation issues:\n" + error_list
 
         return True  # Return true even with errors since we fixed them
 
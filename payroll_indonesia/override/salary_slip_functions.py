@@ -17,12 +17,24 @@ from payroll_indonesia.override.salary_slip.bpjs_calculator import calculate_bpj
 # Import centralized tax calculation function
 from payroll_indonesia.override.salary_slip.tax_calculator import calculate_tax_components
 
+# Import input fingerprint for skipping unchanged recalculations
+from payroll_indonesia.override.salary_slip.input_fingerprint import (
+    is_calculation_current,
+    store_input_fingerprint,
+)
+
 # Import standardized error logging and cache utilities
 from payroll_indonesia.utilities.cache_utils import clear_all_caches, schedule_cache_clearing
 
 # Import salary slip validation utility
 from payroll_indonesia.utilities.salary_slip_validator import has_pph21_component
 
+# Import coalescing tax summary queue
+from payroll_indonesia.utilities.tax_summary_queue import (
+    queue_tax_summary_update,
+    queue_tax_summary_revert,
+)
+
 __all__ = [
     "validate_salary_slip",
     "on_submit_salary_slip",
@@ -46,6 +58,9 @@ def validate_salary_slip(doc: SalarySlipDoc, method: Optional[str] = None) -> No
     Event hook for validating Salary Slip.
     Handles tax and BPJS calculations with appropriate error handling.
 
+    The calculations are skipped when the slip's input fingerprint shows
+    that nothing they depend on changed since the last calculation.
+
     Args:
         doc: The Salary Slip document
         method: Method name (not used)
@@ -57,6 +72,11 @@ def validate_salary_slip(doc: SalarySlipDoc, method: Optional[str] = None) -> No
         # Get employee document
         employee = _get_employee_doc(doc)
 
+        # Skip recalculation when the inputs are unchanged since the last one
+        if is_calculation_current(doc, employee):
+            get_logger().debug(f"Inputs of {doc.name} unchanged, skipping recalculation")
+            return
+
         # Calculate BPJS components using the new centralizing function
         # This will automatically update the required fields
         calculate_bpjs_components(doc)
@@ -67,6 +87,9 @@ def validate_salary_slip(doc: SalarySlipDoc, method: Optional[str] = None) -> No
         # Calculate tax components using centralized function
         calculate_tax_components(doc, employee)
 
+        # Record the inputs of this calculation
+        store_input_fingerprint(doc, employee)
+
     except Exception as e:
         # Handle ValidationError separately
         if isinstance(e, frappe.exceptions.ValidationError):
@@ -108,20 +131,12 @@ def on_submit_salary_slip(doc: SalarySlipDoc, method: Optional[str] = None) -> N
         if has_pph21_component(doc):
             get_logger().info(f"Salary slip {doc.name} has PPh 21 component, updating tax summary")
 
-            # Enqueue tax summary creation/update job
-            frappe.enqueue(
-                method="payroll_indonesia.payroll_indonesia.doctype.employee_tax_summary.employee_tax_summary.create_from_salary_slip",
-                queue="long",
-                timeout=600,
-                salary_slip=doc.name,
-                is_async=True,
-                job_name=f"tax_summary_update_{doc.name}",
-                now=False,  # Run in background
-            )
+            # Add to the coalescing queue, one background drain updates each summary once
+            queue_tax_summary_update(doc)
 
             # Add note about queued job if payroll_note field exists
             if hasattr(doc, "payroll_note"):
-                note = f"Tax summary update queued in background job: tax_summary_update_{doc.name}"
+                note = "Tax summary update queued for background processing"
                 current_note = getattr(doc, "payroll_note", "")
 
                 if current_note:
@@ -194,23 +209,12 @@ def on_cancel_salary_slip(doc: SalarySlipDoc, method: Optional[str] = None) -> N
                 )
                 return
 
-            # Enqueue tax summary reversion job
-            frappe.enqueue(
-                method="payroll_indonesia.payroll_indonesia.doctype.employee_tax_summary.employee_tax_summary.update_on_salary_slip_cancel",
-                queue="long",
-                timeout=300,
-                salary_slip=doc.name,
-                year=year,
-                is_async=True,
-                job_name=f"tax_summary_revert_{doc.name}",
-                now=False,  # Run in background
-            )
+            # Add to the coalescing queue, one background drain reverts each summary once
+            queue_tax_summary_revert(doc)
 
             # Add note about queued job if payroll_note field exists
             if hasattr(doc, "payroll_note"):
-                note = (
-                    f"Tax summary reversion queued in background job: tax_summary_revert_{doc.name}"
-                )
+                note = "Tax summary reversion queued for background processing"
                 current_note = getattr(doc, "payroll_note", "")
 
                 if current_note:
@@ -7,7 +7,8 @@ from frappe import _
 from frappe.utils import now
 from hrms.payroll.doctype.salary_structure.salary_structure import SalaryStructure
 from payroll_indonesia.utilities.tax_slab import get_default_tax_slab, create_income_tax_slab
-from payroll_indonesia.config.gl_account_mapper import get_gl_account_for_salary_component
+from payroll_indonesia.config.gl_account_mapper import get_gl_accounts_for_company
+from payroll_indonesia.utilities.structure_mass_update import apply_component_account_updates
 
 
 class CustomSalaryStructure(SalaryStructure):
@@ -52,73 +53,12 @@ class CustomSalaryStructure(SalaryStructure):
         try:
             super(CustomSalaryStructure, self).on_update()
 
-            # Cek apakah ada komponen PPh 21
-            has_tax_component = False
-            for d in self.deductions:
-                if d.salary_component == "PPh 21":
-                    has_tax_component = True
-                    break
+            # Lengkapi income tax slab jika ada komponen PPh 21
+            self.ensure_income_tax_slab()
 
-            # Periksa apakah field income_tax_slab ada dalam doctype
-            field_exists = False
-            try:
-                # Cek apakah attribut ada atau bisa diakses dari db
-                if hasattr(self, "income_tax_slab"):
-                    field_exists = True
-                else:
-                    # Coba ambil dari database
-                    tax_slab_value = frappe.db.get_value(
-                        "Salary Structure", self.name, "income_tax_slab"
-                    )
-                    if tax_slab_value is not None:
-                        field_exists = True
-            except Exception as field_check_error:
-                # Non-critical error during field check
-                frappe.log_error(
-                    "Error checking income_tax_slab field in {0}: {1}".format(
-                        self.name, str(field_check_error)
-                    ),
-                    "Field Check Error",
-                )
-                field_exists = False
+            # Update GL accounts only for new or changed components
+            self.update_gl_accounts_for_components(self.get_changed_components())
 
-            # Jika ada komponen PPh 21 dan field income_tax_slab ada, tapi nilainya kosong
-            if has_tax_component and field_exists:
-                tax_slab_value = getattr(self, "income_tax_slab", None) or frappe.db.get_value(
-                    "Salary Structure", self.name, "income_tax_slab"
-                )
-
-                if not tax_slab_value:
-                    # Dapatkan tax slab default
-                    tax_slab = get_default_tax_slab()
-
-                    if tax_slab:
-                        try:
-                            # Update langsung ke DB untuk menghindari error
-                            update_dict = {"tax_calculation_method": "Manual"}
-
-                            # Tambahkan income_tax_slab jika field ada di DocType
-                            if field_exists:
-                                update_dict["income_tax_slab"] = tax_slab
-
-                            frappe.db.set_value("Salary Structure", self.name, update_dict)
-                            frappe.db.commit()
-                        except Exception as update_error:
-                            # Non-critical error during update - log but continue
-                            frappe.log_error(
-                                "Error updating income_tax_slab for {0}: {1}".format(
-                                    self.name, str(update_error)
-                                ),
-                                "Tax Slab Update Error",
-                            )
-                            frappe.msgprint(
-                                _("Warning: Could not set income tax slab automatically."),
-                                indicator="orange",
-                            )
-                
-            # Update GL accounts for all components if applicable
-            self.update_gl_accounts_for_components()
-            
         except Exception as e:
             # Non-critical error in on_update - log but continue since this is a hook
             frappe.log_error(
@@ -132,27 +72,77 @@ class CustomSalaryStructure(SalaryStructure):
                 indicator="orange",
             )
     
-    def update_gl_accounts_for_components(self):
-        """Update GL accounts for all components in the salary structure"""
+    def ensure_income_tax_slab(self):
+        """Set the default income tax slab when the structure has PPh 21 but no slab"""
+        if not any(d.salary_component == "PPh 21" for d in self.deductions):
+            return
+
+        # Periksa apakah field income_tax_slab ada dalam doctype
+        if not self.meta.has_field("income_tax_slab") or self.get("income_tax_slab"):
+            return
+
+        # Dapatkan tax slab default
+        tax_slab = get_default_tax_slab()
+        if not tax_slab:
+            return
+
+        try:
+            # Update langsung ke DB, tanpa commit di tengah transaksi
+            self.db_set(
+                {"tax_calculation_method": "Manual", "income_tax_slab": tax_slab},
+                update_modified=False,
+            )
+        except Exception as update_error:
+            # Non-critical error during update - log but continue
+            frappe.log_error(
+                "Error updating income_tax_slab for {0}: {1}".format(
+                    self.name, str(update_error)
+                ),
+                "Tax Slab Update Error",
+            )
+            frappe.msgprint(
+                _("Warning: Could not set income tax slab automatically."),
+                indicator="orange",
+            )
+
+    def get_changed_components(self):
+        """
+        Get the components whose GL account may need an update
+
+        Returns:
+            list: All components for a new structure or a changed company,
+                otherwise only components added since the last save
+        """
+        components = [d.salary_component for d in self.earnings + self.deductions]
+        previous = self.get_doc_before_save()
+        if not previous or previous.company != self.company:
+            return components
+
+        previous_components = {
+            d.salary_component for d in previous.earnings + previous.deductions
+        }
+        return [c for c in components if c not in previous_components]
+
+    def update_gl_accounts_for_components(self, components=None):
+        """
+        Update GL accounts for components in the salary structure
+
+        Args:
+            components: Components to update, all components of the structure if omitted
+        """
         if self.company == "%":
             # Skip for wildcard company
             return
+
+        if components is None:
+            components = [d.salary_component for d in self.earnings + self.deductions]
+        if not components:
+            return
             
         try:
-            company = self.company
-            components_updated = 0
-            
-            # Process earnings
-            for earning in self.earnings:
-                component_name = earning.salary_component
-                if update_gl_account_for_component(company, component_name):
-                    components_updated += 1
-                    
-            # Process deductions
-            for deduction in self.deductions:
-                component_name = deduction.salary_component
-                if update_gl_account_for_component(company, component_name):
-                    components_updated += 1
+            components_updated = apply_component_account_updates(
+                self.company, components, commit=False
+            )
             
             if components_updated > 0:
                 frappe.log_error(
@@ -170,44 +160,7 @@ class CustomSalaryStructure(SalaryStructure):
 def update_gl_account_for_component(company, component_name):
     """Update GL account for a salary component using the mapping function"""
     try:
-        if not frappe.db.exists("Salary Component", component_name):
-            return False
-            
-        component = frappe.get_doc("Salary Component", component_name)
-        if not hasattr(component, "accounts"):
-            return False
-            
-        # Get the mapped GL account
-        gl_account = get_gl_account_for_salary_component(company, component_name)
-        if not gl_account:
-            return False
-            
-        # Check if an account entry already exists for this company
-        account_exists = False
-        for acc in component.accounts:
-            if acc.company == company:
-                if acc.default_account != gl_account:
-                    acc.default_account = gl_account
-                    account_exists = True
-                    break
-                else:
-                    # Account already has the correct mapping
-                    return False
-                    
-        # If no account exists for this company, add a new one
-        if not account_exists:
-            component.append("accounts", {
-                "company": company,
-                "default_account": gl_account
-            })
-            
-        # Save the component with updated accounts
-        component.flags.ignore_validate_update_after_submit = True
-        component.flags.ignore_validate = True
-        component.flags.ignore_permissions = True
-        component.save()
-        
-        return True
+        return apply_component_account_updates(company, [component_name]) > 0
     except Exception as e:
         frappe.log_error(
             f"Error updating GL account for component {component_name} in company {company}: {str(e)}",
@@ -457,12 +410,11 @@ def update_gl_accounts_for_components(salary_structure):
             return
     
     try:
-        # Process all components in the structure
-        for earning in salary_structure.earnings:
-            update_gl_account_for_component(company, earning.salary_component)
-            
-        for deduction in salary_structure.deductions:
-            update_gl_account_for_component(company, deduction.salary_component)
+        # Process all components in the structure at once
+        apply_component_account_updates(
+            company,
+            [d.salary_component for d in salary_structure.earnings + salary_structure.deductions],
+        )
             
     except Exception as e:
         frappe.log_error(
@@ -526,8 +478,15 @@ def create_salary_components():
             },
         ]
 
-        # Get default company for GL accounts
+        # Get default company for GL accounts, resolved for all components at once
         default_company = frappe.defaults.get_global_default("company")
+        component_accounts = (
+            get_gl_accounts_for_company(
+                default_company, [c["salary_component"] for c in earnings + deductions]
+            )
+            if default_company
+            else {}
+        )
 
         # Buat semua komponen
         for comp in earnings + deductions:
@@ -541,7 +500,7 @@ def create_salary_components():
 
                 # Set GL account if company is available
                 if default_company and hasattr(doc, "accounts"):
-                    gl_account = get_gl_account_for_salary_component(default_company, name)
+                    gl_account = component_accounts.get(name)
                     if gl_account:
                         doc.append("accounts", {
                             "company": default_company,
@@ -596,12 +555,7 @@ def update_gl_accounts_for_all_components():
         if not company:
             return False
             
-        components = frappe.get_all("Salary Component", fields=["name"])
-        updated_count = 0
-        
-        for comp in components:
-            if update_gl_account_for_component(company, comp.name):
-                updated_count += 1
+        updated_count = apply_component_account_updates(company)
                 
         if updated_count > 0:
             frappe.log_error(
@@ -0,0 +1,21 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025, PT. Innovasi Terbaik Bangsa and contributors
+# For license information, please see license.txt
+
+"""
+Performance benchmarks for the payroll hot paths.
+
+synthetic builds a deterministic dataset of N employees with 12 months of
+salary figures, stubs serves that dataset through an in-memory replacement
+of the Frappe DB and cache layer, and runner times the hot paths at several
+scales and writes a JSON report that can be diffed between releases.
+
+Run without a site (pure-Python mode, frappe must be importable):
+
+    python -m payroll_indonesia.payroll_indonesia.benchmarks --output bench.json
+
+Run against a live site:
+
+    bench --site <site> execute payroll_indonesia.payroll_indonesia.benchmarks.runner.run \\
+        --kwargs "{'stub': False, 'output': 'bench.json'}"
+"""
@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025, PT. Innovasi Terbaik Bangsa and contributors
+# For license information, please see license.txt
+
+"""Command line entry point: python -m payroll_indonesia.payroll_indonesia.benchmarks"""
+
+import argparse
+import json
+import sys
+
+from payroll_indonesia.payroll_indonesia.benchmarks.runner import (
+    BENCHMARKS,
+    DEFAULT_REPEAT,
+    DEFAULT_SCALES,
+    compare_reports,
+    run,
+)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the Payroll Indonesia hot paths")
+    parser.add_argument(
+        "--scales",
+        default=",".join(str(scale) for scale in DEFAULT_SCALES),
+        help="Comma separated employee counts",
+    )
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument(
+        "--benchmarks", default=None, help=f"Comma separated subset of: {', '.join(BENCHMARKS)}"
+    )
+    parser.add_argument("--output", default=None, help="Write the JSON report to this path")
+    parser.add_argument("--compare", default=None, help="Compare against a previous JSON report")
+    parser.add_argument("--threshold", type=float, default=0.1)
+    args = parser.parse_args(argv)
+
+    report = run(
+        scales=args.scales,
+        repeat=args.repeat,
+        seed=args.seed,
+        benchmarks=args.benchmarks,
+        output=args.output,
+    )
+
+    if not args.output:
+        json.dump(report, sys.stdout, indent=2, sort_keys=True)
+        sys.stdout.write("\n")
+
+    if not args.compare:
+        return 0
+
+    with open(args.compare) as f:
+        base = json.load(f)
+
+    regressions = 0
+    for row in compare_reports(base, report, args.threshold):
+        regressions += row["status"] == "regression"
+        sys.stderr.write(
+            "{scale:>7} {benchmark:<30} {base_us:>12.3f} {head_us:>12.3f} "
+            "{change:>+8.1%} {queries_delta:>+7.3f} {status}\n".format(**row)
+        )
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
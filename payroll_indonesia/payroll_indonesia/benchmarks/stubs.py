@@ -0,0 +1,554 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025, PT. Innovasi Terbaik Bangsa and contributors
+# For license information, please see license.txt
+
+"""
+In-memory replacement of the Frappe DB and cache layer for the benchmarks.
+
+stub_frappe patches the installed frappe module for the duration of a
+benchmark run so the hot paths can be timed without a site: settings singles
+are built from defaults.json, employee and tax summary rows come from the
+synthetic dataset, and the grouped SQL queries used by the batch code are
+answered from the dataset's year totals.
+
+Every call reaching the stub is counted, so the report can show database
+round trips per operation. Queries the stub cannot answer are counted as
+misses and return no rows, which makes new query patterns visible in the
+benchmark output instead of failing the run.
+"""
+
+import json
+import logging
+import os
+from collections import Counter
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, List, Optional
+
+import frappe
+
+import payroll_indonesia
+
+__all__ = ["StubDoc", "StubCache", "StubDatabase", "stub_frappe"]
+
+# DocTypes reported as installed by frappe.db.exists("DocType", ...)
+STUB_DOCTYPES = {
+    "Employee",
+    "Salary Slip",
+    "Employee Tax Summary",
+    "Employee Tax Summary Detail",
+    "PPh 21 TER Table",
+    "PPh 21 Settings",
+    "BPJS Settings",
+    "Payroll Indonesia Settings",
+}
+
+_MISSING = object()
+
+
+class StubDoc(frappe._dict):
+    """Attribute dict standing in for a Document, hashable like a Document."""
+
+    __hash__ = object.__hash__
+
+    def as_dict(self):
+        return dict(self)
+
+    def db_set(self, *args, **kwargs):
+        return None
+
+
+class StubCache:
+    """Dict-backed stand-in for frappe.cache(), callable like the real accessor."""
+
+    def __init__(self):
+        self.data = {}
+        self.hashes = {}
+
+    def __call__(self):
+        return self
+
+    def make_key(self, key, *args, **kwargs):
+        return key
+
+    def get_value(self, key, generator=None, *args, **kwargs):
+        value = self.data.get(key, _MISSING)
+        if value is _MISSING:
+            if not generator:
+                return None
+            value = self.data[key] = generator()
+        return value
+
+    def set_value(self, key, value, *args, **kwargs):
+        self.data[key] = value
+
+    def delete_value(self, keys, *args, **kwargs):
+        for key in [keys] if isinstance(keys, str) else keys or []:
+            self.data.pop(key, None)
+            self.hashes.pop(key, None)
+
+    def delete_key(self, key, *args, **kwargs):
+        self.delete_value(key)
+
+    def delete_keys(self, prefix):
+        for key in [k for k in self.data if k.startswith(prefix)]:
+            del self.data[key]
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, *args, **kwargs):
+        self.data[key] = value
+        return True
+
+    def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+    def incr(self, key):
+        self.data[key] = int(self.data.get(key) or 0) + 1
+        return self.data[key]
+
+    def hget(self, name, key, generator=None, *args, **kwargs):
+        value = self.hashes.get(name, {}).get(key)
+        if value is None and generator:
+            value = self.hset(name, key, generator())
+        return value
+
+    def hset(self, name, key, value, *args, **kwargs):
+        self.hashes.setdefault(name, {})[key] = value
+        return value
+
+    def hgetall(self, name):
+        return dict(self.hashes.get(name, {}))
+
+    def hdel(self, name, *keys):
+        for key in keys:
+            self.hashes.get(name, {}).pop(key, None)
+
+
+def _compare(value: Any, operator: str, operand: Any) -> bool:
+    operator = operator.lower()
+    if operator in ("=", "=="):
+        return value == operand
+    if operator == "!=":
+        return value != operand
+    if operator == "in":
+        return value in operand
+    if operator == "not in":
+        return value not in operand
+    if operator == "between":
+        return operand[0] <= value <= operand[1]
+    if value is None:
+        return False
+    if operator == "<":
+        return value < operand
+    if operator == "<=":
+        return value <= operand
+    if operator == ">":
+        return value > operand
+    if operator == ">=":
+        return value >= operand
+    raise ValueError(f"Unsupported filter operator: {operator}")
+
+
+def _normalize_filters(filters: Any) -> Dict[str, Any]:
+    """Turn dict or list filters into {field: value or [operator, operand]}."""
+    if not filters:
+        return {}
+    if isinstance(filters, dict):
+        return filters
+    normalized = {}
+    for condition in filters:
+        if len(condition) == 4:
+            condition = condition[1:]
+        field, operator, operand = condition
+        normalized[field] = [operator, operand]
+    return normalized
+
+
+def _matches(row: Dict[str, Any], filters: Dict[str, Any]) -> bool:
+    for field, condition in filters.items():
+        value = row.get(field)
+        if isinstance(condition, (list, tuple)):
+            if not _compare(value, condition[0], condition[1]):
+                return False
+        elif value != condition:
+            return False
+    return True
+
+
+def _project(row: Dict[str, Any], fields: Optional[Iterable[str]]) -> Any:
+    if not fields or fields == "*" or "*" in fields:
+        return frappe._dict(row)
+    if isinstance(fields, str):
+        fields = [fields]
+    return frappe._dict({field: row.get(field) for field in fields})
+
+
+def _build_singles(config: Dict[str, Any]) -> Dict[str, StubDoc]:
+    """Settings singles populated from defaults.json."""
+    bpjs = dict(config.get("bpjs") or {})
+    tax = config.get("tax") or {}
+    ter_rates = config.get("ter_rates") or {}
+
+    payroll_settings = StubDoc(bpjs)
+    payroll_settings.update(
+        {
+            "doctype": "Payroll Indonesia Settings",
+            "name": "Payroll Indonesia Settings",
+            "modified": "2025-01-01 00:00:00",
+            "tax_calculation_method": tax.get("tax_calculation_method", "TER"),
+            "use_ter": tax.get("use_ter", 1),
+            "biaya_jabatan_percent": tax.get("biaya_jabatan_percent", 5.0),
+            "biaya_jabatan_max": tax.get("biaya_jabatan_max", 500000.0),
+            "umr_default": tax.get("umr_default", 4900000.0),
+            "ter_rate_ter_a_json": json.dumps(ter_rates.get("TER A") or []),
+            "ter_rate_ter_b_json": json.dumps(ter_rates.get("TER B") or []),
+            "ter_rate_ter_c_json": json.dumps(ter_rates.get("TER C") or []),
+        }
+    )
+
+    pph_settings = StubDoc(
+        doctype="PPh 21 Settings",
+        name="PPh 21 Settings",
+        calculation_method=tax.get("tax_calculation_method", "TER"),
+        use_ter=tax.get("use_ter", 1),
+        ptkp_table=[
+            StubDoc(tax_status=status, amount=amount)
+            for status, amount in (config.get("ptkp") or {}).items()
+        ],
+        bracket_table=[StubDoc(row) for row in config.get("tax_brackets") or []],
+    )
+
+    bpjs_settings = StubDoc(bpjs)
+    bpjs_settings.update({"doctype": "BPJS Settings", "name": "BPJS Settings"})
+
+    system_settings = StubDoc(
+        doctype="System Settings",
+        name="System Settings",
+        time_zone="Asia/Jakarta",
+        float_precision=3,
+        currency_precision=2,
+    )
+
+    return {
+        "Payroll Indonesia Settings": payroll_settings,
+        "PPh 21 Settings": pph_settings,
+        "BPJS Settings": bpjs_settings,
+        "System Settings": system_settings,
+    }
+
+
+class StubDatabase:
+    """
+    frappe.db replacement serving the synthetic dataset
+
+    Args:
+        dataset: SyntheticDataset to serve
+    """
+
+    def __init__(self, dataset: Any):
+        self.dataset = dataset
+        self.config = dataset.config
+        self.singles = _build_singles(self.config)
+        self.calls = Counter()
+        self.misses = Counter()
+        self._employee_docs = {}
+        self._summary_employees = {dataset.summary_name(e.name): e.name for e in dataset.employees}
+        self._ter_rows = {}
+        for category, rows in (self.config.get("ter_rates") or {}).items():
+            last = max((r["income_from"] for r in rows), default=0)
+            self._ter_rows[category] = [
+                dict(
+                    status_pajak=category,
+                    income_from=r["income_from"],
+                    income_to=r.get("income_to") or 0,
+                    rate=r["rate"],
+                    is_highest_bracket=int(r["income_from"] == last),
+                )
+                for r in rows
+            ]
+        self._row_providers = {
+            "Employee": self._employee_rows,
+            "Employee Tax Summary": self._summary_rows,
+            "Employee Tax Summary Detail": self._detail_rows,
+            "PPh 21 TER Table": self._ter_table_rows,
+        }
+        self._sql_handlers = (
+            ("`tabSalary Detail`", self._deduction_totals),
+            ("LEFT JOIN `tabSalary Slip`", self._slip_totals),
+            ("`tabPPh 21 Tax Bracket`", self._bracket_rows),
+            ("`tabPPh 21 PTKP Table`", self._ptkp_rows),
+        )
+
+    # Row providers narrow by the obvious key before generic filtering
+
+    def _employee_rows(self, filters: Dict[str, Any]) -> List[Dict[str, Any]]:
+        name = filters.get("name")
+        if isinstance(name, str):
+            emp = self.dataset.by_name.get(name)
+            return [emp] if emp else []
+        return self.dataset.employees
+
+    def _summary_row(self, employee: str) -> Dict[str, Any]:
+        emp = self.dataset.by_name[employee]
+        return {
+            "name": self.dataset.summary_name(employee),
+            "employee": employee,
+            "employee_name": emp.employee_name,
+            "year": self.dataset.year,
+            "ytd_tax": emp.ytd_pph21,
+        }
+
+    def _summary_rows(self, filters: Dict[str, Any]) -> List[Dict[str, Any]]:
+        employee = filters.get("employee")
+        if isinstance(employee, str):
+            return [self._summary_row(employee)] if employee in self.dataset.by_name else []
+        return [self._summary_row(emp.name) for emp in self.dataset.employees]
+
+    def _detail_rows(self, filters: Dict[str, Any]) -> List[Dict[str, Any]]:
+        parent = filters.get("parent")
+        employee = self._summary_employees.get(parent) if isinstance(parent, str) else None
+        if not employee:
+            return []
+        return [dict(row, parent=parent) for row in self.dataset.monthly_rows(employee)]
+
+    def _ter_table_rows(self, filters: Dict[str, Any]) -> List[Dict[str, Any]]:
+        category = filters.get("status_pajak")
+        if isinstance(category, str):
+            return self._ter_rows.get(category, [])
+        return [row for rows in self._ter_rows.values() for row in rows]
+
+    # SQL handlers for the grouped queries of the batch code
+
+    def _slip_totals(self, values: Dict[str, Any]) -> List[Dict[str, Any]]:
+        rows = []
+        for employee in values["employees"]:
+            emp = self.dataset.by_name.get(employee)
+            if emp:
+                rows.append(
+                    {
+                        "employee": employee,
+                        "status_pajak": emp.status_pajak,
+                        "ytd_gross": emp.ytd_gross,
+                        "december_gross": emp.december_gross,
+                        "december_bpjs": emp.december_bpjs,
+                        "december_slip": emp.december_slip,
+                    }
+                )
+        return rows
+
+    def _deduction_totals(self, values: Dict[str, Any]) -> List[Dict[str, Any]]:
+        return [
+            {"employee": employee, "ytd_pph21": emp.ytd_pph21, "ytd_bpjs": emp.ytd_bpjs}
+            for employee, emp in (
+                (employee, self.dataset.by_name.get(employee)) for employee in values["employees"]
+            )
+            if emp
+        ]
+
+    def _bracket_rows(self, values: Any) -> List[Dict[str, Any]]:
+        return sorted(
+            (dict(row) for row in self.config.get("tax_brackets") or []),
+            key=lambda row: row["income_from"],
+        )
+
+    def _ptkp_rows(self, values: Any) -> List[Dict[str, Any]]:
+        return [
+            {"tax_status": status, "amount": amount}
+            for status, amount in (self.config.get("ptkp") or {}).items()
+        ]
+
+    def _select(
+        self, doctype: str, filters: Any, order_by: Optional[str], limit: Optional[int]
+    ) -> Optional[List[Dict[str, Any]]]:
+        """Filtered, ordered and limited rows, None for a doctype without provider."""
+        provider = self._row_providers.get(doctype)
+        if not provider:
+            return None
+
+        filters = _normalize_filters(filters)
+        rows = [row for row in provider(filters) if _matches(row, filters)]
+
+        if order_by:
+            field, _sep, direction = order_by.split(",")[0].strip().partition(" ")
+            rows.sort(key=lambda row: row.get(field) or 0, reverse=direction.lower() == "desc")
+
+        return rows[: int(limit)] if limit else rows
+
+    # frappe.db API
+
+    def exists(self, doctype: str, name: Any = None, *args, **kwargs):
+        self.calls[f"exists:{doctype}"] += 1
+        if doctype == "DocType":
+            return name if name in STUB_DOCTYPES else None
+        if doctype in self.singles:
+            return doctype
+        rows = self._select(doctype, name if isinstance(name, dict) else {"name": name}, None, 1)
+        if rows is None:
+            self.misses[f"exists:{doctype}"] += 1
+        return rows[0].get("name") if rows else None
+
+    def get_all(
+        self,
+        doctype: str,
+        filters: Any = None,
+        fields: Any = None,
+        order_by: Optional[str] = None,
+        limit: Optional[int] = None,
+        limit_page_length: Optional[int] = None,
+        pluck: Optional[str] = None,
+        **kwargs,
+    ) -> List[Any]:
+        self.calls[f"get_all:{doctype}"] += 1
+        rows = self._select(doctype, filters, order_by, limit or limit_page_length)
+        if rows is None:
+            self.misses[f"get_all:{doctype}"] += 1
+            return []
+
+        if pluck:
+            return [row.get(pluck) for row in rows]
+        return [_project(row, fields or ["name"]) for row in rows]
+
+    get_list = get_all
+
+    def get_value(
+        self, doctype: str, filters: Any = None, fieldname: Any = "name", *args, **kwargs
+    ):
+        self.calls[f"get_value:{doctype}"] += 1
+        as_dict = kwargs.get("as_dict") or (args[1] if len(args) > 1 else False)
+
+        if doctype in self.singles:
+            row = self.singles[doctype]
+        else:
+            if not isinstance(filters, (dict, list)):
+                filters = {"name": filters}
+            rows = self._select(doctype, filters, None, 1)
+            if rows is None:
+                self.misses[f"get_value:{doctype}"] += 1
+            if not rows:
+                return None
+            row = rows[0]
+
+        if isinstance(fieldname, str):
+            return frappe._dict({fieldname: row.get(fieldname)}) if as_dict else row.get(fieldname)
+        if as_dict:
+            return frappe._dict({field: row.get(field) for field in fieldname})
+        return tuple(row.get(field) for field in fieldname)
+
+    def get_single_value(self, doctype: str, fieldname: str, *args, **kwargs):
+        self.calls[f"get_single_value:{doctype}"] += 1
+        return self.singles.get(doctype, {}).get(fieldname)
+
+    def sql(self, query: str, values: Any = None, as_dict: bool = False, *args, **kwargs):
+        for marker, handler in self._sql_handlers:
+            if marker in query:
+                self.calls[f"sql:{handler.__name__.lstrip('_')}"] += 1
+                rows = handler(values)
+                if as_dict:
+                    return [frappe._dict(row) for row in rows]
+                return [tuple(row.values()) for row in rows]
+
+        self.calls["sql:unhandled"] += 1
+        self.misses[" ".join(query.split())[:80]] += 1
+        return []
+
+    def get_doc(self, doctype: Any, name: Optional[str] = None, *args, **kwargs) -> StubDoc:
+        if isinstance(doctype, dict):
+            return StubDoc(doctype)
+
+        self.calls[f"get_doc:{doctype}"] += 1
+        if doctype in self.singles:
+            return self.singles[doctype]
+
+        if doctype == "Employee" and name in self.dataset.by_name:
+            doc = self._employee_docs.get(name)
+            if doc is None:
+                doc = self._employee_docs[name] = StubDoc(self.dataset.by_name[name])
+            return doc
+
+        self.misses[f"get_doc:{doctype}"] += 1
+        raise getattr(frappe, "DoesNotExistError", LookupError)(f"{doctype} {name} not found")
+
+    def commit(self):
+        pass
+
+    def rollback(self, *args, **kwargs):
+        pass
+
+    def reset_counters(self):
+        self.calls.clear()
+        self.misses.clear()
+
+
+def _null_logger(*args, **kwargs) -> logging.Logger:
+    logger = logging.getLogger("payroll_indonesia.benchmarks.stub")
+    if not logger.handlers:
+        logger.addHandler(logging.NullHandler())
+        logger.propagate = False
+    return logger
+
+
+def _get_app_path(app_name: str, *joins: str) -> str:
+    base = os.path.dirname(payroll_indonesia.__file__)
+    return os.path.join(base, *joins)
+
+
+@contextmanager
+def stub_frappe(dataset: Any):
+    """
+    Patch frappe with the in-memory DB and cache for the duration of the block
+
+    Args:
+        dataset: SyntheticDataset to serve
+
+    Yields:
+        StubDatabase: The installed stub, for call and miss counters
+    """
+    db = StubDatabase(dataset)
+    cache = StubCache()
+    cache.set_value("time_zone", "Asia/Jakarta")
+    conf = frappe._dict(developer_mode=0)
+    flags = frappe._dict(in_test=False)
+
+    module_patches = {
+        "db": db,
+        "conf": conf,
+        "flags": flags,
+        "cache": cache,
+        "get_all": db.get_all,
+        "get_list": db.get_list,
+        "get_doc": db.get_doc,
+        "get_cached_doc": db.get_doc,
+        "get_single": db.get_doc,
+        "get_app_path": _get_app_path,
+        "logger": _null_logger,
+        "log_error": lambda *args, **kwargs: None,
+        "msgprint": lambda *args, **kwargs: None,
+    }
+    local_patches = {"db": db, "conf": conf, "flags": flags, "lang": "en"}
+
+    saved_module = {name: getattr(frappe, name, _MISSING) for name in module_patches}
+    saved_local = {name: getattr(frappe.local, name, _MISSING) for name in local_patches}
+
+    for name, value in module_patches.items():
+        setattr(frappe, name, value)
+    for name, value in local_patches.items():
+        setattr(frappe.local, name, value)
+
+    try:
+        yield db
+    finally:
+        for name, value in saved_module.items():
+            if value is _MISSING:
+                delattr(frappe, name)
+            else:
+                setattr(frappe, name, value)
+        for name, value in saved_local.items():
+            if value is _MISSING:
+                try:
+                    delattr(frappe.local, name)
+                except AttributeError:
+                    pass
+            else:
+                setattr(frappe.local, name, value)
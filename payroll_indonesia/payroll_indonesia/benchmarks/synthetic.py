@@ -0,0 +1,224 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025, PT. Innovasi Terbaik Bangsa and contributors
+# For license information, please see license.txt
+
+"""
+Deterministic synthetic payroll data for the benchmarks.
+
+Employees are spread across PTKP statuses and salary levels with fixed
+weights. Only per-employee scalars and year totals are kept in memory; the
+12 monthly rows of an employee are regenerated on demand from a seed derived
+from the employee name, so 100k employees stay well below a gigabyte.
+"""
+
+import bisect
+import json
+import os
+import random
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import frappe
+
+import payroll_indonesia
+from payroll_indonesia.constants import (
+    BPJS_JHT_EMPLOYEE_PERCENT,
+    BPJS_JP_EMPLOYEE_PERCENT,
+    BPJS_JP_MAX_SALARY,
+    BPJS_KESEHATAN_EMPLOYEE_PERCENT,
+    BPJS_KESEHATAN_MAX_SALARY,
+    DECEMBER_MONTH,
+)
+
+__all__ = ["SyntheticDataset", "generate_dataset", "load_defaults"]
+
+BENCHMARK_YEAR = 2025
+BENCHMARK_COMPANY = "Benchmark Company"
+
+# (PTKP status, weight)
+PTKP_STATUS_WEIGHTS = (
+    ("TK0", 25),
+    ("TK1", 5),
+    ("TK2", 3),
+    ("TK3", 2),
+    ("K0", 15),
+    ("K1", 20),
+    ("K2", 15),
+    ("K3", 15),
+)
+
+# (monthly base salary, weight), each employee gets +/-20% around its level
+SALARY_LEVEL_WEIGHTS = (
+    (4500000, 30),
+    (7500000, 30),
+    (15000000, 22),
+    (35000000, 12),
+    (80000000, 5),
+    (250000000, 1),
+)
+
+# Months with a bonus payout for some employees
+BONUS_MONTHS = (3, DECEMBER_MONTH)
+
+
+def load_defaults() -> Dict[str, Any]:
+    """Read config/defaults.json straight from the package, without a site."""
+    path = os.path.join(os.path.dirname(payroll_indonesia.__file__), "config", "defaults.json")
+    with open(path) as f:
+        return json.load(f)
+
+
+class _TerLookup:
+    """Bisect lookup over the default TER table, used to fill tax amounts."""
+
+    def __init__(self, ter_rates: Dict[str, List[Dict[str, Any]]]):
+        self.tables = {}
+        for category, rows in ter_rates.items():
+            rows = sorted(rows, key=lambda r: r["income_from"])
+            self.tables[category] = ([r["income_from"] for r in rows], [r["rate"] for r in rows])
+
+    def rate(self, category: str, income: float) -> float:
+        starts, rates = self.tables[category]
+        index = bisect.bisect_right(starts, income) - 1
+        return rates[index] if index >= 0 else 0.0
+
+
+class SyntheticDataset:
+    """Synthetic employees and salary figures for one tax year."""
+
+    def __init__(self, employees: List[Any], year: int, seed: int, config: Dict[str, Any]):
+        self.employees = employees
+        self.year = year
+        self.seed = seed
+        self.config = config
+        self.by_name = {emp.name: emp for emp in employees}
+        self.ter_mapping = config.get("ptkp_to_ter_mapping") or {}
+        self._ter = _TerLookup(config.get("ter_rates") or {})
+
+    def __len__(self) -> int:
+        return len(self.employees)
+
+    def ter_category(self, status_pajak: str) -> str:
+        return self.ter_mapping.get(status_pajak, "TER C")
+
+    def summary_name(self, employee: str) -> str:
+        return f"ETS-{employee}-{self.year}"
+
+    def monthly_rows(self, employee: str) -> List[Any]:
+        """
+        Regenerate the 12 monthly salary rows of an employee
+
+        Args:
+            employee: Employee name
+
+        Returns:
+            list: Rows shaped like Employee Tax Summary Detail, with month,
+                gross_pay, bpjs_deductions, tax_amount, is_using_ter and ter_rate
+        """
+        emp = self.by_name[employee]
+        rng = random.Random(f"{self.seed}:{employee}:months")
+        category = self.ter_category(emp.status_pajak)
+        rows = []
+
+        for month in range(1, 13):
+            gross = emp.base_salary * rng.uniform(0.97, 1.08)
+            if month in BONUS_MONTHS and rng.random() < 0.4:
+                gross += emp.base_salary * rng.choice((0.5, 1.0, 2.0))
+            gross = round(gross, -3)
+
+            bpjs = 0.0
+            if emp.ikut_bpjs_kesehatan:
+                bpjs += (
+                    min(gross, BPJS_KESEHATAN_MAX_SALARY) * BPJS_KESEHATAN_EMPLOYEE_PERCENT / 100
+                )
+            if emp.ikut_bpjs_ketenagakerjaan:
+                bpjs += gross * BPJS_JHT_EMPLOYEE_PERCENT / 100
+                bpjs += min(gross, BPJS_JP_MAX_SALARY) * BPJS_JP_EMPLOYEE_PERCENT / 100
+
+            is_using_ter = month != DECEMBER_MONTH
+            ter_rate = self._ter.rate(category, gross) if is_using_ter else 0.0
+            rows.append(
+                frappe._dict(
+                    month=month,
+                    gross_pay=gross,
+                    bpjs_deductions=round(bpjs),
+                    tax_amount=round(gross * ter_rate / 100),
+                    is_using_ter=int(is_using_ter),
+                    ter_rate=ter_rate,
+                    salary_slip=f"SAL-{employee}-{self.year}-{month:02d}",
+                )
+            )
+
+        return rows
+
+    def iter_monthly(self) -> Iterator[Tuple[Any, List[Any]]]:
+        """Yield (employee, monthly rows) for every employee."""
+        for emp in self.employees:
+            yield emp, self.monthly_rows(emp.name)
+
+
+def _weighted(rng: random.Random, choices: Tuple[Tuple[Any, int], ...]) -> Any:
+    values, weights = zip(*choices)
+    return rng.choices(values, weights=weights)[0]
+
+
+def generate_dataset(
+    employees: int = 1000,
+    year: int = BENCHMARK_YEAR,
+    seed: int = 42,
+    config: Optional[Dict[str, Any]] = None,
+) -> SyntheticDataset:
+    """
+    Generate a deterministic synthetic dataset
+
+    Args:
+        employees: Number of employees
+        year: Tax year of the monthly rows
+        seed: Random seed, the same seed always yields the same data
+        config: defaults.json contents, read from the package when omitted
+
+    Returns:
+        SyntheticDataset: Employees with year totals
+    """
+    config = config or load_defaults()
+    rng = random.Random(seed)
+    rows = []
+
+    for index in range(1, employees + 1):
+        level = _weighted(rng, SALARY_LEVEL_WEIGHTS)
+        kesehatan = int(rng.random() < 0.95)
+        ketenagakerjaan = int(rng.random() < 0.9)
+        name = f"BENCH-EMP-{index:06d}"
+        base_salary = round(level * rng.uniform(0.8, 1.2), -3)
+        rows.append(
+            frappe._dict(
+                name=name,
+                employee_name=f"Benchmark Employee {index}",
+                company=BENCHMARK_COMPANY,
+                status_pajak=_weighted(rng, PTKP_STATUS_WEIGHTS),
+                base_salary=base_salary,
+                gross_salary=base_salary,
+                ikut_bpjs_kesehatan=kesehatan,
+                ikut_bpjs_ketenagakerjaan=ketenagakerjaan,
+                bpjs_kesehatan_id=f"KES{index:010d}" if kesehatan else "",
+                bpjs_ketenagakerjaan_id=f"TK{index:011d}" if ketenagakerjaan else "",
+            )
+        )
+
+    dataset = SyntheticDataset(rows, year, seed, config)
+
+    # Year totals used by the grouped December queries
+    for emp, months in dataset.iter_monthly():
+        before_december = [m for m in months if m.month < DECEMBER_MONTH]
+        december = months[DECEMBER_MONTH - 1]
+        emp.update(
+            {
+                "ytd_gross": sum(m.gross_pay for m in before_december),
+                "ytd_bpjs": sum(m.bpjs_deductions for m in before_december),
+                "ytd_pph21": sum(m.tax_amount for m in before_december),
+                "december_gross": december.gross_pay,
+                "december_bpjs": december.bpjs_deductions,
+                "december_slip": december.salary_slip,
+            }
+        )
+
+    return dataset
@@ -790,6 +790,12 @@ class BPJSSettings(Document):
         """
         Update BPJS components in active salary structures
         with proper handling of submitted documents
+
+        The update runs set-based in a background job, submitted structures
+        are left for manual amendment.
+
+        Returns:
+            dict: job_id and whether the job was queued
         """
         try:
             debug_log("Starting update_salary_structures method", "BPJS Settings")
@@ -843,125 +849,18 @@ class BPJSSettings(Document):
                     "BPJS JKM": self.jkm_percent,
                 }
 
-            # Count statistics
-            updated_count = 0
-            submitted_count = 0
-            skipped_count = 0
-            error_count = 0
-
-            # Update each salary structure
-            for structure in salary_structures:
-                try:
-                    # Different handling based on docstatus
-                    if structure.docstatus == 1:  # Submitted
-                        debug_log(
-                            f"Salary structure {structure.name} is submitted, using alternative update method",
-                            "BPJS Settings",
-                        )
-
-                        # For submitted structures, we need to create amendment rather than direct updates
-                        # Instead, we'll just log this for manual follow-up
-                        submitted_count += 1
-                        continue
-
-                    # For draft structures, proceed with normal updates
-                    ss = frappe.get_doc("Salary Structure", structure.name)
-                    debug_log(
-                        f"Processing salary structure: {structure.name} (draft)", "BPJS Settings"
-                    )
-
-                    # Flag to check if changes were made
-                    changes_made = False
-
-                    # Track missing components
-                    missing_components = []
-
-                    # Update each component
-                    for component_name, percent in bpjs_components.items():
-                        # Check in earnings
-                        found = False
-                        for detail in ss.earnings:
-                            if detail.salary_component == component_name:
-                                found = True
-                                if detail.amount_based_on_formula and detail.formula:
-                                    debug_log(
-                                        f"Component {component_name} uses custom formula, skipping",
-                                        "BPJS Settings",
-                                    )
-                                    continue
-
-                                # Update rate if needed
-                                if detail.amount != percent:
-                                    debug_log(
-                                        f"Updating {component_name} in earnings from {detail.amount} to {percent}",
-                                        "BPJS Settings",
-                                    )
-                                    detail.amount = percent
-                                    changes_made = True
-                                break
-
-                        if not found:
-                            # Check in deductions
-                            for detail in ss.deductions:
-                                if detail.salary_component == component_name:
-                                    found = True
-                                    if detail.amount_based_on_formula and detail.formula:
-                                        debug_log(
-                                            f"Component {component_name} uses custom formula, skipping",
-                                            "BPJS Settings",
-                                        )
-                                        continue
-
-                                    # Update rate if needed
-                                    if detail.amount != percent:
-                                        debug_log(
-                                            f"Updating {component_name} in deductions from {detail.amount} to {percent}",
-                                            "BPJS Settings",
-                                        )
-                                        detail.amount = percent
-                                        changes_made = True
-                                    break
-
-                        if not found:
-                            missing_components.append(component_name)
-
-                    # Log warning about missing components
-                    if missing_components:
-                        debug_log(
-                            f"Salary Structure {structure.name} missing BPJS components: {', '.join(missing_components)}",
-                            "BPJS Settings",
-                        )
-                        skipped_count += 1
-
-                    # Save if changes were made
-                    if changes_made:
-                        ss.flags.ignore_validate = True
-                        ss.flags.ignore_mandatory = True
-                        ss.save(ignore_permissions=True)
-                        updated_count += 1
-                        debug_log(f"Saved changes to {structure.name}", "BPJS Settings")
-
-                except Exception as e:
-                    error_count += 1
-                    frappe.log_error(
-                        f"Error updating salary structure {structure.name}: {str(e)}\n\n"
-                        f"Traceback: {frappe.get_traceback()}",
-                        "BPJS Update Error",
-                    )
-                    debug_log(
-                        f"Error updating {structure.name}: {str(e)}", "BPJS Settings", trace=True
-                    )
-                    continue
+            # Apply the changes set-based in a background job
+            from payroll_indonesia.utilities.structure_mass_update import (
+                enqueue_structure_mass_update,
+            )
 
-            # Log summary
+            job = enqueue_structure_mass_update(["bpjs_rates"], bpjs_rates=bpjs_components)
             debug_log(
-                f"Salary Structure Update Summary: "
-                f"Updated: {updated_count}, "
-                f"Submitted (skipped): {submitted_count}, "
-                f"Missing components: {skipped_count}, "
-                f"Errors: {error_count}",
+                f"Salary structure BPJS update {'queued' if job['queued'] else 'already running'}: "
+                f"{job['job_id']}",
                 "BPJS Settings",
             )
+            return job
 
         except Exception as e:
             frappe.log_error(
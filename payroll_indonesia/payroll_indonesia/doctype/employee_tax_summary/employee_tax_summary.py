@@ -8,7 +8,6 @@ import frappe
 from frappe import _
 from frappe.model.document import Document
 from frappe.utils import flt, getdate, cint
-from frappe.utils.background_jobs import get_jobs
 
 # Import centralized validator functions
 from payroll_indonesia.utilities.salary_slip_validator import (
@@ -16,22 +15,29 @@ from payroll_indonesia.utilities.salary_slip_validator import (
     debug_log,
     check_salary_slip_cancellation,
 )
+from payroll_indonesia.utilities.job_registry import is_job_claimed
+from payroll_indonesia.utilities.read_replica import replica_reads
 
 
 def is_job_already_queued(job_name, queue="default"):
     """
-    Check if a job with the specified name is already queued
+    Check if a job with the specified name is already queued or running
+
+    Looks up the job registry claim instead of scanning the queue. The job
+    currently executing in this worker is not counted, so a registered job
+    does not skip its own work.
 
     Args:
         job_name: The name of the job to check
-        queue: The queue to check (default, long, short)
+        queue: Kept for backward compatibility, claims are global per job name
 
     Returns:
         bool: True if the job is already queued, False otherwise
     """
     try:
-        jobs = get_jobs(site=frappe.local.site, queue=queue)
-        return any(job.get("kwargs", {}).get("job_name") == job_name for job in jobs)
+        if frappe.flags.get("current_registered_job") == job_name:
+            return False
+        return is_job_claimed(job_name)
     except Exception as e:
         frappe.log_error(
             f"Error checking if job {job_name} is queued: {str(e)}", "Job Queue Check Error"
@@ -213,12 +219,14 @@ class EmployeeTaxSummary(Document):
             )
             frappe.throw(_("Error calculating year-to-date tax amount: {0}").format(str(e)))
 
-    def add_monthly_data(self, salary_slip):
+    def add_monthly_data(self, salary_slip, save=True):
         """
         Add or update monthly tax data from salary slip with improved error handling
 
         Args:
             salary_slip: The salary slip document to get tax data from
+            save: Whether to save the summary right away. Bulk callers applying
+                several slips pass False and save once at the end.
         """
         try:
             # Validate salary slip
@@ -253,6 +261,9 @@ class EmployeeTaxSummary(Document):
                 # Add new month
                 self._add_new_month(month, salary_slip.name, tax_data)
 
+            if not save:
+                return
+
             # Recalculate YTD
             self.calculate_ytd_from_monthly()
 
@@ -569,6 +580,11 @@ class EmployeeTaxSummary(Document):
 
     def on_update(self):
         """Actions after updating tax summary"""
+        # Drop a cached "no summary yet" for this employee and year
+        from payroll_indonesia.payroll_indonesia.utils import get_tax_summary_name
+
+        get_tax_summary_name.invalidate(self.employee, self.year)
+
         try:
             # Update title if not set
             if not self.title:
@@ -972,34 +988,37 @@ def get_tax_summary_stats(employee=None, year=None):
             except (ValueError, TypeError):
                 return {"status": "error", "message": f"Invalid year value: {year}"}
 
-        # Get count of tax summaries
-        total_summaries = frappe.db.count("Employee Tax Summary", filters)
+        with replica_reads():
+            # Get count of tax summaries
+            total_summaries = frappe.db.count("Employee Tax Summary", filters)
 
-        # Get total tax paid
-        total_tax = 0
-        if total_summaries > 0:
-            summaries = frappe.get_all("Employee Tax Summary", filters=filters, fields=["ytd_tax"])
-            for summary in summaries:
-                total_tax += flt(summary.ytd_tax)
-
-        # Get stats by year if no specific year was requested
-        year_stats = []
-        if not year:
-            years = frappe.db.sql(
-                """
-                SELECT DISTINCT year
-                FROM `tabEmployee Tax Summary`
-                ORDER BY year DESC
-            """,
-                as_dict=True,
-            )
+            # Get total tax paid
+            total_tax = 0
+            if total_summaries > 0:
+                summaries = frappe.get_all(
+                    "Employee Tax Summary", filters=filters, fields=["ytd_tax"]
+                )
+                for summary in summaries:
+                    total_tax += flt(summary.ytd_tax)
+
+            # Get stats by year if no specific year was requested
+            year_stats = []
+            if not year:
+                years = frappe.db.sql(
+                    """
+                    SELECT DISTINCT year
+                    FROM `tabEmployee Tax Summary`
+                    ORDER BY year DESC
+                """,
+                    as_dict=True,
+                )
 
-            for yr in years:
-                yr_filters = dict(filters)
-                yr_filters["year"] = yr.year
-                year_count = frappe.db.count("Employee Tax Summary", yr_filters)
+                for yr in years:
+                    yr_filters = dict(filters)
+                    yr_filters["year"] = yr.year
+                    year_count = frappe.db.count("Employee Tax Summary", yr_filters)
 
-                year_stats.append({"year": yr.year, "count": year_count})
+                    year_stats.append({"year": yr.year, "count": year_count})
 
         return {
             "status": "success",
@@ -25,6 +25,7 @@ from frappe.utils import flt, now, cint
 from payroll_indonesia.payroll_indonesia.tax.pph_ter import (
     validate_ter_data_availability,
     map_ptkp_to_ter_category,
+    sync_ter_table,
 )
 
 
@@ -329,39 +330,32 @@ class PayrollIndonesiaSettings(Document):
 
         # Proceed with normal sync if table is not empty
         try:
-            # Track sync status
-            success_count = 0
+            # Collect the brackets of every category, then sync them in bulk
+            rates_by_category = {}
             error_count = 0
-
-            # Sync TER A rates
-            if self.ter_rate_ter_a_json:
+            for category, fieldname in (
+                ("TER A", "ter_rate_ter_a_json"),
+                ("TER B", "ter_rate_ter_b_json"),
+                ("TER C", "ter_rate_ter_c_json"),
+            ):
+                if not self.get(fieldname):
+                    continue
                 try:
-                    ter_a_rates = json.loads(self.ter_rate_ter_a_json)
-                    success_a = self._sync_ter_category_rates("TER A", ter_a_rates)
-                    success_count += success_a
+                    rates = json.loads(self.get(fieldname))
+                    if isinstance(rates, list):
+                        rates_by_category[category] = rates
                 except Exception as e:
                     error_count += 1
-                    frappe.log_error(f"Error syncing TER A rates: {str(e)}", "TER Sync Error")
+                    frappe.log_error(f"Error parsing {category} rates: {str(e)}", "TER Sync Error")
 
-            # Sync TER B rates
-            if self.ter_rate_ter_b_json:
-                try:
-                    ter_b_rates = json.loads(self.ter_rate_ter_b_json)
-                    success_b = self._sync_ter_category_rates("TER B", ter_b_rates)
-                    success_count += success_b
-                except Exception as e:
+            if rates_by_category:
+                result = sync_ter_table(rates_by_category)
+                if result["invalid"]:
                     error_count += 1
-                    frappe.log_error(f"Error syncing TER B rates: {str(e)}", "TER Sync Error")
-
-            # Sync TER C rates
-            if self.ter_rate_ter_c_json:
-                try:
-                    ter_c_rates = json.loads(self.ter_rate_ter_c_json)
-                    success_c = self._sync_ter_category_rates("TER C", ter_c_rates)
-                    success_count += success_c
-                except Exception as e:
-                    error_count += 1
-                    frappe.log_error(f"Error syncing TER C rates: {str(e)}", "TER Sync Error")
+                    frappe.log_error(
+                        f"Skipped {result['invalid']} invalid TER brackets during sync",
+                        "TER Rate Sync Error",
+                    )
 
             # Log sync results if performed through forced sync
             if force_sync:
@@ -387,59 +381,13 @@ class PayrollIndonesiaSettings(Document):
             rates: List of rate dictionaries
 
         Returns:
-            int: Number of successfully synced records
+            int: Number of inserted or updated records
         """
         if not isinstance(rates, list):
             return 0
 
-        success_count = 0
-        for rate_data in rates:
-            try:
-                # Skip invalid entries
-                if not isinstance(rate_data, dict):
-                    continue
-
-                income_from = flt(rate_data.get("income_from", 0))
-                income_to = flt(rate_data.get("income_to", 0))
-                rate = flt(rate_data.get("rate", 0))
-                is_highest_bracket = bool(rate_data.get("is_highest_bracket", 0))
-
-                filters = {
-                    "status_pajak": category,
-                    "income_from": income_from,
-                    "income_to": income_to,
-                }
-
-                if frappe.db.exists("PPh 21 TER Table", filters):
-                    # Update existing record
-                    ter_doc = frappe.get_doc("PPh 21 TER Table", filters)
-                    ter_doc.rate = rate
-                    ter_doc.is_highest_bracket = is_highest_bracket
-                    ter_doc.flags.ignore_permissions = True
-                    ter_doc.save()
-                    success_count += 1
-                else:
-                    # Create new record
-                    ter_doc = frappe.new_doc("PPh 21 TER Table")
-                    ter_doc.update(
-                        {
-                            "status_pajak": category,
-                            "income_from": income_from,
-                            "income_to": income_to,
-                            "rate": rate,
-                            "is_highest_bracket": is_highest_bracket,
-                            "description": self._build_ter_description(category, rate_data),
-                        }
-                    )
-                    ter_doc.flags.ignore_permissions = True
-                    ter_doc.insert()
-                    success_count += 1
-            except Exception as e:
-                frappe.log_error(
-                    f"Error syncing TER rate record for {category}: {str(e)}", "TER Rate Sync Error"
-                )
-
-        return success_count
+        result = sync_ter_table({category: rates})
+        return result["inserted"] + result["updated"]
 
     def _build_ter_description(self, status: str, rate_data: Dict) -> str:
         """
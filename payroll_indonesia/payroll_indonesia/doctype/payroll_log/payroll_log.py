@@ -19,4 +19,7 @@ class PayrollLog(Document):
 
     def set_title(self):
         """Set document title"""
-        self.title = f"{self.employee_name} - {self.posting_date}"
+        if self.log_type == "Cache Metrics":
+            self.title = f"Cache Metrics - {self.log_time}"
+        else:
+            self.title = f"{self.employee_name} - {self.posting_date}"
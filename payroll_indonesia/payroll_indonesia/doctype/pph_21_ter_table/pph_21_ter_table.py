@@ -12,6 +12,12 @@ from frappe.utils import flt, cint
 # Import utility functions
 from payroll_indonesia.payroll_indonesia.utils import debug_log
 
+TER_CATEGORY_EXPLANATIONS = {
+    "TER A": "PTKP TK/0 (Rp 54 juta/tahun)",
+    "TER B": "PTKP K/0, TK/1 (Rp 58,5 juta/tahun)",
+    "TER C": "PTKP K/1, TK/2, K/2, TK/3, K/3, dst (Rp 63 juta+/tahun)",
+}
+
 
 class PPh21TERTable(Document):
     def validate(self):
@@ -103,39 +109,13 @@ class PPh21TERTable(Document):
 
     def generate_description(self):
         """Set the description automatically with proper formatting"""
-        # Get TER category explanation
-        ter_explanation = self.get_ter_category_explanation()
-
-        # Generate the income range part of the description
-        if self.income_from == 0:
-            # Starting from 0
-            if self.income_to > 0:
-                income_range = f"≤ Rp{format_currency(self.income_to)}"
-            else:
-                # This shouldn't happen (income_from=0, income_to=0)
-                income_range = f"Rp{format_currency(self.income_from)}"
-        elif self.income_to == 0 or self.is_highest_bracket:
-            # Highest bracket
-            income_range = f"> Rp{format_currency(self.income_from)}"
-        else:
-            # Regular range
-            income_range = (
-                f"Rp{format_currency(self.income_from)}-Rp{format_currency(self.income_to)}"
-            )
-
-        # Set the description
-        self.description = (
-            f"{self.status_pajak}: {ter_explanation}, {income_range}, Tarif: {self.rate}%"
+        self.description = build_ter_description(
+            self.status_pajak, self.income_from, self.income_to, self.rate, self.is_highest_bracket
         )
 
     def get_ter_category_explanation(self):
         """Get explanation for TER category"""
-        explanations = {
-            "TER A": "PTKP TK/0 (Rp 54 juta/tahun)",
-            "TER B": "PTKP K/0, TK/1 (Rp 58,5 juta/tahun)",
-            "TER C": "PTKP K/1, TK/2, K/2, TK/3, K/3, dst (Rp 63 juta+/tahun)",
-        }
-        return explanations.get(self.status_pajak, "")
+        return TER_CATEGORY_EXPLANATIONS.get(self.status_pajak, "")
 
     def before_save(self):
         """
@@ -149,6 +129,50 @@ class PPh21TERTable(Document):
         if not self.description:
             self.generate_description()
 
+    def on_update(self):
+        """Retire cached TER rates once the edited row is committed"""
+        self.queue_ter_version_bump()
+
+    def on_trash(self):
+        """Retire cached TER rates once the deletion is committed"""
+        self.queue_ter_version_bump()
+
+    def queue_ter_version_bump(self):
+        """
+        Bump the TER table version after the transaction commits, so workers
+        never re-cache the old rates in between. The version also feeds the
+        salary slip input fingerprint.
+        """
+        from payroll_indonesia.payroll_indonesia.tax.pph_ter import bump_ter_table_version
+
+        frappe.db.after_commit.add(bump_ter_table_version)
+
+
+def build_ter_description(status_pajak, income_from, income_to, rate, is_highest_bracket=0):
+    """Build the description of a TER bracket, shared with the bulk TER sync"""
+    income_from = flt(income_from)
+    income_to = flt(income_to)
+
+    # Get TER category explanation
+    ter_explanation = TER_CATEGORY_EXPLANATIONS.get(status_pajak, "")
+
+    # Generate the income range part of the description
+    if income_from == 0:
+        # Starting from 0
+        if income_to > 0:
+            income_range = f"≤ Rp{format_currency(income_to)}"
+        else:
+            # This shouldn't happen (income_from=0, income_to=0)
+            income_range = f"Rp{format_currency(income_from)}"
+    elif income_to == 0 or is_highest_bracket:
+        # Highest bracket
+        income_range = f"> Rp{format_currency(income_from)}"
+    else:
+        # Regular range
+        income_range = f"Rp{format_currency(income_from)}-Rp{format_currency(income_to)}"
+
+    return f"{status_pajak}: {ter_explanation}, {income_range}, Tarif: {rate}%"
+
 
 def format_currency(amount):
     """Format amount as currency with proper thousand separators"""
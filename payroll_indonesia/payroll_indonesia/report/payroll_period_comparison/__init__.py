@@ -0,0 +1 @@
+# This file marks the payroll_period_comparison report directory as a Python package
@@ -0,0 +1,89 @@
+// Copyright (c) 2025, PT. Innovasi Terbaik Bangsa and contributors
+// For license information, please see license.txt
+
+frappe.query_reports["Payroll Period Comparison"] = {
+    filters: [
+        {
+            fieldname: "company",
+            label: __("Company"),
+            fieldtype: "Link",
+            options: "Company",
+            default: frappe.defaults.get_user_default("Company")
+        },
+        {
+            fieldname: "from_date",
+            label: __("From Date"),
+            fieldtype: "Date",
+            reqd: 1,
+            default: frappe.datetime.month_start(frappe.datetime.add_months(frappe.datetime.get_today(), -1))
+        },
+        {
+            fieldname: "to_date",
+            label: __("To Date"),
+            fieldtype: "Date",
+            reqd: 1,
+            default: frappe.datetime.month_end(frappe.datetime.add_months(frappe.datetime.get_today(), -1))
+        },
+        {
+            fieldname: "previous_from_date",
+            label: __("Previous From Date"),
+            fieldtype: "Date",
+            description: __("Defaults to one month before From Date")
+        },
+        {
+            fieldname: "previous_to_date",
+            label: __("Previous To Date"),
+            fieldtype: "Date",
+            description: __("Defaults to one month before To Date")
+        },
+        {
+            fieldname: "gross_threshold",
+            label: __("Gross Change %"),
+            fieldtype: "Float",
+            default: 10
+        },
+        {
+            fieldname: "bpjs_threshold",
+            label: __("BPJS Change %"),
+            fieldtype: "Float",
+            default: 10
+        },
+        {
+            fieldname: "pph21_threshold",
+            label: __("PPh 21 Change %"),
+            fieldtype: "Float",
+            default: 20
+        },
+        {
+            fieldname: "min_change",
+            label: __("Minimum Change Amount"),
+            fieldtype: "Currency",
+            default: 50000
+        },
+        {
+            fieldname: "only_flagged",
+            label: __("Only Flagged"),
+            fieldtype: "Check",
+            default: 1
+        }
+    ],
+
+    onload: function(report) {
+        report.page.add_inner_button(__("Export CSV"), function() {
+            const url = "/api/method/payroll_indonesia.payroll_indonesia.report."
+                + "payroll_period_comparison.payroll_period_comparison.export_payroll_comparison_csv";
+            window.open(url + "?" + $.param({filters: JSON.stringify(report.get_values())}));
+        });
+    },
+
+    formatter: function(value, row, column, data, default_formatter) {
+        value = default_formatter(value, row, column, data);
+        if (data && column.fieldname === "status") {
+            const colors = {"New": "blue", "Left": "red", "Changed": "orange"};
+            if (colors[data.status]) {
+                value = `<span style="color: var(--${colors[data.status]}-600)">${value}</span>`;
+            }
+        }
+        return value;
+    }
+};
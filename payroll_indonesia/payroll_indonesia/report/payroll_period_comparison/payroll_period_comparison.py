@@ -0,0 +1,448 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025, PT. Innovasi Terbaik Bangsa and contributors
+# For license information, please see license.txt
+
+"""
+Payroll Period Comparison report.
+
+Compares the submitted salary slips of two periods for every employee at
+once. Each period is read with a single grouped query (gross pay, BPJS
+employee deductions, PPh 21 and TER category per employee) and the two
+result sets are joined in memory on employee. Changes above the configured
+thresholds are flagged, as are employees paid in only one of the periods.
+
+This replaces reviewing a payroll run slip by slip with diagnose_salary_slip.
+export_payroll_comparison_csv streams the same rows as CSV.
+"""
+
+import csv
+import io
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import frappe
+from frappe import _
+from frappe.utils import add_months, cint, flt, get_first_day, get_last_day, getdate
+
+from payroll_indonesia.payroll_indonesia.tax.december_correction import BPJS_EMPLOYEE_COMPONENTS
+from payroll_indonesia.utilities.read_replica import replica_reads
+
+REPORT_NAME = "Payroll Period Comparison"
+
+# Default thresholds: percent change per metric and minimum absolute change
+DEFAULT_THRESHOLDS = {
+    "gross_threshold": 10.0,
+    "bpjs_threshold": 10.0,
+    "pph21_threshold": 20.0,
+    "min_change": 50000.0,
+}
+
+METRICS = (
+    ("gross_pay", "gross_threshold", "Gross"),
+    ("bpjs", "bpjs_threshold", "BPJS"),
+    ("pph21", "pph21_threshold", "PPh 21"),
+)
+
+STATUS_NEW = "New"
+STATUS_LEFT = "Left"
+STATUS_CHANGED = "Changed"
+STATUS_UNCHANGED = "Unchanged"
+
+CSV_CHUNK_SIZE = 500
+
+PERIOD_QUERY = """
+    SELECT
+        ss.employee,
+        MAX(ss.employee_name) AS employee_name,
+        MAX(ss.department) AS department,
+        COUNT(*) AS slip_count,
+        SUM(ss.gross_pay) AS gross_pay,
+        SUM(COALESCE(d.bpjs, 0)) AS bpjs,
+        SUM(COALESCE(d.pph21, 0)) AS pph21,
+        MAX(ss.ter_category) AS ter_category
+    FROM `tabSalary Slip` ss
+    LEFT JOIN (
+        SELECT
+            sd.parent,
+            SUM(CASE WHEN sd.salary_component IN %(bpjs_components)s
+                THEN sd.amount ELSE 0 END) AS bpjs,
+            SUM(CASE WHEN sd.salary_component = 'PPh 21'
+                THEN sd.amount ELSE 0 END) AS pph21
+        FROM `tabSalary Detail` sd
+        INNER JOIN `tabSalary Slip` s ON s.name = sd.parent
+        WHERE s.docstatus = 1
+            AND s.start_date BETWEEN %(from_date)s AND %(to_date)s
+            AND sd.parenttype = 'Salary Slip'
+            AND sd.parentfield = 'deductions'
+            AND sd.salary_component IN %(components)s
+        GROUP BY sd.parent
+    ) d ON d.parent = ss.name
+    WHERE ss.docstatus = 1
+        AND ss.start_date BETWEEN %(from_date)s AND %(to_date)s
+        {company_condition}
+    GROUP BY ss.employee
+"""
+
+
+def execute(filters: Optional[Dict[str, Any]] = None) -> Tuple:
+    """
+    Run the report
+
+    Args:
+        filters: Report filters
+
+    Returns:
+        tuple: Columns, data, message, chart and report summary
+    """
+    filters = frappe._dict(filters or {})
+    data = get_comparison_rows(filters)
+    return get_columns(), data, None, None, get_report_summary(data)
+
+
+def get_columns() -> List[Dict[str, Any]]:
+    """Report columns, also used as the CSV header."""
+    columns = [
+        {
+            "label": _("Employee"),
+            "fieldname": "employee",
+            "fieldtype": "Link",
+            "options": "Employee",
+            "width": 120,
+        },
+        {
+            "label": _("Employee Name"),
+            "fieldname": "employee_name",
+            "fieldtype": "Data",
+            "width": 160,
+        },
+        {
+            "label": _("Department"),
+            "fieldname": "department",
+            "fieldtype": "Link",
+            "options": "Department",
+            "width": 120,
+        },
+        {"label": _("Status"), "fieldname": "status", "fieldtype": "Data", "width": 90},
+    ]
+    for metric, _threshold, label in METRICS:
+        columns += [
+            {
+                "label": _("Previous {0}").format(_(label)),
+                "fieldname": f"previous_{metric}",
+                "fieldtype": "Currency",
+                "width": 130,
+            },
+            {
+                "label": _("Current {0}").format(_(label)),
+                "fieldname": f"current_{metric}",
+                "fieldtype": "Currency",
+                "width": 130,
+            },
+            {
+                "label": _("{0} Change %").format(_(label)),
+                "fieldname": f"{metric}_change_percent",
+                "fieldtype": "Percent",
+                "width": 100,
+            },
+        ]
+    columns += [
+        {
+            "label": _("Previous TER Category"),
+            "fieldname": "previous_ter_category",
+            "fieldtype": "Data",
+            "width": 110,
+        },
+        {
+            "label": _("Current TER Category"),
+            "fieldname": "current_ter_category",
+            "fieldtype": "Data",
+            "width": 110,
+        },
+        {"label": _("Flags"), "fieldname": "flags", "fieldtype": "Data", "width": 300},
+    ]
+    return columns
+
+
+def get_periods(filters: Dict[str, Any]) -> Tuple[Tuple[Any, Any], Tuple[Any, Any]]:
+    """
+    Current and previous period from the filters
+
+    The current period defaults to last month. The previous period defaults
+    to the current one shifted back a month, ending on the month's last day
+    when the current period does.
+
+    Returns:
+        tuple: ((from_date, to_date), (from_date, to_date))
+    """
+    if filters.get("from_date"):
+        from_date = getdate(filters.get("from_date"))
+    else:
+        from_date = get_first_day(add_months(getdate(), -1))
+    to_date = getdate(filters.get("to_date") or get_last_day(from_date))
+    if to_date < from_date:
+        frappe.throw(_("To Date cannot be before From Date"))
+
+    if filters.get("previous_from_date"):
+        previous_from = getdate(filters.get("previous_from_date"))
+    else:
+        previous_from = getdate(add_months(from_date, -1))
+
+    if filters.get("previous_to_date"):
+        previous_to = getdate(filters.get("previous_to_date"))
+    elif to_date == getdate(get_last_day(to_date)):
+        previous_to = getdate(get_last_day(add_months(to_date, -1)))
+    else:
+        previous_to = getdate(add_months(to_date, -1))
+
+    return (from_date, to_date), (previous_from, previous_to)
+
+
+def get_thresholds(filters: Dict[str, Any]) -> Dict[str, float]:
+    """Thresholds from the filters, falling back to DEFAULT_THRESHOLDS."""
+    return {
+        key: flt(filters.get(key)) if filters.get(key) not in (None, "") else default
+        for key, default in DEFAULT_THRESHOLDS.items()
+    }
+
+
+def get_period_totals(from_date: Any, to_date: Any, company: Optional[str] = None) -> Dict:
+    """
+    Per-employee totals of submitted salary slips in a period
+
+    Args:
+        from_date: First slip start date
+        to_date: Last slip start date
+        company: Restrict to one company (optional)
+
+    Returns:
+        dict: Employee ID to a row with employee_name, department,
+            slip_count, gross_pay, bpjs, pph21 and ter_category
+    """
+    values = {
+        "from_date": from_date,
+        "to_date": to_date,
+        "bpjs_components": BPJS_EMPLOYEE_COMPONENTS,
+        "components": BPJS_EMPLOYEE_COMPONENTS + ("PPh 21",),
+    }
+    company_condition = ""
+    if company:
+        company_condition = "AND ss.company = %(company)s"
+        values["company"] = company
+
+    totals = {}
+    with frappe.db.unbuffered_cursor():
+        for row in frappe.db.sql(
+            PERIOD_QUERY.format(company_condition=company_condition),
+            values,
+            as_dict=1,
+            as_iterator=True,
+        ):
+            totals[row.employee] = row
+    return totals
+
+
+def _change_percent(previous: float, current: float) -> Optional[float]:
+    if not previous:
+        return None
+    return flt((current - previous) / abs(previous) * 100, 2)
+
+
+def compare_periods(
+    current: Dict[str, Any], previous: Dict[str, Any], thresholds: Dict[str, float]
+) -> List[Dict[str, Any]]:
+    """
+    Join two periods' totals on employee and flag the differences
+
+    A metric is flagged when its absolute change reaches min_change and its
+    percent change reaches the metric's threshold (or it was zero before).
+    TER category changes and employees paid in only one period are always
+    flagged.
+
+    Args:
+        current: Result of get_period_totals for the current period
+        previous: Result of get_period_totals for the previous period
+        thresholds: Thresholds as in DEFAULT_THRESHOLDS
+
+    Returns:
+        list: One row per employee, sorted by employee
+    """
+    min_change = flt(thresholds.get("min_change"))
+    rows = []
+
+    for employee in sorted(set(current) | set(previous)):
+        cur = current.get(employee)
+        prev = previous.get(employee)
+        source = cur or prev
+        row = {
+            "employee": employee,
+            "employee_name": source.get("employee_name"),
+            "department": source.get("department"),
+            "previous_ter_category": (prev or {}).get("ter_category") or "",
+            "current_ter_category": (cur or {}).get("ter_category") or "",
+        }
+        flags = []
+
+        if not prev:
+            row["status"] = STATUS_NEW
+            flags.append(_("No slip in previous period"))
+        elif not cur:
+            row["status"] = STATUS_LEFT
+            flags.append(_("No slip in current period"))
+
+        for metric, threshold_key, label in METRICS:
+            previous_value = flt((prev or {}).get(metric), 2)
+            current_value = flt((cur or {}).get(metric), 2)
+            change_percent = _change_percent(previous_value, current_value)
+            row[f"previous_{metric}"] = previous_value
+            row[f"current_{metric}"] = current_value
+            row[f"{metric}_change_percent"] = change_percent
+
+            if not (cur and prev) or abs(current_value - previous_value) < min_change:
+                continue
+            if change_percent is None or abs(change_percent) >= thresholds[threshold_key]:
+                change = f"{change_percent:+.1f}%" if change_percent is not None else _("new")
+                flags.append(f"{_(label)} {change}")
+
+        if cur and prev and row["previous_ter_category"] != row["current_ter_category"]:
+            flags.append(
+                _("TER {0} → {1}").format(
+                    row["previous_ter_category"] or "-", row["current_ter_category"] or "-"
+                )
+            )
+
+        if "status" not in row:
+            row["status"] = STATUS_CHANGED if flags else STATUS_UNCHANGED
+        row["flags"] = ", ".join(flags)
+        row["is_flagged"] = 1 if flags else 0
+        rows.append(row)
+
+    return rows
+
+
+def get_comparison_rows(filters: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Comparison rows for the report filters
+
+    Args:
+        filters: Report filters (company, from_date, to_date,
+            previous_from_date, previous_to_date, the thresholds and
+            only_flagged)
+
+    Returns:
+        list: Rows as returned by compare_periods
+    """
+    (from_date, to_date), (previous_from, previous_to) = get_periods(filters)
+    company = filters.get("company")
+
+    with replica_reads():
+        current = get_period_totals(from_date, to_date, company)
+        previous = get_period_totals(previous_from, previous_to, company)
+
+    rows = compare_periods(current, previous, get_thresholds(filters))
+    if cint(filters.get("only_flagged")):
+        rows = [row for row in rows if row["is_flagged"]]
+    return rows
+
+
+def get_report_summary(data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Employee counts per status and total gross of both periods."""
+    counts = {}
+    for row in data:
+        counts[row["status"]] = counts.get(row["status"], 0) + 1
+
+    summary = [
+        {
+            "value": sum(row["is_flagged"] for row in data),
+            "label": _("Flagged Employees"),
+            "datatype": "Int",
+            "indicator": "Orange",
+        },
+    ]
+    for status, indicator in (
+        (STATUS_NEW, "Blue"),
+        (STATUS_LEFT, "Red"),
+        (STATUS_CHANGED, "Orange"),
+    ):
+        summary.append(
+            {
+                "value": counts.get(status, 0),
+                "label": _(status),
+                "datatype": "Int",
+                "indicator": indicator,
+            }
+        )
+    for prefix, label in (("previous", _("Previous Gross")), ("current", _("Current Gross"))):
+        summary.append(
+            {
+                "value": sum(row[f"{prefix}_gross_pay"] for row in data),
+                "label": label,
+                "datatype": "Currency",
+            }
+        )
+    return summary
+
+
+def iter_csv_chunks(
+    columns: List[Dict[str, Any]], rows: List[Dict[str, Any]], chunk_size: int = CSV_CHUNK_SIZE
+) -> Iterator[str]:
+    """
+    Serialize rows as CSV text, chunk_size rows at a time
+
+    Args:
+        columns: Report columns, for the header and field order
+        rows: Report rows
+
+    Yields:
+        str: CSV text of the header or of up to chunk_size rows
+    """
+    fieldnames = [column["fieldname"] for column in columns]
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([column["label"] for column in columns])
+
+    for index, row in enumerate(rows, 1):
+        writer.writerow(
+            ["" if row.get(fieldname) is None else row.get(fieldname) for fieldname in fieldnames]
+        )
+        if index % chunk_size == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+@frappe.whitelist()
+def export_payroll_comparison_csv(filters: Optional[str] = None):
+    """
+    Download the comparison as CSV
+
+    The rows are computed before the response starts; the CSV text is
+    generated and sent chunk by chunk.
+
+    Args:
+        filters: Report filters as JSON
+
+    Returns:
+        Response: Streaming CSV response
+    """
+    from werkzeug.wrappers import Response
+
+    if not frappe.get_doc("Report", REPORT_NAME).is_permitted():
+        frappe.throw(
+            _("Not permitted to view report {0}").format(REPORT_NAME), frappe.PermissionError
+        )
+
+    filters = frappe._dict(
+        frappe.parse_json(filters) if isinstance(filters, str) else filters or {}
+    )
+    rows = get_comparison_rows(filters)
+    (from_date, to_date), _previous = get_periods(filters)
+    file_name = f"payroll_comparison_{from_date}_{to_date}.csv"
+
+    return Response(
+        iter_csv_chunks(get_columns(), rows),
+        mimetype="text/csv",
+        headers={"Content-Disposition": f'attachment; filename="{file_name}"'},
+        direct_passthrough=True,
+    )
@@ -11,6 +11,7 @@ from payroll_indonesia.payroll_indonesia.utils import get_ptkp_settings
 
 # Import necessary functions for TER mapping
 from payroll_indonesia.override.salary_slip.ter_calculator import map_ptkp_to_ter_category
+from payroll_indonesia.payroll_indonesia.tax.progressive_tax import get_default_bracket_table
 
 
 def hitung_pph_tahunan(employee, tahun_pajak):
@@ -383,53 +384,21 @@ def calculate_progressive_tax(pkp):
         tuple: (total tax, list of tax details by bracket)
     """
     try:
-        # Progressive tax brackets according to UU HPP
-        brackets = [
-            {"from": 0, "to": 60000000, "rate": 0.05},
-            {"from": 60000000, "to": 250000000, "rate": 0.15},
-            {"from": 250000000, "to": 500000000, "rate": 0.25},
-            {"from": 500000000, "to": 5000000000, "rate": 0.30},
-            {"from": 5000000000, "to": float("inf"), "rate": 0.35},
+        # Progressive tax brackets according to UU HPP, compiled once
+        table = get_default_bracket_table()
+
+        total_tax = table.tax(pkp)
+        tax_details = [
+            {
+                "from": d["from"],
+                "to": d["to"],
+                "rate": d["rate"] / 100,
+                "taxable": d["taxable"],
+                "tax": d["tax"],
+            }
+            for d in table.breakdown(pkp)
         ]
 
-        remaining_pkp = pkp
-        total_tax = 0
-        tax_details = []
-
-        for bracket in brackets:
-            bracket_from = flt(bracket["from"])
-            bracket_to = flt(bracket["to"])
-            bracket_rate = flt(bracket["rate"])
-
-            if remaining_pkp <= 0:
-                break
-
-            # Calculate taxable amount in this bracket
-            if bracket_to == float("inf"):
-                taxable = remaining_pkp
-            else:
-                taxable = min(remaining_pkp, bracket_to - bracket_from)
-
-            # Calculate tax for this bracket
-            tax = taxable * bracket_rate
-
-            # Add to total
-            total_tax += tax
-
-            # Add to details
-            tax_details.append(
-                {
-                    "from": bracket_from,
-                    "to": bracket_to,
-                    "rate": bracket_rate,
-                    "taxable": taxable,
-                    "tax": tax,
-                }
-            )
-
-            # Reduce remaining PKP
-            remaining_pkp -= taxable
-
         return total_tax, tax_details
 
     except Exception as e:
@@ -0,0 +1,314 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025, PT. Innovasi Terbaik Bangsa and contributors
+# For license information, please see license.txt
+
+"""
+Batch year-end (December) PPh 21 correction.
+
+Instead of every December salary slip querying its own year-to-date data,
+the annual figures for every employee in a December payroll are computed
+from two grouped queries:
+
+1. Salary Slip totals per employee (Jan-Nov gross plus the December slip
+   of the payroll entry, if it already exists) joined with Employee for
+   the tax status.
+2. Salary Detail deduction totals per employee (Jan-Nov PPh 21 already
+   withheld and employee BPJS contributions).
+
+Annual tax for the whole batch is then evaluated on the compiled bracket
+table and stored per employee in the Redis cache, where
+calculate_december_pph picks it up when each December slip is validated.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional
+
+import frappe
+from frappe import _
+from frappe.utils import flt, getdate
+
+from payroll_indonesia.constants import (
+    BIAYA_JABATAN_PERCENT,
+    BIAYA_JABATAN_MAX,
+    CACHE_SHORT,
+    DECEMBER_MONTH,
+)
+from payroll_indonesia.payroll_indonesia.tax.ter_logic import get_ptkp_amount
+from payroll_indonesia.payroll_indonesia.tax.progressive_tax import get_compiled_bracket_table
+
+__all__ = [
+    "calculate_annual_figures",
+    "compute_december_corrections",
+    "get_precomputed_december_correction",
+    "prepare_december_corrections",
+]
+
+# Employee BPJS deductions that reduce annual netto income
+BPJS_EMPLOYEE_COMPONENTS = ("BPJS JHT Employee", "BPJS JP Employee", "BPJS Kesehatan Employee")
+
+# Redis key prefix for per-employee December batch results
+DECEMBER_BATCH_KEY = "payroll_indonesia:december_batch"
+
+
+def _cache_key(employee: str, year: int) -> str:
+    return f"{DECEMBER_BATCH_KEY}:{year}:{employee}"
+
+
+def _get_batch_employees(payroll_entry: Optional[str], employees: Optional[Iterable[str]]):
+    """Resolve the employee list from explicit input or the payroll entry."""
+    if employees:
+        return sorted({emp for emp in employees if emp})
+
+    if not payroll_entry:
+        return []
+
+    rows = frappe.db.sql(
+        """
+        SELECT DISTINCT employee FROM `tabPayroll Employee Detail`
+        WHERE parent = %s AND parenttype = 'Payroll Entry'
+        UNION
+        SELECT DISTINCT employee FROM `tabSalary Slip`
+        WHERE payroll_entry = %s AND docstatus != 2
+        """,
+        (payroll_entry, payroll_entry),
+    )
+    return sorted({row[0] for row in rows if row[0]})
+
+
+def _get_slip_totals(employees: List[str], year: int, payroll_entry: Optional[str]):
+    """Grouped query 1: gross pay per employee with tax status."""
+    return frappe.db.sql(
+        """
+        SELECT
+            emp.name AS employee,
+            emp.status_pajak,
+            SUM(CASE WHEN ss.docstatus = 1 AND ss.start_date < %(december_start)s
+                THEN ss.gross_pay ELSE 0 END) AS ytd_gross,
+            SUM(CASE WHEN ss.payroll_entry = %(payroll_entry)s
+                THEN ss.gross_pay ELSE 0 END) AS december_gross,
+            SUM(CASE WHEN ss.payroll_entry = %(payroll_entry)s
+                THEN ss.total_bpjs ELSE 0 END) AS december_bpjs,
+            MAX(CASE WHEN ss.payroll_entry = %(payroll_entry)s
+                THEN ss.name END) AS december_slip
+        FROM `tabEmployee` emp
+        LEFT JOIN `tabSalary Slip` ss
+            ON ss.employee = emp.name
+            AND ss.start_date BETWEEN %(year_start)s AND %(year_end)s
+            AND (
+                ss.docstatus = 1
+                OR (ss.payroll_entry = %(payroll_entry)s AND ss.docstatus != 2)
+            )
+        WHERE emp.name IN %(employees)s
+        GROUP BY emp.name, emp.status_pajak
+        """,
+        {
+            "employees": tuple(employees),
+            "payroll_entry": payroll_entry or "",
+            "year_start": f"{year}-01-01",
+            "year_end": f"{year}-12-31",
+            "december_start": f"{year}-{DECEMBER_MONTH:02d}-01",
+        },
+        as_dict=1,
+    )
+
+
+def _get_deduction_totals(employees: List[str], year: int) -> Dict[str, Any]:
+    """Grouped query 2: Jan-Nov PPh 21 and employee BPJS per employee."""
+    rows = frappe.db.sql(
+        """
+        SELECT
+            ss.employee,
+            SUM(CASE WHEN sd.salary_component = 'PPh 21'
+                THEN sd.amount ELSE 0 END) AS ytd_pph21,
+            SUM(CASE WHEN sd.salary_component IN %(bpjs_components)s
+                THEN sd.amount ELSE 0 END) AS ytd_bpjs
+        FROM `tabSalary Detail` sd
+        INNER JOIN `tabSalary Slip` ss ON ss.name = sd.parent
+        WHERE
+            ss.employee IN %(employees)s
+            AND ss.docstatus = 1
+            AND ss.start_date >= %(year_start)s
+            AND ss.start_date < %(december_start)s
+            AND sd.parenttype = 'Salary Slip'
+            AND sd.parentfield = 'deductions'
+            AND sd.salary_component IN %(components)s
+        GROUP BY ss.employee
+        """,
+        {
+            "employees": tuple(employees),
+            "bpjs_components": BPJS_EMPLOYEE_COMPONENTS,
+            "components": BPJS_EMPLOYEE_COMPONENTS + ("PPh 21",),
+            "year_start": f"{year}-01-01",
+            "december_start": f"{year}-{DECEMBER_MONTH:02d}-01",
+        },
+        as_dict=1,
+    )
+    return {row.employee: row for row in rows}
+
+
+def calculate_annual_figures(gross: float, bpjs: float, ptkp: float) -> Dict[str, float]:
+    """Annual netto and PKP using the same rules as calculate_december_pph."""
+    biaya_jabatan = min(gross * (BIAYA_JABATAN_PERCENT / 100), BIAYA_JABATAN_MAX)
+    annual_netto = gross - biaya_jabatan - bpjs
+    return {
+        "annual_gross": gross,
+        "annual_bpjs": bpjs,
+        "annual_biaya_jabatan": biaya_jabatan,
+        "annual_netto": annual_netto,
+        "ptkp": ptkp,
+        "pkp": max(annual_netto - ptkp, 0),
+    }
+
+
+def compute_december_corrections(
+    year: int,
+    payroll_entry: Optional[str] = None,
+    employees: Optional[Iterable[str]] = None,
+    pph_settings: Optional[Any] = None,
+    store: bool = True,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Compute December corrections for all employees of a payroll in bulk
+
+    Args:
+        year: Tax year
+        payroll_entry: December Payroll Entry name (optional)
+        employees: Explicit employee IDs (optional, defaults to the payroll entry's)
+        pph_settings: PPh 21 Settings document (optional)
+        store: Whether to cache results for pickup by December slips
+
+    Returns:
+        dict: Per-employee annual figures, annual tax and koreksi_pph21
+    """
+    employee_list = _get_batch_employees(payroll_entry, employees)
+    if not employee_list:
+        return {}
+
+    slip_totals = _get_slip_totals(employee_list, year, payroll_entry)
+    deductions = _get_deduction_totals(employee_list, year)
+
+    results = {}
+    for row in slip_totals:
+        status_pajak = row.status_pajak or "TK0"
+        paid = deductions.get(row.employee) or {}
+
+        ytd_gross = flt(row.ytd_gross)
+        ytd_bpjs = flt(paid.get("ytd_bpjs"))
+        december_gross = flt(row.december_gross)
+        december_bpjs = flt(row.december_bpjs)
+
+        entry = calculate_annual_figures(
+            ytd_gross + december_gross,
+            ytd_bpjs + december_bpjs,
+            get_ptkp_amount(status_pajak, pph_settings),
+        )
+        entry.update(
+            {
+                "employee": row.employee,
+                "year": year,
+                "status_pajak": status_pajak,
+                "salary_slip": row.december_slip,
+                "december_gross": december_gross,
+                "december_bpjs": december_bpjs,
+                "ytd": {"gross": ytd_gross, "bpjs": ytd_bpjs, "pph21": flt(paid.get("ytd_pph21"))},
+            }
+        )
+        results[row.employee] = entry
+
+    # Evaluate annual tax for the whole batch in one pass
+    table = get_compiled_bracket_table(pph_settings)
+    employees_in_order = list(results)
+    annual_taxes = table.tax_batch([results[emp]["pkp"] for emp in employees_in_order])
+
+    cache = frappe.cache() if store else None
+    for employee, annual_tax in zip(employees_in_order, annual_taxes):
+        entry = results[employee]
+        entry["annual_pph"] = flt(annual_tax)
+        entry["koreksi_pph21"] = entry["annual_pph"] - entry["ytd"]["pph21"]
+
+        if cache:
+            cache.set_value(_cache_key(employee, year), entry, expires_in_sec=CACHE_SHORT)
+
+    return results
+
+
+def get_precomputed_december_correction(doc: Any, pph_settings: Optional[Any] = None):
+    """
+    Get the batch-computed December correction for a salary slip
+
+    The year-to-date base is always taken from the batch. When the slip's own
+    gross pay and BPJS match the December values used by the batch the
+    precomputed annual tax and koreksi_pph21 are returned as-is, otherwise
+    they are re-evaluated from the batch base without touching the database.
+
+    Args:
+        doc: December Salary Slip document
+        pph_settings: PPh 21 Settings document (optional)
+
+    Returns:
+        dict: Annual figures and koreksi_pph21, or None if no batch result exists
+    """
+    if not getattr(doc, "employee", None) or not getattr(doc, "end_date", None):
+        return None
+
+    year = getdate(doc.end_date).year
+    entry = frappe.cache().get_value(_cache_key(doc.employee, year))
+    if not entry:
+        return None
+
+    gross_pay = flt(doc.gross_pay)
+    total_bpjs = flt(doc.total_bpjs)
+    if (
+        flt(entry.get("december_gross")) == gross_pay
+        and flt(entry.get("december_bpjs")) == total_bpjs
+    ):
+        return entry
+
+    ytd = entry["ytd"]
+    result = calculate_annual_figures(
+        ytd["gross"] + gross_pay, ytd["bpjs"] + total_bpjs, entry["ptkp"]
+    )
+    result.update(
+        {
+            "employee": doc.employee,
+            "year": year,
+            "status_pajak": entry.get("status_pajak"),
+            "salary_slip": getattr(doc, "name", None),
+            "december_gross": gross_pay,
+            "december_bpjs": total_bpjs,
+            "ytd": ytd,
+        }
+    )
+    result["annual_pph"] = get_compiled_bracket_table(pph_settings).tax(result["pkp"])
+    result["koreksi_pph21"] = result["annual_pph"] - ytd["pph21"]
+    return result
+
+
+@frappe.whitelist()
+def prepare_december_corrections(payroll_entry: str) -> Dict[str, Any]:
+    """
+    Precompute December corrections for a December Payroll Entry
+
+    Args:
+        payroll_entry: Payroll Entry name
+
+    Returns:
+        dict: Status and number of employees prepared
+    """
+    entry = frappe.get_doc("Payroll Entry", payroll_entry)
+    entry.check_permission("write")
+
+    end_date = getdate(entry.end_date)
+    if end_date.month != DECEMBER_MONTH:
+        frappe.throw(
+            _("Payroll Entry {0} is not a December payroll").format(payroll_entry),
+            title=_("Not December"),
+        )
+
+    results = compute_december_corrections(end_date.year, payroll_entry=payroll_entry)
+    return {
+        "status": "success",
+        "payroll_entry": payroll_entry,
+        "year": end_date.year,
+        "employees": len(results),
+        "total_correction": sum(flt(r["koreksi_pph21"]) for r in results.values()),
+    }
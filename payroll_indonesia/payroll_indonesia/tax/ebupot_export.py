@@ -0,0 +1,402 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025, PT. Innovasi Terbaik Bangsa and contributors
+# For license information, please see license.txt
+
+"""
+Streaming export of monthly PPh 21 withholding for e-Bupot / SPT Masa PPh 21.
+
+Rows come from the Employee Tax Summary monthly details, one per employee,
+read through an unbuffered (server-side) cursor and written straight to a
+private file as CSV or as the DJP BPMP XML import layout. Nothing but the
+current chunk is held in memory.
+
+After every chunk the file is flushed and a checkpoint (last employee, byte
+offset, row count) is stored in Redis per company, period and format. An
+interrupted export resumes from the last checkpoint: the file is truncated
+to the checkpointed offset and reading continues after the last employee.
+"""
+
+import csv
+import os
+import re
+from contextlib import closing
+from datetime import date
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+from xml.sax.saxutils import escape
+
+import frappe
+from frappe import _
+from frappe.utils import cint, flt, get_last_day, now, scrub
+
+from payroll_indonesia.payroll_indonesia.utils import debug_log
+
+__all__ = [
+    "iter_withholding_rows",
+    "export_monthly_withholding",
+    "enqueue_ebupot_export",
+    "get_ebupot_export_status",
+]
+
+# Rows written between two checkpoints
+EXPORT_CHUNK_SIZE = 1000
+
+# Redis hash of export id -> checkpoint
+EXPORT_STATUS_KEY = "payroll_indonesia:ebupot_export_status"
+
+# Folder below private/files holding the export files
+EXPORT_FOLDER = "ebupot"
+
+EXPORT_FORMATS = ("csv", "xml")
+
+RUN_METHOD = "payroll_indonesia.payroll_indonesia.tax.ebupot_export.export_monthly_withholding"
+
+# Columns of the DJP BPMP (monthly employee withholding) import layout
+EBUPOT_COLUMNS = (
+    "TaxPeriodMonth",
+    "TaxPeriodYear",
+    "CounterpartOpt",
+    "CounterpartPassport",
+    "CounterpartTin",
+    "StatusTaxExemption",
+    "Position",
+    "TaxCertificate",
+    "TaxObjectCode",
+    "Gross",
+    "Rate",
+    "IDPlaceOfBusinessActivity",
+    "WithholdingDate",
+)
+
+# Tax object code of permanent employees (pegawai tetap)
+TAX_OBJECT_CODE_PERMANENT = "21-100-01"
+
+# NITKU suffix of the head office
+HEAD_OFFICE_NITKU_SUFFIX = "000000"
+
+WITHHOLDING_QUERY = """
+    SELECT
+        ets.employee,
+        emp.npwp,
+        emp.ktp,
+        emp.status_pajak,
+        emp.jabatan,
+        SUM(etd.gross_pay) AS gross_pay,
+        MAX(etd.ter_rate) AS ter_rate
+    FROM `tabEmployee Tax Summary` ets
+    INNER JOIN `tabEmployee Monthly Tax Detail` etd
+        ON etd.parent = ets.name AND etd.parenttype = 'Employee Tax Summary'
+    INNER JOIN `tabEmployee` emp ON emp.name = ets.employee
+    WHERE ets.year = %(year)s
+        AND etd.month = %(month)s
+        AND emp.company = %(company)s
+        AND ets.employee > %(after_employee)s
+    GROUP BY ets.employee, emp.npwp, emp.ktp, emp.status_pajak, emp.jabatan
+    ORDER BY ets.employee
+"""
+
+
+def _export_id(company: str, year: int, month: int, file_format: str) -> str:
+    return f"{company}:{year}-{month:02d}:{file_format}"
+
+
+def _export_file_name(company: str, year: int, month: int, file_format: str) -> str:
+    return f"ebupot-{scrub(company)}-{year}-{month:02d}.{file_format}"
+
+
+def _digits(value: Optional[str]) -> str:
+    return re.sub(r"\D", "", value or "")
+
+
+def _tin16(npwp: Optional[str]) -> str:
+    """16-digit TIN, old 15-digit NPWP numbers get a leading zero."""
+    digits = _digits(npwp)
+    return f"0{digits}" if len(digits) == 15 else digits
+
+
+def _counterpart_tin(row: Dict[str, Any]) -> str:
+    """Employee TIN: the 16-digit NIK of residents, else the NPWP."""
+    nik = _digits(row.get("ktp"))
+    return nik if len(nik) == 16 else _tin16(row.get("npwp"))
+
+
+def _ptkp_status(status_pajak: Optional[str]) -> str:
+    """Convert TK0 / K1 / HB2 to the DJP notation TK/0, K/1, HB/2."""
+    match = re.match(r"^([A-Z]+)(\d)$", (status_pajak or "").upper())
+    return f"{match.group(1)}/{match.group(2)}" if match else (status_pajak or "")
+
+
+def iter_withholding_rows(
+    company: str, year: int, month: int, after_employee: Optional[str] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    Stream the monthly withholding of a company, one row per employee
+
+    The rows are read through an unbuffered cursor, so no other query may
+    run on this connection until the generator is exhausted or closed.
+
+    Args:
+        company: Company name
+        year: Tax year
+        month: Tax month (1-12)
+        after_employee: Only employees sorting after this one, to resume
+
+    Yields:
+        dict: employee, npwp, ktp, status_pajak, jabatan, gross_pay and
+            ter_rate, ordered by employee
+    """
+    values = {
+        "company": company,
+        "year": cint(year),
+        "month": cint(month),
+        "after_employee": after_employee or "",
+    }
+    with frappe.db.unbuffered_cursor():
+        yield from frappe.db.sql(WITHHOLDING_QUERY, values, as_dict=True, as_iterator=True)
+
+
+def _chunks(rows: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _ebupot_values(
+    row: Dict[str, Any], year: int, month: int, nitku: str, withholding_date: str
+) -> List[str]:
+    """Values of one row in EBUPOT_COLUMNS order."""
+    return [
+        str(month),
+        str(year),
+        "Resident",
+        "",
+        _counterpart_tin(row),
+        _ptkp_status(row.get("status_pajak")),
+        row.get("jabatan") or "",
+        "N/A",
+        TAX_OBJECT_CODE_PERMANENT,
+        "{:.0f}".format(flt(row.get("gross_pay"))),
+        "{:g}".format(flt(row.get("ter_rate"))),
+        nitku,
+        withholding_date,
+    ]
+
+
+def _xml_header(company_tin: str) -> str:
+    return (
+        '<?xml version="1.0" encoding="utf-8"?>\n'
+        "<MmPayrollBulk>\n"
+        f"  <TIN>{escape(company_tin)}</TIN>\n"
+        "  <ListOfMmPayroll>\n"
+    )
+
+
+def _xml_row(values: List[str]) -> str:
+    elements = "".join(
+        f"      <{column}>{escape(value)}</{column}>\n"
+        for column, value in zip(EBUPOT_COLUMNS, values)
+    )
+    return f"    <MmPayroll>\n{elements}    </MmPayroll>\n"
+
+
+XML_FOOTER = "  </ListOfMmPayroll>\n</MmPayrollBulk>\n"
+
+
+def _attach_export_file(file_name: str, file_url: str) -> None:
+    """Register the export as a private File so it can be downloaded."""
+    if frappe.db.exists("File", {"file_url": file_url}):
+        return
+    frappe.get_doc(
+        {"doctype": "File", "file_name": file_name, "file_url": file_url, "is_private": 1}
+    ).insert(ignore_permissions=True)
+    frappe.db.commit()
+
+
+def _publish_state(state: Dict[str, Any]) -> None:
+    frappe.cache().hset(EXPORT_STATUS_KEY, state["export_id"], state)
+
+
+def export_monthly_withholding(
+    company: str,
+    year: int,
+    month: int,
+    file_format: str = "csv",
+    chunk_size: int = EXPORT_CHUNK_SIZE,
+    resume: bool = True,
+) -> Dict[str, Any]:
+    """
+    Write the monthly PPh 21 withholding of a company to an import file
+
+    Args:
+        company: Company name
+        year: Tax year
+        month: Tax month (1-12)
+        file_format: "csv" or "xml"
+        chunk_size: Rows written between two checkpoints
+        resume: Continue an interrupted export of the same company, period
+            and format instead of starting over
+
+    Returns:
+        dict: Export state with status, rows, chunks and file_url
+    """
+    year, month, chunk_size = cint(year), cint(month), max(cint(chunk_size), 1)
+    file_format = (file_format or "csv").lower()
+    if file_format not in EXPORT_FORMATS:
+        frappe.throw(_("Unsupported export format: {0}").format(file_format))
+    if not 1 <= month <= 12:
+        frappe.throw(_("Invalid tax month: {0}").format(month))
+
+    export_id = _export_id(company, year, month, file_format)
+    file_name = _export_file_name(company, year, month, file_format)
+    folder = frappe.get_site_path("private", "files", EXPORT_FOLDER)
+    path = os.path.join(folder, file_name)
+
+    company_tin = _tin16(frappe.db.get_value("Company", company, "tax_id"))
+    nitku = f"{company_tin}{HEAD_OFFICE_NITKU_SUFFIX}" if company_tin else ""
+    withholding_date = get_last_day(date(year, month, 1)).isoformat()
+
+    previous = frappe.cache().hget(EXPORT_STATUS_KEY, export_id) or {}
+    resuming = bool(
+        resume
+        and previous.get("status") in ("running", "failed")
+        and previous.get("offset")
+        and os.path.exists(path)
+    )
+
+    state = {
+        "export_id": export_id,
+        "company": company,
+        "year": year,
+        "month": month,
+        "file_format": file_format,
+        "file_url": f"/private/files/{EXPORT_FOLDER}/{file_name}",
+        "status": "running",
+        "rows": previous.get("rows", 0) if resuming else 0,
+        "chunks": previous.get("chunks", 0) if resuming else 0,
+        "last_employee": previous.get("last_employee") if resuming else None,
+        "offset": previous.get("offset", 0) if resuming else 0,
+        "resumed": resuming,
+        "started": previous.get("started") if resuming else now(),
+    }
+
+    os.makedirs(folder, exist_ok=True)
+    with open(path, "r+" if resuming else "w", encoding="utf-8", newline="") as f:
+        if resuming:
+            # Drop anything written after the last checkpoint
+            f.seek(state["offset"])
+            f.truncate()
+        else:
+            if file_format == "csv":
+                csv.writer(f).writerow(EBUPOT_COLUMNS)
+            else:
+                f.write(_xml_header(company_tin))
+            state["offset"] = f.tell()
+        _publish_state(state)
+
+        writer = csv.writer(f) if file_format == "csv" else None
+        try:
+            # Closed before any other query runs, the cursor is unbuffered
+            with closing(
+                iter_withholding_rows(company, year, month, state["last_employee"])
+            ) as rows:
+                for chunk in _chunks(rows, chunk_size):
+                    for row in chunk:
+                        values = _ebupot_values(row, year, month, nitku, withholding_date)
+                        if writer:
+                            writer.writerow(values)
+                        else:
+                            f.write(_xml_row(values))
+
+                    f.flush()
+                    os.fsync(f.fileno())
+                    state.update(
+                        offset=f.tell(),
+                        last_employee=chunk[-1].employee,
+                        rows=state["rows"] + len(chunk),
+                        chunks=state["chunks"] + 1,
+                    )
+                    _publish_state(state)
+
+            if file_format == "xml":
+                f.write(XML_FOOTER)
+            f.flush()
+            _attach_export_file(file_name, state["file_url"])
+            state.update(status="finished", offset=f.tell(), finished=now())
+        except Exception as e:
+            state.update(status="failed", error=str(e))
+            frappe.log_error(
+                f"Error exporting e-Bupot {export_id} after {state['rows']} rows: {str(e)}\n\n"
+                f"Traceback: {frappe.get_traceback()}",
+                "e-Bupot Export Error",
+            )
+        finally:
+            _publish_state(state)
+
+    debug_log(
+        f"e-Bupot export {export_id} {state['status']}: {state['rows']} rows "
+        f"in {state['chunks']} chunks",
+        "e-Bupot Export",
+    )
+    return state
+
+
+@frappe.whitelist()
+def enqueue_ebupot_export(
+    company: str, year: int, month: int, file_format: str = "csv", resume: int = 1
+) -> Dict[str, Any]:
+    """
+    Run the e-Bupot export in the background, one job per company and period
+
+    Args:
+        company: Company name
+        year: Tax year
+        month: Tax month (1-12)
+        file_format: "csv" or "xml"
+        resume: Continue an interrupted export instead of starting over
+
+    Returns:
+        dict: export_id and whether it was queued (False if already running)
+    """
+    if not frappe.has_permission("Employee Tax Summary", "export"):
+        frappe.throw(_("Not permitted to export Tax Summary data"), frappe.PermissionError)
+
+    from payroll_indonesia.utilities.job_registry import enqueue_registered
+
+    year, month = cint(year), cint(month)
+    export_id = _export_id(company, year, month, (file_format or "csv").lower())
+    queued = enqueue_registered(
+        RUN_METHOD,
+        job_name=f"ebupot_export:{export_id}",
+        queue="long",
+        timeout=3600,
+        company=company,
+        year=year,
+        month=month,
+        file_format=file_format,
+        resume=bool(cint(resume)),
+    )
+    return {"export_id": export_id, "queued": queued}
+
+
+@frappe.whitelist()
+def get_ebupot_export_status(
+    company: str, year: int, month: int, file_format: str = "csv"
+) -> Optional[Dict[str, Any]]:
+    """
+    Get the checkpoint of an e-Bupot export
+
+    Args:
+        company: Company name
+        year: Tax year
+        month: Tax month (1-12)
+        file_format: "csv" or "xml"
+
+    Returns:
+        dict: Export state, or None if never started
+    """
+    export_id = _export_id(company, cint(year), cint(month), (file_format or "csv").lower())
+    return frappe.cache().hget(EXPORT_STATUS_KEY, export_id)
@@ -0,0 +1,442 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025, PT. Innovasi Terbaik Bangsa and contributors
+# For license information, please see license.txt
+
+"""
+Bulk Form 1721-A1 generation.
+
+The yearly forms of all employees are produced in three stages instead of
+one employee at a time:
+
+1. One grouped query over the Employee Tax Summary monthly details returns
+   the annual gross, BPJS and withheld PPh 21 of every employee, joined with
+   Employee for identity and tax status. Annual tax is then evaluated for
+   the whole batch on the compiled bracket table.
+2. The Annual Tax Report records are written with one bulk INSERT for new
+   employees and batched UPDATEs for existing reports.
+3. The printable forms are rendered to HTML in this process and converted
+   to PDF by a pool of worker processes, streaming each finished PDF into a
+   zip archive stored as a private File.
+"""
+
+import os
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import frappe
+from frappe import _
+from frappe.utils import cint, flt, fmt_money, now, scrub
+
+from payroll_indonesia.payroll_indonesia.tax.december_correction import calculate_annual_figures
+from payroll_indonesia.payroll_indonesia.tax.progressive_tax import get_compiled_bracket_table
+from payroll_indonesia.payroll_indonesia.tax.ter_logic import get_ptkp_amount
+from payroll_indonesia.payroll_indonesia.utils import debug_log
+from payroll_indonesia.utilities.read_replica import replica_read_only
+
+__all__ = [
+    "get_annual_tax_figures",
+    "save_annual_tax_reports",
+    "render_form_1721_a1_zip",
+    "generate_form_1721_a1_bulk",
+    "enqueue_form_1721_a1_bulk",
+]
+
+# Employees rendered per round of the process pool
+RENDER_BATCH_SIZE = 200
+
+# Rows per bulk INSERT / UPDATE statement
+REPORT_BATCH_SIZE = 500
+
+# Folder below private/files holding the zip archives
+EXPORT_FOLDER = "form_1721_a1"
+
+FORM_TEMPLATE = "payroll_indonesia/templates/form_1721_a1.html"
+
+RUN_METHOD = "payroll_indonesia.payroll_indonesia.tax.form_1721_a1.generate_form_1721_a1_bulk"
+
+# wkhtmltopdf options, fixed so the workers never read Print Settings
+PDF_OPTIONS = {
+    "page-size": "A4",
+    "margin-top": "15mm",
+    "margin-bottom": "15mm",
+    "margin-left": "15mm",
+    "margin-right": "15mm",
+    "encoding": "UTF-8",
+    "quiet": "",
+}
+
+# Annual Tax Report field -> key of the annual figures
+REPORT_FIELDS = {
+    "employee_name": "employee_name",
+    "company": "company",
+    "gross_income": "annual_gross",
+    "net_income": "annual_netto",
+    "job_expense": "annual_biaya_jabatan",
+    "bpjs_deductions": "annual_bpjs",
+    "ptkp": "ptkp",
+    "pkp": "pkp",
+    "tax_paid": "tax_paid",
+    "annual_tax": "annual_pph",
+    "tax_status": "status_pajak",
+}
+
+
+@replica_read_only
+def _get_annual_totals(
+    year: int, company: Optional[str], employees: Optional[List[str]]
+) -> List[Dict[str, Any]]:
+    """Grouped query: annual totals per employee with identity fields."""
+    conditions = ["ets.year = %(year)s"]
+    values = {"year": year}
+    if company:
+        conditions.append("emp.company = %(company)s")
+        values["company"] = company
+    if employees:
+        conditions.append("ets.employee IN %(employees)s")
+        values["employees"] = tuple(employees)
+
+    return frappe.db.sql(
+        f"""
+        SELECT
+            ets.employee,
+            emp.employee_name,
+            emp.company,
+            emp.status_pajak,
+            emp.npwp,
+            emp.ktp,
+            emp.jabatan,
+            SUM(etd.gross_pay) AS gross_pay,
+            SUM(etd.bpjs_deductions) AS bpjs_deductions,
+            SUM(etd.tax_amount) AS tax_paid,
+            MIN(etd.month) AS start_month,
+            MAX(etd.month) AS end_month
+        FROM `tabEmployee Tax Summary` ets
+        INNER JOIN `tabEmployee Monthly Tax Detail` etd
+            ON etd.parent = ets.name AND etd.parenttype = 'Employee Tax Summary'
+        INNER JOIN `tabEmployee` emp ON emp.name = ets.employee
+        WHERE {" AND ".join(conditions)}
+        GROUP BY ets.employee, emp.employee_name, emp.company, emp.status_pajak,
+            emp.npwp, emp.ktp, emp.jabatan
+        ORDER BY ets.employee
+        """,
+        values,
+        as_dict=1,
+    )
+
+
+def get_annual_tax_figures(
+    year: int,
+    company: Optional[str] = None,
+    employees: Optional[Iterable[str]] = None,
+    pph_settings: Optional[Any] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Stage 1: annual 1721-A1 figures for all employees of a year
+
+    Args:
+        year: Tax year
+        company: Restrict to one company (optional)
+        employees: Restrict to these employees (optional)
+        pph_settings: PPh 21 Settings document (optional)
+
+    Returns:
+        list: Per-employee identity fields, annual figures (see
+            calculate_annual_figures), annual_pph, tax_paid and tax_difference
+    """
+    employee_list = sorted({emp for emp in employees or [] if emp})
+    rows = _get_annual_totals(cint(year), company, employee_list)
+    if not rows:
+        return []
+
+    ptkp_by_status = {}
+    figures = []
+    for row in rows:
+        status_pajak = row.status_pajak or "TK0"
+        if status_pajak not in ptkp_by_status:
+            ptkp_by_status[status_pajak] = get_ptkp_amount(status_pajak, pph_settings)
+
+        entry = calculate_annual_figures(
+            flt(row.gross_pay), flt(row.bpjs_deductions), ptkp_by_status[status_pajak]
+        )
+        entry.update(row, status_pajak=status_pajak, tax_paid=flt(row.tax_paid))
+        figures.append(entry)
+
+    # Evaluate annual tax for the whole batch in one pass
+    annual_taxes = get_compiled_bracket_table(pph_settings).tax_batch(
+        [entry["pkp"] for entry in figures]
+    )
+    for entry, annual_tax in zip(figures, annual_taxes):
+        entry["annual_pph"] = flt(annual_tax)
+        entry["tax_difference"] = entry["annual_pph"] - entry["tax_paid"]
+
+    return figures
+
+
+def _batches(items: List[Any], size: int) -> Iterator[List[Any]]:
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
+def save_annual_tax_reports(figures: List[Dict[str, Any]], year: int) -> Dict[str, int]:
+    """
+    Stage 2: write Annual Tax Report records in bulk
+
+    Reports that already exist for the employee and year are updated, the
+    rest are inserted. Only fields present on the site's Annual Tax Report
+    DocType are written.
+
+    Args:
+        figures: Output of get_annual_tax_figures
+        year: Tax year
+
+    Returns:
+        dict: Number of inserted and updated reports
+    """
+    result = {"inserted": 0, "updated": 0}
+    if not figures:
+        return result
+
+    if not frappe.db.exists("DocType", "Annual Tax Report"):
+        debug_log(
+            "Annual Tax Report DocType does not exist, skipping report records",
+            "Form 1721-A1",
+        )
+        return result
+
+    meta = frappe.get_meta("Annual Tax Report")
+    fields = {f: key for f, key in REPORT_FIELDS.items() if meta.has_field(f)}
+
+    existing = dict(
+        frappe.db.sql(
+            """
+            SELECT employee, name FROM `tabAnnual Tax Report`
+            WHERE year = %(year)s AND employee IN %(employees)s
+            """,
+            {"year": year, "employees": tuple(entry["employee"] for entry in figures)},
+        )
+    )
+
+    updates = {
+        existing[entry["employee"]]: {f: entry.get(key) for f, key in fields.items()}
+        for entry in figures
+        if entry["employee"] in existing
+    }
+    if updates:
+        frappe.db.bulk_update("Annual Tax Report", updates, chunk_size=REPORT_BATCH_SIZE)
+        result["updated"] = len(updates)
+
+    inserts = [entry for entry in figures if entry["employee"] not in existing]
+    timestamp, user = now(), frappe.session.user
+    columns = ["name", "creation", "modified", "owner", "modified_by", "docstatus"]
+    columns += ["employee", "year"] + list(fields)
+    for batch in _batches(inserts, REPORT_BATCH_SIZE):
+        frappe.db.bulk_insert(
+            "Annual Tax Report",
+            fields=columns,
+            values=[
+                (frappe.generate_hash(length=10), timestamp, timestamp, user, user, 0)
+                + (entry["employee"], year)
+                + tuple(entry.get(key) for key in fields.values())
+                for entry in batch
+            ],
+        )
+        result["inserted"] += len(batch)
+
+    frappe.db.commit()
+    return result
+
+
+def _render_pdf(item: Tuple[str, str]) -> Tuple[str, Optional[bytes], Optional[str]]:
+    """
+    Worker: convert one rendered form to PDF
+
+    Runs in a separate process without a site connection, so it only uses
+    pdfkit and the fixed PDF_OPTIONS.
+
+    Args:
+        item: (file name, HTML)
+
+    Returns:
+        tuple: (file name, PDF bytes or None, error message or None)
+    """
+    file_name, html = item
+    try:
+        import pdfkit
+
+        return file_name, pdfkit.from_string(html, False, options=PDF_OPTIONS), None
+    except Exception as e:
+        return file_name, None, str(e)
+
+
+def _render_html(entry: Dict[str, Any], year: int, company_tax_ids: Dict[str, str]) -> str:
+    amount_keys = (
+        "annual_gross",
+        "annual_biaya_jabatan",
+        "annual_bpjs",
+        "annual_netto",
+        "ptkp",
+        "pkp",
+        "annual_pph",
+        "tax_paid",
+        "tax_difference",
+    )
+    return frappe.render_template(
+        FORM_TEMPLATE,
+        {
+            "year": year,
+            "row": entry,
+            "amounts": {key: fmt_money(flt(entry.get(key)), precision=0) for key in amount_keys},
+            "company_tax_id": company_tax_ids.get(entry.get("company")),
+        },
+    )
+
+
+def _attach_file(file_name: str, file_url: str) -> None:
+    """Register the archive as a private File so it can be downloaded."""
+    if frappe.db.exists("File", {"file_url": file_url}):
+        return
+    frappe.get_doc(
+        {"doctype": "File", "file_name": file_name, "file_url": file_url, "is_private": 1}
+    ).insert(ignore_permissions=True)
+    frappe.db.commit()
+
+
+def render_form_1721_a1_zip(
+    figures: List[Dict[str, Any]],
+    year: int,
+    company: Optional[str] = None,
+    processes: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Stage 3: render the printable forms into a zip archive in parallel
+
+    Args:
+        figures: Output of get_annual_tax_figures
+        year: Tax year
+        company: Company used in the archive name (optional)
+        processes: Worker processes, defaults to the CPU count minus one
+
+    Returns:
+        dict: file_url of the archive, rendered count and per-employee errors
+    """
+    processes = cint(processes) or max((os.cpu_count() or 2) - 1, 1)
+    file_name = f"1721-a1-{year}-{scrub(company or 'all')}.zip"
+    folder = frappe.get_site_path("private", "files", EXPORT_FOLDER)
+    os.makedirs(folder, exist_ok=True)
+
+    company_tax_ids = dict(frappe.get_all("Company", fields=["name", "tax_id"], as_list=True))
+    result = {"file_url": f"/private/files/{EXPORT_FOLDER}/{file_name}", "rendered": 0}
+    result["errors"] = errors = {}
+
+    # Spawned workers do not inherit the database and Redis connections
+    with ProcessPoolExecutor(max_workers=processes, mp_context=get_context("spawn")) as pool:
+        with zipfile.ZipFile(
+            os.path.join(folder, file_name), "w", compression=zipfile.ZIP_DEFLATED
+        ) as archive:
+            for batch in _batches(figures, RENDER_BATCH_SIZE):
+                items = [
+                    (
+                        f"1721-A1-{year}-{entry['employee']}.pdf",
+                        _render_html(entry, year, company_tax_ids),
+                    )
+                    for entry in batch
+                ]
+                for pdf_name, pdf, error in pool.map(_render_pdf, items):
+                    if pdf is None:
+                        errors[pdf_name] = error
+                        continue
+                    archive.writestr(pdf_name, pdf)
+                    result["rendered"] += 1
+
+    _attach_file(file_name, result["file_url"])
+    return result
+
+
+def generate_form_1721_a1_bulk(
+    year: int,
+    company: Optional[str] = None,
+    employees: Optional[Iterable[str]] = None,
+    render_pdf: bool = True,
+    processes: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Generate Form 1721-A1 for all employees of a year through the bulk pipeline
+
+    Args:
+        year: Tax year
+        company: Restrict to one company (optional)
+        employees: Restrict to these employees (optional)
+        render_pdf: Whether to render the PDF archive
+        processes: Worker processes for PDF rendering (optional)
+
+    Returns:
+        dict: Summary with year, total, success, failed, reports, archive
+            and per-employee details
+    """
+    year = cint(year)
+    figures = get_annual_tax_figures(year, company, employees)
+    summary = {"year": year, "total": len(figures), "success": 0, "failed": 0, "details": []}
+    if not figures:
+        return summary
+
+    summary["reports"] = save_annual_tax_reports(figures, year)
+
+    errors = {}
+    if render_pdf:
+        summary["archive"] = render_form_1721_a1_zip(figures, year, company, processes)
+        errors = summary["archive"]["errors"]
+
+    for entry in figures:
+        error = errors.get(f"1721-A1-{year}-{entry['employee']}.pdf")
+        summary["failed" if error else "success"] += 1
+        summary["details"].append(
+            {
+                "employee": entry["employee"],
+                "employee_name": entry.get("employee_name"),
+                "status_pajak": entry["status_pajak"],
+                "status": "Failed" if error else "Success",
+                "message": (error or "Form generated successfully")[:100],
+            }
+        )
+
+    debug_log(
+        f"Form 1721-A1 bulk generation for {year}: {summary['success']}/{summary['total']} "
+        f"succeeded, {summary['failed']} failed",
+        "Form 1721-A1",
+    )
+    return summary
+
+
+@frappe.whitelist()
+def enqueue_form_1721_a1_bulk(
+    year: int, company: Optional[str] = None, render_pdf: int = 1
+) -> Dict[str, Any]:
+    """
+    Run the bulk Form 1721-A1 generation in the background
+
+    Args:
+        year: Tax year
+        company: Restrict to one company (optional)
+        render_pdf: Whether to render the PDF archive
+
+    Returns:
+        dict: job_name and whether it was queued (False if already running)
+    """
+    if not frappe.has_permission("Employee Tax Summary", "export"):
+        frappe.throw(_("Not permitted to export Tax Summary data"), frappe.PermissionError)
+
+    from payroll_indonesia.utilities.job_registry import enqueue_registered
+
+    job_name = f"form_1721_a1:{cint(year)}:{company or 'all'}"
+    queued = enqueue_registered(
+        RUN_METHOD,
+        job_name=job_name,
+        queue="long",
+        timeout=4 * 3600,
+        year=cint(year),
+        company=company,
+        render_pdf=bool(cint(render_pdf)),
+    )
+    return {"job_name": job_name, "queued": queued}
@@ -26,6 +26,8 @@ from payroll_indonesia.utilities.cache_utils import get_cached_value, cache_valu
 # Import shared utilities
 from payroll_indonesia.payroll_indonesia.utils import get_employee_details
 
+from payroll_indonesia.utilities.read_replica import replica_reads
+
 
 def update_tax_summaries(month=None, year=None, company=None):
     """
@@ -123,11 +125,19 @@ def update_tax_summaries(month=None, year=None, company=None):
             if company:
                 query_filters.append(["company", "=", company])
 
-            salary_slips = frappe.get_all(
-                "Salary Slip",
-                filters=query_filters,
-                fields=["name", "employee", "employee_name", "company", "gross_pay", "start_date"],
-            )
+            with replica_reads():
+                salary_slips = frappe.get_all(
+                    "Salary Slip",
+                    filters=query_filters,
+                    fields=[
+                        "name",
+                        "employee",
+                        "employee_name",
+                        "company",
+                        "gross_pay",
+                        "start_date",
+                    ],
+                )
 
             # Cache the results for efficiency
             cache_value(cache_key, salary_slips, CACHE_MEDIUM)
@@ -560,7 +570,8 @@ def calculate_monthly_totals(slip_names):
               AND parentfield = 'deductions'
               AND (salary_component IN ('BPJS JHT Employee', 'BPJS JP Employee', 'BPJS Kesehatan Employee', 'PPh 21'))
         """
-        components_list = frappe.db.sql(component_query, [tuple(slip_names)], as_dict=True)
+        with replica_reads():
+            components_list = frappe.db.sql(component_query, [tuple(slip_names)], as_dict=True)
 
         # Organize components by slip
         for comp in components_list:
@@ -0,0 +1,614 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025, PT. Innovasi Terbaik Bangsa and contributors
+# For license information, please see license.txt
+
+"""
+What-if simulation of payroll rule changes over the whole workforce.
+
+The last N months of submitted salary slips are loaded once into a columnar
+WorkforceSnapshot: one row per employee and month with gross pay, TER flag,
+tax status and BPJS enrollment. A settings snapshot (same sections as
+config/defaults.json: bpjs, tax, ptkp, ptkp_to_ter_mapping, ter_rates and
+tax_brackets) is compiled into lookup arrays and applied to every row at
+once: BPJS contributions with their salary caps, the TER rate lookup per
+category and annualized progressive tax on the compiled bracket table.
+
+simulate_payroll_changes runs the current site settings and the same
+settings with the requested changes applied over the same snapshot, and
+reports per-employee and total deltas of PPh 21, BPJS and net pay. Both
+sides use the same model, so the deltas isolate the effect of the change.
+
+NumPy is used when installed; without it the rows are evaluated one by one
+with the same formulas.
+"""
+
+import bisect
+import copy
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import frappe
+from frappe import _
+from frappe.utils import add_months, cint, flt, get_first_day, get_last_day, getdate
+
+from payroll_indonesia.constants import (
+    BIAYA_JABATAN_MAX,
+    BIAYA_JABATAN_PERCENT,
+    DEFAULT_BPJS_RATES,
+    MONTHS_PER_YEAR,
+    VALID_TAX_STATUS,
+)
+from payroll_indonesia.payroll_indonesia.tax.pph_ter import (
+    DEFAULT_TER_RATES,
+    TER_CATEGORIES,
+    TER_CATEGORY_C,
+    map_ptkp_to_ter_category,
+)
+from payroll_indonesia.payroll_indonesia.tax.progressive_tax import (
+    compile_bracket_table,
+    get_compiled_bracket_table,
+)
+from payroll_indonesia.payroll_indonesia.tax.ter_logic import get_ptkp_amount
+from payroll_indonesia.payroll_indonesia.utils import _load_defaults_json, get_bpjs_settings
+from payroll_indonesia.utilities.read_replica import replica_reads
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, rows are then simulated one by one
+    np = None
+
+__all__ = [
+    "WorkforceSnapshot",
+    "load_workforce_snapshot",
+    "get_current_settings",
+    "apply_setting_changes",
+    "simulate",
+    "compare_scenarios",
+    "simulate_payroll_changes",
+]
+
+# Months of slips loaded when none are given
+DEFAULT_MONTHS = 3
+
+# Snapshots are reused within a process for this many seconds
+SNAPSHOT_TTL = 300
+
+# Settings sections changed key by key (ter_rates per category, tax_brackets whole)
+MERGED_SECTIONS = ("bpjs", "tax", "ptkp", "ptkp_to_ter_mapping")
+
+# Per-row results, summed per employee
+METRICS = ("pph21", "bpjs_employee", "bpjs_employer")
+
+_snapshot_cache: Dict[Tuple, Tuple[float, "WorkforceSnapshot"]] = {}
+
+SNAPSHOT_QUERY = """
+    SELECT
+        ss.employee,
+        emp.status_pajak,
+        emp.ikut_bpjs_kesehatan,
+        emp.ikut_bpjs_ketenagakerjaan,
+        YEAR(ss.start_date) AS year,
+        MONTH(ss.start_date) AS month,
+        SUM(ss.gross_pay) AS gross_pay,
+        MAX(ss.is_using_ter) AS is_using_ter
+    FROM `tabSalary Slip` ss
+    INNER JOIN `tabEmployee` emp ON emp.name = ss.employee
+    WHERE ss.docstatus = 1
+        AND ss.start_date BETWEEN %(from_date)s AND %(to_date)s
+        {company_condition}
+    GROUP BY ss.employee, emp.status_pajak, emp.ikut_bpjs_kesehatan,
+        emp.ikut_bpjs_ketenagakerjaan, YEAR(ss.start_date), MONTH(ss.start_date)
+    ORDER BY ss.employee
+"""
+
+
+class WorkforceSnapshot:
+    """
+    Columnar slip aggregates, one row per employee and month.
+
+    employee_index and status_index point into employees and statuses; the
+    remaining columns are floats (enrollment and TER flags as 0/1). Columns
+    are NumPy arrays when NumPy is installed, otherwise lists.
+    """
+
+    __slots__ = (
+        "from_date",
+        "to_date",
+        "employees",
+        "statuses",
+        "employee_index",
+        "status_index",
+        "gross",
+        "is_using_ter",
+        "kesehatan",
+        "ketenagakerjaan",
+    )
+
+    def __init__(self, from_date: Any, to_date: Any, rows: Iterable[Tuple]):
+        self.from_date = from_date
+        self.to_date = to_date
+        self.employees: List[str] = []
+        self.statuses: List[str] = []
+
+        employee_positions: Dict[str, int] = {}
+        status_positions: Dict[str, int] = {}
+        columns = ([], [], [], [], [], [])
+
+        for employee, status_pajak, kesehatan, ketenagakerjaan, gross, is_using_ter in rows:
+            if employee not in employee_positions:
+                employee_positions[employee] = len(self.employees)
+                self.employees.append(employee)
+
+            status_pajak = (status_pajak or "TK0").strip().upper()
+            if status_pajak not in status_positions:
+                status_positions[status_pajak] = len(self.statuses)
+                self.statuses.append(status_pajak)
+
+            for column, value in zip(
+                columns,
+                (
+                    employee_positions[employee],
+                    status_positions[status_pajak],
+                    flt(gross),
+                    1.0 if cint(is_using_ter) else 0.0,
+                    # Enrollment defaults to 1, as in check_bpjs_enrollment
+                    1.0 if cint(1 if kesehatan is None else kesehatan) else 0.0,
+                    1.0 if cint(1 if ketenagakerjaan is None else ketenagakerjaan) else 0.0,
+                ),
+            ):
+                column.append(value)
+
+        if np is not None:
+            columns = (
+                np.asarray(columns[0], dtype=np.int64),
+                np.asarray(columns[1], dtype=np.int64),
+            ) + tuple(np.asarray(column, dtype=float) for column in columns[2:])
+
+        (
+            self.employee_index,
+            self.status_index,
+            self.gross,
+            self.is_using_ter,
+            self.kesehatan,
+            self.ketenagakerjaan,
+        ) = columns
+
+    def __len__(self) -> int:
+        return len(self.gross)
+
+
+def _latest_slip_month(company: Optional[str]):
+    filters = {"docstatus": 1}
+    if company:
+        filters["company"] = company
+    latest = frappe.db.get_value("Salary Slip", filters, "max(start_date)")
+    return getdate(latest) if latest else None
+
+
+def load_workforce_snapshot(
+    months: int = DEFAULT_MONTHS, company: Optional[str] = None, use_cache: bool = True
+) -> Optional[WorkforceSnapshot]:
+    """
+    Load the last months of submitted slips into a WorkforceSnapshot
+
+    The window ends with the month of the latest submitted slip. Snapshots
+    are reused within the process for SNAPSHOT_TTL seconds.
+
+    Args:
+        months: Number of months to load
+        company: Restrict to one company (optional)
+        use_cache: Whether a recent snapshot of this process may be reused
+
+    Returns:
+        WorkforceSnapshot: Loaded rows, None when there are no submitted slips
+    """
+    months = max(cint(months), 1)
+    cache_key = (frappe.local.site, company or "", months)
+    cached = _snapshot_cache.get(cache_key)
+    if use_cache and cached and time.monotonic() - cached[0] < SNAPSHOT_TTL:
+        return cached[1]
+
+    with replica_reads():
+        latest = _latest_slip_month(company)
+        if not latest:
+            return None
+
+        to_date = get_last_day(latest)
+        from_date = get_first_day(add_months(latest, -(months - 1)))
+        values = {"from_date": from_date, "to_date": to_date}
+        company_condition = ""
+        if company:
+            company_condition = "AND ss.company = %(company)s"
+            values["company"] = company
+
+        with frappe.db.unbuffered_cursor():
+            rows = frappe.db.sql(
+                SNAPSHOT_QUERY.format(company_condition=company_condition),
+                values,
+                as_iterator=True,
+            )
+            snapshot = WorkforceSnapshot(
+                from_date,
+                to_date,
+                (
+                    (employee, status, kesehatan, ketenagakerjaan, gross, is_using_ter)
+                    for (
+                        employee,
+                        status,
+                        kesehatan,
+                        ketenagakerjaan,
+                        _year,
+                        _month,
+                        gross,
+                        is_using_ter,
+                    ) in rows
+                ),
+            )
+
+    _snapshot_cache[cache_key] = (time.monotonic(), snapshot)
+    return snapshot
+
+
+def _load_ter_rates() -> Dict[str, List[Dict[str, Any]]]:
+    """TER rows per category from PPh 21 TER Table, defaults.json when empty."""
+    rates: Dict[str, List[Dict[str, Any]]] = {}
+    if frappe.db.exists("DocType", "PPh 21 TER Table"):
+        for row in frappe.get_all(
+            "PPh 21 TER Table",
+            fields=["status_pajak", "income_from", "income_to", "rate", "is_highest_bracket"],
+            order_by="status_pajak asc, income_from asc",
+        ):
+            rates.setdefault(row.status_pajak, []).append(
+                {
+                    "income_from": flt(row.income_from),
+                    "income_to": flt(row.income_to),
+                    "rate": flt(row.rate),
+                    "is_highest_bracket": cint(row.is_highest_bracket),
+                }
+            )
+
+    if not rates:
+        rates = copy.deepcopy((_load_defaults_json() or {}).get("ter_rates") or {})
+    return rates
+
+
+def get_current_settings() -> Dict[str, Any]:
+    """
+    Settings snapshot of the site as used by the live calculators
+
+    Returns:
+        dict: bpjs, tax, ptkp, ptkp_to_ter_mapping, ter_rates and
+            tax_brackets sections in the layout of config/defaults.json
+    """
+    bpjs = dict(DEFAULT_BPJS_RATES)
+    for program, values in (get_bpjs_settings() or {}).items():
+        for key, value in (values or {}).items():
+            if f"{program}_{key}" in bpjs:
+                bpjs[f"{program}_{key}"] = flt(value)
+
+    mapping = {}
+    for status in VALID_TAX_STATUS:
+        try:
+            mapping[status] = map_ptkp_to_ter_category(status)
+        except ValueError:
+            mapping[status] = TER_CATEGORY_C
+
+    return {
+        "bpjs": bpjs,
+        "tax": {
+            "biaya_jabatan_percent": BIAYA_JABATAN_PERCENT,
+            "biaya_jabatan_max": BIAYA_JABATAN_MAX,
+        },
+        "ptkp": {status: flt(get_ptkp_amount(status)) for status in VALID_TAX_STATUS},
+        "ptkp_to_ter_mapping": mapping,
+        "ter_rates": _load_ter_rates(),
+        "tax_brackets": [
+            {"income_from": income_from, "income_to": income_to, "tax_rate": tax_rate}
+            for income_from, income_to, tax_rate in get_compiled_bracket_table().rows
+        ],
+    }
+
+
+def apply_setting_changes(settings: Dict[str, Any], changes: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Apply changes to a settings snapshot without modifying it
+
+    bpjs, tax, ptkp and ptkp_to_ter_mapping are merged key by key;
+    tax_brackets and the categories given under ter_rates are replaced.
+
+    Args:
+        settings: Settings snapshot (see get_current_settings)
+        changes: Sections to change, e.g. {"bpjs": {"jp_max_salary": 10042300}}
+
+    Returns:
+        dict: New settings snapshot
+    """
+    result = copy.deepcopy(settings)
+    for section, values in (changes or {}).items():
+        if section in MERGED_SECTIONS:
+            if not isinstance(values, dict):
+                frappe.throw(_("Settings section {0} must be an object").format(section))
+            if section in ("bpjs", "tax"):
+                unknown = set(values) - set(result[section])
+                if unknown:
+                    frappe.throw(
+                        _("Unknown {0} settings: {1}").format(section, ", ".join(sorted(unknown)))
+                    )
+            if section == "ptkp_to_ter_mapping":
+                result[section].update(values)
+            else:
+                result[section].update({key: flt(value) for key, value in values.items()})
+        elif section == "ter_rates":
+            result[section].update(copy.deepcopy(values))
+        elif section == "tax_brackets":
+            result[section] = copy.deepcopy(values)
+        else:
+            frappe.throw(_("Unknown settings section: {0}").format(section))
+
+    return result
+
+
+class _CompiledSettings:
+    """Settings snapshot reduced to the numbers and tables the calculators use."""
+
+    def __init__(self, settings: Dict[str, Any], statuses: List[str]):
+        bpjs = settings["bpjs"]
+        self.bpjs = {key: flt(value) for key, value in bpjs.items()}
+        self.biaya_jabatan_rate = flt(settings["tax"]["biaya_jabatan_percent"]) / 100
+        self.biaya_jabatan_max = flt(settings["tax"]["biaya_jabatan_max"])
+        self.bracket_table = compile_bracket_table(settings["tax_brackets"])
+
+        # TER tables as (income starts, rates as fractions) per category
+        self.ter_tables = {}
+        for category in TER_CATEGORIES:
+            rows = sorted(
+                settings["ter_rates"].get(category) or [],
+                key=lambda row: flt(row.get("income_from")),
+            )
+            if rows:
+                self.ter_tables[category] = (
+                    tuple(flt(row.get("income_from")) for row in rows),
+                    tuple(flt(row.get("rate")) / 100 for row in rows),
+                )
+            else:
+                self.ter_tables[category] = ((0.0,), (DEFAULT_TER_RATES[category],))
+
+        # Per tax status of the snapshot
+        mapping = settings["ptkp_to_ter_mapping"]
+        ptkp = settings["ptkp"]
+        self.status_ptkp = [flt(ptkp.get(status, ptkp.get("TK0"))) for status in statuses]
+        self.status_category = [
+            mapping.get(status) if mapping.get(status) in TER_CATEGORIES else TER_CATEGORY_C
+            for status in statuses
+        ]
+
+
+def _ter_rate(table: Tuple[Tuple[float, ...], Tuple[float, ...]], gross: float) -> float:
+    starts, rates = table
+    if gross <= 0:
+        return 0.0
+    return rates[max(bisect.bisect_right(starts, gross) - 1, 0)]
+
+
+def _simulate_row(
+    compiled: _CompiledSettings,
+    gross: float,
+    status_index: int,
+    is_using_ter: float,
+    kesehatan: float,
+    ketenagakerjaan: float,
+) -> Tuple[float, float, float]:
+    """Reference calculation of one row: PPh 21, employee and employer BPJS."""
+    bpjs = compiled.bpjs
+    kesehatan_base = min(gross, bpjs["kesehatan_max_salary"])
+    jp_base = min(gross, bpjs["jp_max_salary"])
+
+    employee_parts = (
+        kesehatan * kesehatan_base * bpjs["kesehatan_employee_percent"] / 100,
+        ketenagakerjaan * gross * bpjs["jht_employee_percent"] / 100,
+        ketenagakerjaan * jp_base * bpjs["jp_employee_percent"] / 100,
+    )
+    employer_parts = (
+        kesehatan * kesehatan_base * bpjs["kesehatan_employer_percent"] / 100,
+        ketenagakerjaan * gross * bpjs["jht_employer_percent"] / 100,
+        ketenagakerjaan * jp_base * bpjs["jp_employer_percent"] / 100,
+        ketenagakerjaan * gross * bpjs["jkk_percent"] / 100,
+        ketenagakerjaan * gross * bpjs["jkm_percent"] / 100,
+    )
+    # Components are rounded to whole rupiah like hitung_bpjs
+    bpjs_employee = sum(round(part) for part in employee_parts)
+    bpjs_employer = sum(round(part) for part in employer_parts)
+
+    if is_using_ter:
+        category = compiled.status_category[status_index]
+        pph21 = gross * _ter_rate(compiled.ter_tables[category], gross)
+    else:
+        biaya_jabatan = min(gross * compiled.biaya_jabatan_rate, compiled.biaya_jabatan_max)
+        netto = (gross - biaya_jabatan - bpjs_employee) * MONTHS_PER_YEAR
+        pkp = max(netto - compiled.status_ptkp[status_index], 0)
+        pph21 = compiled.bracket_table.tax(pkp) / MONTHS_PER_YEAR
+
+    return pph21, float(bpjs_employee), float(bpjs_employer)
+
+
+def _simulate_arrays(compiled: _CompiledSettings, snapshot: WorkforceSnapshot):
+    """Vectorized _simulate_row over all rows of the snapshot."""
+    bpjs = compiled.bpjs
+    gross = snapshot.gross
+    kesehatan = snapshot.kesehatan
+    ketenagakerjaan = snapshot.ketenagakerjaan
+
+    kesehatan_base = np.minimum(gross, bpjs["kesehatan_max_salary"])
+    jp_base = np.minimum(gross, bpjs["jp_max_salary"])
+
+    bpjs_employee = (
+        np.round(kesehatan * kesehatan_base * bpjs["kesehatan_employee_percent"] / 100)
+        + np.round(ketenagakerjaan * gross * bpjs["jht_employee_percent"] / 100)
+        + np.round(ketenagakerjaan * jp_base * bpjs["jp_employee_percent"] / 100)
+    )
+    bpjs_employer = (
+        np.round(kesehatan * kesehatan_base * bpjs["kesehatan_employer_percent"] / 100)
+        + np.round(ketenagakerjaan * gross * bpjs["jht_employer_percent"] / 100)
+        + np.round(ketenagakerjaan * jp_base * bpjs["jp_employer_percent"] / 100)
+        + np.round(ketenagakerjaan * gross * bpjs["jkk_percent"] / 100)
+        + np.round(ketenagakerjaan * gross * bpjs["jkm_percent"] / 100)
+    )
+
+    # TER: rate lookup per category on the sorted income starts
+    ter_rate = np.zeros_like(gross)
+    categories = np.asarray(compiled.status_category, dtype=object)[snapshot.status_index]
+    for category, (starts, rates) in compiled.ter_tables.items():
+        mask = categories == category
+        if not mask.any():
+            continue
+        index = np.searchsorted(np.asarray(starts), gross[mask], side="right") - 1
+        ter_rate[mask] = np.asarray(rates)[np.clip(index, 0, len(rates) - 1)]
+    ter_tax = np.where(gross > 0, gross * ter_rate, 0.0)
+
+    # Non-TER: annualized progressive tax
+    biaya_jabatan = np.minimum(gross * compiled.biaya_jabatan_rate, compiled.biaya_jabatan_max)
+    netto = (gross - biaya_jabatan - bpjs_employee) * MONTHS_PER_YEAR
+    ptkp = np.asarray(compiled.status_ptkp, dtype=float)[snapshot.status_index]
+    progressive_tax = (
+        np.asarray(compiled.bracket_table.tax_batch(np.maximum(netto - ptkp, 0))) / MONTHS_PER_YEAR
+    )
+
+    pph21 = np.where(snapshot.is_using_ter > 0, ter_tax, progressive_tax)
+    return pph21, bpjs_employee, bpjs_employer
+
+
+def simulate(snapshot: WorkforceSnapshot, settings: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Apply a settings snapshot to every row and sum the results per employee
+
+    Args:
+        snapshot: Workforce snapshot
+        settings: Settings snapshot (see get_current_settings)
+
+    Returns:
+        dict: pph21, bpjs_employee and bpjs_employer per employee (in the
+            order of snapshot.employees), as arrays or lists
+    """
+    compiled = _CompiledSettings(settings, snapshot.statuses)
+    employee_count = len(snapshot.employees)
+
+    if np is not None:
+        columns = _simulate_arrays(compiled, snapshot)
+        return {
+            metric: np.bincount(snapshot.employee_index, weights=column, minlength=employee_count)
+            for metric, column in zip(METRICS, columns)
+        }
+
+    result = {metric: [0.0] * employee_count for metric in METRICS}
+    for row in zip(
+        snapshot.employee_index,
+        snapshot.gross,
+        snapshot.status_index,
+        snapshot.is_using_ter,
+        snapshot.kesehatan,
+        snapshot.ketenagakerjaan,
+    ):
+        for metric, value in zip(METRICS, _simulate_row(compiled, *row[1:])):
+            result[metric][row[0]] += value
+    return result
+
+
+def compare_scenarios(
+    snapshot: WorkforceSnapshot,
+    baseline: Dict[str, Any],
+    scenario: Dict[str, Any],
+    limit: int = 50,
+) -> Dict[str, Any]:
+    """
+    Simulate two settings snapshots on the same rows and report the deltas
+
+    Args:
+        snapshot: Workforce snapshot
+        baseline: Settings snapshot of the current rules
+        scenario: Settings snapshot of the proposed rules
+        limit: Number of most affected employees to list, 0 for all
+
+    Returns:
+        dict: totals (baseline, scenario and delta per metric, with net_pay
+            and employer_cost deltas), affected_employees and employees
+            (largest absolute change first)
+    """
+    before = simulate(snapshot, baseline)
+    after = simulate(snapshot, scenario)
+
+    totals = {"baseline": {}, "scenario": {}, "delta": {}}
+    for metric in METRICS:
+        totals["baseline"][metric] = flt(sum(before[metric]), 2)
+        totals["scenario"][metric] = flt(sum(after[metric]), 2)
+        totals["delta"][metric] = flt(totals["scenario"][metric] - totals["baseline"][metric], 2)
+    totals["delta"]["net_pay"] = -flt(
+        totals["delta"]["pph21"] + totals["delta"]["bpjs_employee"], 2
+    )
+    totals["delta"]["employer_cost"] = totals["delta"]["bpjs_employer"]
+
+    employees = []
+    for position, employee in enumerate(snapshot.employees):
+        entry = {"employee": employee}
+        impact = 0.0
+        for metric in METRICS:
+            delta = flt(after[metric][position] - before[metric][position], 2)
+            entry[metric] = flt(before[metric][position], 2)
+            entry[f"{metric}_delta"] = delta
+            impact += abs(delta)
+        if impact >= 0.01:
+            entry["net_pay_delta"] = -flt(entry["pph21_delta"] + entry["bpjs_employee_delta"], 2)
+            entry["impact"] = flt(impact, 2)
+            employees.append(entry)
+
+    employees.sort(key=lambda entry: entry["impact"], reverse=True)
+    return {
+        "totals": totals,
+        "affected_employees": len(employees),
+        "employees": employees[:limit] if cint(limit) > 0 else employees,
+    }
+
+
+@frappe.whitelist()
+def simulate_payroll_changes(
+    changes: Any,
+    months: int = DEFAULT_MONTHS,
+    company: Optional[str] = None,
+    limit: int = 50,
+) -> Dict[str, Any]:
+    """
+    Estimate the effect of settings changes on the last months of payroll
+
+    Args:
+        changes: Settings sections to change (dict or JSON), e.g.
+            {"bpjs": {"jp_max_salary": 10042300}} or {"ptkp": {"TK0": 60000000}}
+        months: Number of months of submitted slips to simulate
+        company: Restrict to one company (optional)
+        limit: Number of most affected employees to list, 0 for all
+
+    Returns:
+        dict: period, rows, employee_count, totals, affected_employees,
+            employees (see compare_scenarios) and elapsed seconds
+    """
+    frappe.only_for(["System Manager", "HR Manager"])
+
+    started = time.monotonic()
+    changes = frappe.parse_json(changes) if isinstance(changes, str) else changes
+
+    baseline = get_current_settings()
+    scenario = apply_setting_changes(baseline, changes or {})
+
+    snapshot = load_workforce_snapshot(months, company)
+    if not snapshot or not len(snapshot):
+        return {"status": "error", "message": _("No submitted salary slips to simulate")}
+
+    result = compare_scenarios(snapshot, baseline, scenario, cint(limit))
+    result.update(
+        {
+            "status": "success",
+            "period": {"from_date": str(snapshot.from_date), "to_date": str(snapshot.to_date)},
+            "rows": len(snapshot),
+            "employee_count": len(snapshot.employees),
+            "elapsed": round(time.monotonic() - started, 3),
+        }
+    )
+    return result
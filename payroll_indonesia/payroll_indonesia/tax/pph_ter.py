@@ -18,12 +18,19 @@ from __future__ import annotations
 
 import functools
 import json
-from typing import List, Optional, Tuple, Union
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 import frappe
-from frappe.utils import flt
+from frappe.utils import cint, flt, now
 
-__all__ = ["get_ter_rate", "map_ptkp_to_ter_category", "validate_ter_data_availability"]
+__all__ = [
+    "get_ter_rate",
+    "map_ptkp_to_ter_category",
+    "validate_ter_data_availability",
+    "get_ter_table_version",
+    "bump_ter_table_version",
+    "sync_ter_table",
+]
 
 # Constants for TER categories
 TER_CATEGORY_A = "TER A"
@@ -43,6 +50,11 @@ DEFAULT_TER_RATES = {
 # Initialize logger
 logger = frappe.logger("payroll_indonesia.payroll_indonesia.tax")
 
+# Redis key of the PPh 21 TER Table version, bumped whenever the table changes
+TER_TABLE_VERSION_KEY = "payroll_indonesia:ter_table_version"
+
+TER_TABLE = "PPh 21 TER Table"
+
 
 def normalize_ter_category(category: str) -> str:
     """
@@ -72,11 +84,60 @@ def normalize_ter_category(category: str) -> str:
     return category
 
 
-@functools.lru_cache(maxsize=128)
+def get_ter_table_version() -> int:
+    """
+    Get the current PPh 21 TER Table version.
+
+    Returns:
+        int: Version counter, 0 if the table was never synced
+    """
+    cache = frappe.cache()
+    return cint(cache.get(cache.make_key(TER_TABLE_VERSION_KEY)))
+
+
+def bump_ter_table_version() -> int:
+    """
+    Invalidate cached TER rates after the PPh 21 TER Table changed.
+
+    Increments the shared version, which retires the per-process rate cache
+    in every worker, and clears TER entries from the cache manager.
+
+    Returns:
+        int: New version counter
+    """
+    from payroll_indonesia.utilities.cache_utils import clear_cache
+
+    cache = frappe.cache()
+    version = cint(cache.incr(cache.make_key(TER_TABLE_VERSION_KEY)))
+    clear_cache("ter_rate:")
+    _get_ter_rate.cache_clear()
+    return version
+
+
 def get_ter_rate(category: str, income: Union[float, int]) -> float:
     """
     Get the TER (Tarif Efektif Rata-rata) rate for a given category and income level.
 
+    Results are cached per process for the current TER table version.
+
+    Args:
+        category: TER category ('A', 'B', 'C', 'TER A', 'TER B', 'TER C')
+        income: Monthly income amount
+
+    Returns:
+        float: The TER rate as decimal (e.g., 0.05 for 5%)
+
+    Raises:
+        ValueError: If inputs are invalid
+    """
+    return _get_ter_rate(category, income, get_ter_table_version())
+
+
+@functools.lru_cache(maxsize=128)
+def _get_ter_rate(category: str, income: Union[float, int], version: int = 0) -> float:
+    """
+    Get the TER (Tarif Efektif Rata-rata) rate for a given category and income level.
+
     Implements a hierarchical lookup strategy:
     1. Query DocType 'PPh 21 TER Table' for matching category & income range.
     2. If not found, read defaults from settings.
@@ -85,6 +146,7 @@ def get_ter_rate(category: str, income: Union[float, int]) -> float:
     Args:
         category: TER category ('A', 'B', 'C', 'TER A', 'TER B', 'TER C')
         income: Monthly income amount
+        version: TER table version, only part of the cache key
 
     Returns:
         float: The TER rate as decimal (e.g., 0.05 for 5%)
@@ -382,3 +444,201 @@ def calculate_monthly_tax_with_ter(
     monthly_tax = flt(income_value * ter_rate)
 
     return monthly_tax, ter_rate
+
+
+def _normalize_ter_row(category: str, rate_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Normalize one TER bracket the way PPh 21 TER Table validation does.
+
+    Returns:
+        dict: Normalized row, or None if the bracket is invalid
+    """
+    from payroll_indonesia.payroll_indonesia.doctype.pph_21_ter_table.pph_21_ter_table import (
+        build_ter_description,
+    )
+
+    if not isinstance(rate_data, dict):
+        return None
+
+    income_from = flt(rate_data.get("income_from", 0))
+    income_to = flt(rate_data.get("income_to", 0))
+    rate = flt(rate_data.get("rate", 0))
+    is_highest_bracket = cint(rate_data.get("is_highest_bracket", 0))
+
+    if income_to == 0:
+        is_highest_bracket = 1
+    elif is_highest_bracket:
+        income_to = 0
+
+    if rate < 0 or rate > 100 or income_from < 0:
+        return None
+    if income_to > 0 and income_from >= income_to:
+        return None
+
+    return {
+        "status_pajak": category,
+        "income_from": income_from,
+        "income_to": income_to,
+        "rate": rate,
+        "is_highest_bracket": is_highest_bracket,
+        "description": build_ter_description(
+            category, income_from, income_to, rate, is_highest_bracket
+        ),
+    }
+
+
+def diff_ter_table(
+    existing: List[Dict[str, Any]], rates_by_category: Dict[str, List[Dict[str, Any]]]
+) -> Dict[str, Any]:
+    """
+    Compare PPh 21 TER Table rows against the configured brackets.
+
+    Rows are matched on (status_pajak, income_from, income_to). Only
+    categories present in rates_by_category are compared, so rows of other
+    categories are never deleted.
+
+    Args:
+        existing: Current table rows with name and the bracket fields
+        rates_by_category: Category -> list of bracket dicts
+
+    Returns:
+        dict: inserts (rows), updates (rows with name), deletes (names) and
+            invalid (count of brackets that failed validation)
+    """
+    diff = {"inserts": [], "updates": [], "deletes": [], "invalid": 0}
+    current = {}
+    for row in existing:
+        if row["status_pajak"] in rates_by_category:
+            key = (row["status_pajak"], flt(row["income_from"]), flt(row["income_to"]))
+            current.setdefault(key, []).append(row)
+
+    seen = set()
+    for category, rates in rates_by_category.items():
+        for rate_data in rates or []:
+            row = _normalize_ter_row(category, rate_data)
+            if not row:
+                diff["invalid"] += 1
+                continue
+
+            key = (category, row["income_from"], row["income_to"])
+            if key in seen:
+                continue
+            seen.add(key)
+
+            matches = current.pop(key, None)
+            if not matches:
+                diff["inserts"].append(row)
+                continue
+
+            # Keep the first match, drop duplicates of the same bracket
+            match = matches[0]
+            diff["deletes"].extend(dup["name"] for dup in matches[1:])
+            if (
+                flt(match["rate"]) != row["rate"]
+                or cint(match["is_highest_bracket"]) != row["is_highest_bracket"]
+                or (match.get("description") or "") != row["description"]
+            ):
+                diff["updates"].append(dict(row, name=match["name"]))
+
+    for rows in current.values():
+        diff["deletes"].extend(row["name"] for row in rows)
+
+    return diff
+
+
+def _ter_row_name(row: Dict[str, Any]) -> str:
+    """Name a new TER row the way a regular insert would."""
+    from frappe.model.naming import set_name_from_naming_options
+
+    doc = frappe._dict(row, doctype=TER_TABLE)
+    set_name_from_naming_options(frappe.get_meta(TER_TABLE).autoname, doc)
+    return doc.name
+
+
+def sync_ter_table(rates_by_category: Dict[str, List[Dict[str, Any]]]) -> Dict[str, int]:
+    """
+    Sync the PPh 21 TER Table with configured brackets in bulk.
+
+    Existing rows are loaded with one query, the difference is computed in
+    memory and applied with one DELETE, one UPDATE and one bulk INSERT. The
+    TER table version is bumped when anything changed.
+
+    Args:
+        rates_by_category: Category -> list of bracket dicts
+
+    Returns:
+        dict: Counts of inserted, updated, deleted and invalid brackets
+    """
+    existing = frappe.db.sql(
+        """
+        SELECT name, status_pajak, income_from, income_to, rate, is_highest_bracket, description
+        FROM `tabPPh 21 TER Table`
+        WHERE status_pajak IN %s
+        """,
+        (tuple(rates_by_category) or ("",),),
+        as_dict=1,
+    )
+    diff = diff_ter_table(existing, rates_by_category)
+    timestamp, user = now(), frappe.session.user
+
+    if diff["deletes"]:
+        frappe.db.sql(
+            "DELETE FROM `tabPPh 21 TER Table` WHERE name IN %s", (tuple(diff["deletes"]),)
+        )
+
+    if diff["updates"]:
+        names = tuple(row["name"] for row in diff["updates"])
+        cases = {field: [] for field in ("rate", "is_highest_bracket", "description")}
+        values = []
+        for field, parts in cases.items():
+            for row in diff["updates"]:
+                parts.append("WHEN %s THEN %s")
+                values.extend([row["name"], row[field]])
+        set_clause = ", ".join(
+            f"`{field}` = CASE name {' '.join(parts)} END" for field, parts in cases.items()
+        )
+        frappe.db.sql(
+            f"""
+            UPDATE `tabPPh 21 TER Table`
+            SET {set_clause}, modified = %s, modified_by = %s
+            WHERE name IN %s
+            """,
+            tuple(values) + (timestamp, user, names),
+        )
+
+    if diff["inserts"]:
+        fields = [
+            "name",
+            "creation",
+            "modified",
+            "owner",
+            "modified_by",
+            "docstatus",
+            "status_pajak",
+            "income_from",
+            "income_to",
+            "rate",
+            "is_highest_bracket",
+            "description",
+        ]
+        frappe.db.bulk_insert(
+            TER_TABLE,
+            fields=fields,
+            values=[
+                (_ter_row_name(row), timestamp, timestamp, user, user, 0)
+                + tuple(row[field] for field in fields[6:])
+                for row in diff["inserts"]
+            ],
+        )
+
+    result = {
+        "inserted": len(diff["inserts"]),
+        "updated": len(diff["updates"]),
+        "deleted": len(diff["deletes"]),
+        "invalid": diff["invalid"],
+    }
+    if result["inserted"] or result["updated"] or result["deleted"]:
+        bump_ter_table_version()
+        logger.info(f"PPh 21 TER Table synced: {result}")
+
+    return result
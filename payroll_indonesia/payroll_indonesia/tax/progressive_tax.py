@@ -0,0 +1,306 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025, PT. Innovasi Terbaik Bangsa and contributors
+# For license information, please see license.txt
+
+"""
+Compiled progressive tax (Pasal 17) bracket tables.
+
+A bracket table is compiled once into parallel tuples holding the start of
+each bracket, its rate and the cumulative tax owed at that start. Annual tax
+for any PKP is then a bisect plus a single multiply-add instead of a walk
+over every bracket, and whole arrays of PKP values can be taxed at once with
+NumPy when it is installed.
+
+Compiled tables are memoized on the bracket rows themselves, so callers that
+pass the same PPh 21 Settings document never rebuild the table.
+"""
+
+from __future__ import annotations
+
+import bisect
+import functools
+from typing import Any, Iterable, List, Optional, Sequence, Tuple
+
+import frappe
+from frappe.utils import flt
+
+from payroll_indonesia.constants import CACHE_LONG
+from payroll_indonesia.utilities.cache_utils import get_cached_value, cache_value
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, batch calls fall back to pure Python
+    np = None
+
+__all__ = [
+    "DEFAULT_TAX_BRACKETS",
+    "CompiledBracketTable",
+    "compile_bracket_table",
+    "get_compiled_bracket_table",
+    "get_default_bracket_table",
+    "calculate_progressive_tax_batch",
+]
+
+# Default brackets based on UU HPP 2021 (income_to 0 means unlimited)
+DEFAULT_TAX_BRACKETS = (
+    {"income_from": 0, "income_to": 60000000, "tax_rate": 5},
+    {"income_from": 60000000, "income_to": 250000000, "tax_rate": 15},
+    {"income_from": 250000000, "income_to": 500000000, "tax_rate": 25},
+    {"income_from": 500000000, "income_to": 5000000000, "tax_rate": 30},
+    {"income_from": 5000000000, "income_to": 0, "tax_rate": 35},
+)
+
+# Cache key for bracket rows loaded from PPh 21 Settings. Lives in the
+# tax_settings namespace so clear_tax_settings_cache() on settings update
+# also drops the compiled table.
+BRACKET_ROWS_CACHE_KEY = "tax_settings:pph21_bracket_rows"
+
+BracketRow = Tuple[float, float, float]
+
+
+class CompiledBracketTable:
+    """
+    Immutable progressive tax table with precomputed cumulative tax.
+
+    Bracket widths are taken from ``income_to - income_from`` and laid end to
+    end from zero, which matches how the previous linear implementation
+    consumed PKP bracket by bracket.
+    """
+
+    __slots__ = ("rows", "starts", "ends", "rates", "cumulative_tax", "_np_arrays")
+
+    def __init__(self, rows: Sequence[BracketRow]):
+        starts: List[float] = []
+        ends: List[float] = []
+        rates: List[float] = []
+        cumulative: List[float] = []
+
+        position = 0.0
+        running_tax = 0.0
+        for income_from, income_to, tax_rate in rows:
+            width = income_to - income_from if income_to > 0 else float("inf")
+            if width <= 0:
+                continue
+
+            starts.append(position)
+            ends.append(position + width)
+            rates.append(tax_rate / 100.0)
+            cumulative.append(running_tax)
+
+            if width == float("inf"):
+                # Brackets after an unlimited one can never be reached
+                break
+
+            position += width
+            running_tax += width * (tax_rate / 100.0)
+
+        self.rows = tuple(rows)
+        self.starts = tuple(starts)
+        self.ends = tuple(ends)
+        self.rates = tuple(rates)
+        self.cumulative_tax = tuple(cumulative)
+        self._np_arrays = None
+
+    def _index(self, pkp: float) -> int:
+        """Return index of the bracket containing pkp, or -1 when pkp is zero."""
+        if pkp <= 0 or not self.starts:
+            return -1
+
+        # PKP above the last finite bracket lands on it and is capped at its end
+        return bisect.bisect_left(self.starts, pkp) - 1
+
+    def tax(self, pkp: Any) -> float:
+        """
+        Calculate annual progressive tax for a single PKP value
+
+        Args:
+            pkp: Penghasilan Kena Pajak (taxable income)
+
+        Returns:
+            float: Annual tax
+        """
+        pkp_value = flt(pkp)
+        index = self._index(pkp_value)
+        if index < 0:
+            return 0.0
+
+        taxable = min(pkp_value, self.ends[index]) - self.starts[index]
+        return self.cumulative_tax[index] + taxable * self.rates[index]
+
+    def breakdown(self, pkp: Any) -> List[dict]:
+        """
+        Split a PKP value into per-bracket amounts for notes and reports
+
+        Args:
+            pkp: Penghasilan Kena Pajak (taxable income)
+
+        Returns:
+            list: Dicts with from, to, rate (percent), taxable and tax per bracket
+        """
+        pkp_value = flt(pkp)
+        index = self._index(pkp_value)
+        details = []
+
+        for i in range(index + 1):
+            upper = min(pkp_value, self.ends[i])
+            taxable = upper - self.starts[i]
+            if taxable <= 0:
+                continue
+            details.append(
+                {
+                    "from": self.starts[i],
+                    "to": self.ends[i],
+                    "rate": self.rates[i] * 100,
+                    "taxable": taxable,
+                    "tax": taxable * self.rates[i],
+                }
+            )
+
+        return details
+
+    def tax_batch(self, pkp_values: Iterable[Any]):
+        """
+        Calculate annual progressive tax for many PKP values at once
+
+        Args:
+            pkp_values: Iterable or array of PKP values
+
+        Returns:
+            numpy.ndarray when NumPy is available, otherwise a list of floats
+        """
+        if np is None:
+            return [self.tax(pkp) for pkp in pkp_values]
+
+        pkp_array = np.asarray(pkp_values, dtype=float)
+        if not self.starts:
+            return np.zeros_like(pkp_array)
+
+        if self._np_arrays is None:
+            self._np_arrays = (
+                np.asarray(self.starts, dtype=float),
+                np.asarray(self.ends, dtype=float),
+                np.asarray(self.rates, dtype=float),
+                np.asarray(self.cumulative_tax, dtype=float),
+            )
+        starts, ends, rates, cumulative = self._np_arrays
+
+        clipped = np.clip(pkp_array, 0, ends[-1])
+        index = np.searchsorted(starts, clipped, side="left") - 1
+        index = np.clip(index, 0, len(starts) - 1)
+
+        result = cumulative[index] + (clipped - starts[index]) * rates[index]
+        return np.where(pkp_array > 0, result, 0.0)
+
+
+def _normalize_rows(bracket_table: Iterable[Any]) -> Tuple[BracketRow, ...]:
+    """Convert bracket dicts or child rows into a sorted tuple of plain floats."""
+    rows = []
+    for bracket in bracket_table or []:
+        getter = bracket.get if hasattr(bracket, "get") else functools.partial(getattr, bracket)
+        rows.append(
+            (
+                flt(getter("income_from", 0)),
+                flt(getter("income_to", 0)),
+                flt(getter("tax_rate", 0)),
+            )
+        )
+
+    return tuple(sorted(rows, key=lambda row: row[0]))
+
+
+@functools.lru_cache(maxsize=16)
+def _compile_rows(rows: Tuple[BracketRow, ...]) -> CompiledBracketTable:
+    """Memoized compiler keyed on the normalized bracket rows."""
+    return CompiledBracketTable(rows)
+
+
+def compile_bracket_table(bracket_table: Iterable[Any]) -> CompiledBracketTable:
+    """
+    Compile bracket rows into a CompiledBracketTable
+
+    Args:
+        bracket_table: Bracket dicts or child table rows with income_from,
+            income_to and tax_rate (percent)
+
+    Returns:
+        CompiledBracketTable: Shared compiled table for these rows
+    """
+    rows = _normalize_rows(bracket_table)
+    if not rows:
+        return get_default_bracket_table()
+    return _compile_rows(rows)
+
+
+@functools.lru_cache(maxsize=1)
+def get_default_bracket_table() -> CompiledBracketTable:
+    """
+    Get the compiled UU HPP default bracket table
+
+    Returns:
+        CompiledBracketTable: Compiled DEFAULT_TAX_BRACKETS
+    """
+    return _compile_rows(_normalize_rows(DEFAULT_TAX_BRACKETS))
+
+
+def _load_bracket_rows() -> Tuple[BracketRow, ...]:
+    """Load bracket rows from PPh 21 Settings with a single cached query."""
+    rows = get_cached_value(BRACKET_ROWS_CACHE_KEY)
+    if rows is not None:
+        return rows
+
+    rows = ()
+    try:
+        bracket_table = frappe.db.sql(
+            """
+            SELECT income_from, income_to, tax_rate
+            FROM `tabPPh 21 Tax Bracket`
+            WHERE parent = 'PPh 21 Settings'
+            ORDER BY income_from ASC
+            """,
+            as_dict=1,
+        )
+        rows = _normalize_rows(bracket_table)
+    except Exception as e:
+        frappe.log_error(f"Error querying tax brackets: {str(e)}", "Tax Logic Database Error")
+
+    if not rows:
+        frappe.log_error(
+            "No tax brackets found in settings, using default values", "Tax Logic Default Values"
+        )
+        rows = _normalize_rows(DEFAULT_TAX_BRACKETS)
+
+    cache_value(BRACKET_ROWS_CACHE_KEY, rows, CACHE_LONG)
+    return rows
+
+
+def get_compiled_bracket_table(pph_settings: Optional[Any] = None) -> CompiledBracketTable:
+    """
+    Get the compiled bracket table for the given or stored PPh 21 Settings
+
+    Args:
+        pph_settings: PPh 21 Settings document (optional). When it carries a
+            bracket_table those rows are used, otherwise the stored settings
+            rows are loaded once and cached.
+
+    Returns:
+        CompiledBracketTable: Compiled table ready for lookups
+    """
+    bracket_table = getattr(pph_settings, "bracket_table", None) if pph_settings else None
+    if bracket_table:
+        return compile_bracket_table(bracket_table)
+
+    return _compile_rows(_load_bracket_rows())
+
+
+def calculate_progressive_tax_batch(pkp_values: Iterable[Any], pph_settings: Optional[Any] = None):
+    """
+    Calculate annual progressive tax for an array of PKP values
+
+    Args:
+        pkp_values: Iterable or NumPy array of PKP values
+        pph_settings: PPh 21 Settings document (optional)
+
+    Returns:
+        numpy.ndarray when NumPy is available, otherwise a list of floats
+    """
+    return get_compiled_bracket_table(pph_settings).tax_batch(pkp_values)
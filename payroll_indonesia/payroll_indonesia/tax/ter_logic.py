@@ -39,6 +39,9 @@ from payroll_indonesia.constants import (
 # Import TER category mapping from pph_ter (single source of truth)
 from payroll_indonesia.payroll_indonesia.tax.pph_ter import map_ptkp_to_ter_category
 
+# Compiled progressive bracket tables
+from payroll_indonesia.payroll_indonesia.tax.progressive_tax import get_compiled_bracket_table
+
 
 def log_tax_logic_error(error_type: str, message: str, data: Optional[Dict] = None) -> None:
     """
@@ -93,79 +96,16 @@ def calculate_progressive_tax(pkp, pph_settings=None):
             )
             pkp_value = 0
 
-        # Get settings
-        if not pph_settings and frappe.db.exists("DocType", "PPh 21 Settings"):
-            try:
-                pph_settings = frappe.get_cached_doc("PPh 21 Settings")
-            except Exception as settings_error:
-                log_tax_logic_error(
-                    "Settings Retrieval", f"Error retrieving PPh 21 Settings: {str(settings_error)}"
-                )
-                pph_settings = None
-
-        # First check if bracket_table is directly available as attribute
-        bracket_table = []
-        if pph_settings and hasattr(pph_settings, "bracket_table"):
-            bracket_table = pph_settings.bracket_table
+        # Compiled table is built once per bracket set (settings rows or stored
+        # PPh 21 Settings, falling back to UU HPP defaults)
+        table = get_compiled_bracket_table(pph_settings)
 
-        # If not found or empty, query from database
-        if not bracket_table and pph_settings:
-            try:
-                bracket_table = frappe.db.sql(
-                    """
-                    SELECT income_from, income_to, tax_rate
-                    FROM `tabPPh 21 Tax Bracket`
-                    WHERE parent = 'PPh 21 Settings'
-                    ORDER BY income_from ASC
-                """,
-                    as_dict=1,
-                )
-            except Exception as e:
-                log_tax_logic_error("Database Error", f"Error querying tax brackets: {str(e)}")
-
-        # If still not found, use default values
-        if not bracket_table:
-            # Log using our consistent method
-            log_tax_logic_error(
-                "Default Values", "No tax brackets found in settings, using default values"
-            )
-
-            # Default bracket values if not found - based on PMK 101/2016 and UU HPP 2021
-            bracket_table = [
-                {"income_from": 0, "income_to": 60000000, "tax_rate": 5},
-                {"income_from": 60000000, "income_to": 250000000, "tax_rate": 15},
-                {"income_from": 250000000, "income_to": 500000000, "tax_rate": 25},
-                {"income_from": 500000000, "income_to": 5000000000, "tax_rate": 30},
-                {"income_from": 5000000000, "income_to": 0, "tax_rate": 35},
-            ]
-
-        # Calculate tax using progressive rates
-        total_tax = 0
-        tax_details = []
-        remaining_pkp = pkp_value
-
-        # Sort brackets by income_from to ensure proper tax calculation order
-        for bracket in sorted(bracket_table, key=lambda x: flt(x.get("income_from", 0))):
-            if remaining_pkp <= 0:
-                break
-
-            # Use safe getters with defaults
-            income_from = flt(bracket.get("income_from", 0))
-            income_to = flt(bracket.get("income_to", 0))
-            tax_rate = flt(bracket.get("tax_rate", 0))
-
-            # Handle unlimited upper bracket
-            upper_limit = income_to if income_to > 0 else float("inf")
-            lower_limit = income_from
-            taxable = min(remaining_pkp, upper_limit - lower_limit)
-
-            tax = taxable * (tax_rate / 100)
-            total_tax += tax
-
-            if tax > 0:
-                tax_details.append({"rate": tax_rate, "taxable": taxable, "tax": tax})
-
-            remaining_pkp -= taxable
+        total_tax = table.tax(pkp_value)
+        tax_details = [
+            {"rate": d["rate"], "taxable": d["taxable"], "tax": d["tax"]}
+            for d in table.breakdown(pkp_value)
+            if d["tax"] > 0
+        ]
 
         return total_tax, tax_details
 
@@ -24,6 +24,8 @@ from payroll_indonesia.utilities.cache_utils import get_cached_value, cache_valu
 # Import shared YTD functions
 from payroll_indonesia.payroll_indonesia.utils import get_employee_details
 
+from payroll_indonesia.utilities.read_replica import replica_reads
+
 
 def prepare_tax_report(year: Optional[int] = None, company: Optional[str] = None) -> Dict[str, Any]:
     """
@@ -91,7 +93,8 @@ def prepare_tax_report(year: Optional[int] = None, company: Optional[str] = None
                 query += " AND company = %s"
                 params.append(company)
 
-            employee_list = frappe.db.sql(query, params, as_dict=1)
+            with replica_reads():
+                employee_list = frappe.db.sql(query, params, as_dict=1)
 
             # Cache result for efficiency
             cache_value(cache_key, employee_list or [], CACHE_MEDIUM)
@@ -469,61 +472,13 @@ def generate_form_1721_a1(
             # Generate form for one employee - pass pre-fetched employee details
             return create_1721_a1_form(employee, year, employee_details)
 
-        # Get employee list from cache
-        cache_key = f"active_employees:{year}"
-        employees = get_cached_value(cache_key)
-
-        if employees is None:
-            # Process all active employees - fetch relevant fields only
-            employees = frappe.get_all(
-                "Employee",
-                filters={"status": "Active"},
-                fields=["name", "employee_name", "status_pajak"],
-            )
-
-            # Cache result for efficiency
-            cache_value(cache_key, employees, CACHE_MEDIUM)
-
-        summary = {"year": year, "total": len(employees), "success": 0, "failed": 0, "details": []}
-
-        for emp in employees:
-            try:
-                # Map PTKP status to TER category for reference using cache
-                cache_key = f"ter_category:{emp.get('status_pajak', 'TK0')}"
-                ter_category = get_cached_value(cache_key)
-
-                if ter_category is None:
-                    ter_category = map_ptkp_to_ter_category(emp.get("status_pajak", "TK0"))
-                    cache_value(cache_key, ter_category, CACHE_LONG)
-
-                # Get full employee details for form creation
-                emp_details = get_employee_details(emp.name)
+        # All employees go through the bulk pipeline: one aggregate query,
+        # bulk report records and parallel PDF rendering
+        from payroll_indonesia.payroll_indonesia.tax.form_1721_a1 import (
+            generate_form_1721_a1_bulk,
+        )
 
-                result = create_1721_a1_form(emp.name, year, emp_details)
-                summary["success"] += 1
-                summary["details"].append(
-                    {
-                        "employee": emp.name,
-                        "employee_name": emp.employee_name,
-                        "status_pajak": emp.get("status_pajak", "TK0"),
-                        "ter_category": ter_category,
-                        "status": "Success",
-                        "message": "Form generated successfully",
-                    }
-                )
-            except Exception as e:
-                summary["failed"] += 1
-                summary["details"].append(
-                    {
-                        "employee": emp.name,
-                        "employee_name": emp.employee_name,
-                        "status_pajak": emp.get("status_pajak", "TK0"),
-                        "ter_category": ter_category if "ter_category" in locals() else "",
-                        "status": "Failed",
-                        "message": str(e)[:100],
-                    }
-                )
-                continue
+        summary = generate_form_1721_a1_bulk(year)
 
         # Log summary
         log_message = (
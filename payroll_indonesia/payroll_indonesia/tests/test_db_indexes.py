@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025, PT. Innovasi Terbaik Bangsa and contributors
+# For license information, please see license.txt
+
+import unittest
+from unittest.mock import MagicMock, patch
+
+import frappe
+from payroll_indonesia.utilities.db_indexes import _unused_indexes
+
+TABLES = ["tabSalary Slip"]
+
+
+class TestUnusedIndexes(unittest.TestCase):
+    def setUp(self):
+        self.db = MagicMock()
+        patcher = patch.object(frappe, "db", self.db, create=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_no_report_without_userstat(self):
+        """Test that empty INDEX_STATISTICS is not read as every index unused"""
+        self.db.sql.return_value = [("0",)]
+
+        self.assertIsNone(_unused_indexes(TABLES))
+        self.db.sql.assert_called_once_with("SELECT @@userstat")
+
+    def test_no_report_without_userstat_variable(self):
+        self.db.sql.side_effect = Exception("Unknown system variable 'userstat'")
+
+        self.assertIsNone(_unused_indexes(TABLES))
+
+    def test_unused_indexes_with_userstat(self):
+        self.db.sql.side_effect = [
+            [(1,)],
+            [frappe._dict(table_name="tabSalary Slip", index_name="employee_posting_date")],
+        ]
+
+        self.assertEqual(_unused_indexes(TABLES), {"tabSalary Slip": ["employee_posting_date"]})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025, PT. Innovasi Terbaik Bangsa and contributors
+# For license information, please see license.txt
+
+import unittest
+from unittest.mock import MagicMock, patch
+
+import frappe
+from payroll_indonesia.constants import BIAYA_JABATAN_MAX, BIAYA_JABATAN_PERCENT
+from payroll_indonesia.payroll_indonesia.tax import december_correction
+from payroll_indonesia.payroll_indonesia.tax.december_correction import (
+    compute_december_corrections,
+    get_precomputed_december_correction,
+)
+from payroll_indonesia.payroll_indonesia.tax.progressive_tax import DEFAULT_TAX_BRACKETS
+
+YEAR = 2025
+
+PTKP = {"TK0": 54000000.0, "K1": 63000000.0, "K3": 72000000.0}
+
+PPH_SETTINGS = frappe._dict(bracket_table=[frappe._dict(row) for row in DEFAULT_TAX_BRACKETS])
+
+# employee, status_pajak, Jan-Nov gross, December gross, December BPJS,
+# Jan-Nov BPJS, Jan-Nov PPh 21 (None: no deduction rows)
+EMPLOYEES = [
+    ("EMP-001", "TK0", 110000000.0, 10000000.0, 200000.0, 2200000.0, 2000000.0),
+    ("EMP-002", "K1", 275000000.0, 30000000.0, 300000.0, 3300000.0, 20000000.0),
+    ("EMP-003", "K3", 55000000.0, 5000000.0, 100000.0, 1100000.0, 500000.0),
+    ("EMP-004", None, 0.0, 8000000.0, 160000.0, None, None),
+]
+
+
+def slip_totals():
+    return [
+        frappe._dict(
+            employee=employee,
+            status_pajak=status,
+            ytd_gross=ytd_gross,
+            december_gross=december_gross,
+            december_bpjs=december_bpjs,
+            december_slip=f"Sal Slip/{employee}/00012",
+        )
+        for employee, status, ytd_gross, december_gross, december_bpjs, _bpjs, _pph in EMPLOYEES
+    ]
+
+
+def deduction_totals():
+    return {
+        employee: frappe._dict(employee=employee, ytd_bpjs=ytd_bpjs, ytd_pph21=ytd_pph21)
+        for employee, _status, _gross, _dec_gross, _dec_bpjs, ytd_bpjs, ytd_pph21 in EMPLOYEES
+        if ytd_pph21 is not None
+    }
+
+
+def per_slip_december(status, ytd_gross, gross_pay, ytd_bpjs, total_bpjs, ytd_pph21):
+    """The per-slip calculation of calculate_december_pph, bracket by bracket"""
+    annual_gross = ytd_gross + gross_pay
+    annual_biaya_jabatan = min(annual_gross * BIAYA_JABATAN_PERCENT / 100, BIAYA_JABATAN_MAX)
+    annual_netto = annual_gross - annual_biaya_jabatan - (ytd_bpjs + total_bpjs)
+    pkp = max(annual_netto - PTKP[status or "TK0"], 0)
+
+    annual_pph, remaining = 0, pkp
+    for bracket in DEFAULT_TAX_BRACKETS:
+        upper = bracket["income_to"] or float("inf")
+        taxable = max(min(remaining, upper - bracket["income_from"]), 0)
+        annual_pph += taxable * bracket["tax_rate"] / 100
+        remaining -= taxable
+
+    return {
+        "annual_netto": annual_netto,
+        "pkp": pkp,
+        "annual_pph": annual_pph,
+        "koreksi_pph21": annual_pph - ytd_pph21,
+    }
+
+
+def december_slip(employee, gross_pay, total_bpjs):
+    return frappe._dict(
+        name=f"Sal Slip/{employee}/00012",
+        employee=employee,
+        start_date=f"{YEAR}-12-01",
+        end_date=f"{YEAR}-12-31",
+        gross_pay=gross_pay,
+        total_bpjs=total_bpjs,
+    )
+
+
+class TestDecemberCorrection(unittest.TestCase):
+    def setUp(self):
+        self.addCleanup(patch.stopall)
+        patch.object(december_correction, "_get_slip_totals", return_value=slip_totals()).start()
+        patch.object(
+            december_correction, "_get_deduction_totals", return_value=deduction_totals()
+        ).start()
+        patch.object(
+            december_correction,
+            "get_ptkp_amount",
+            side_effect=lambda status, settings=None: PTKP[status],
+        ).start()
+
+        self.results = compute_december_corrections(
+            YEAR,
+            employees=[row[0] for row in EMPLOYEES],
+            pph_settings=PPH_SETTINGS,
+            store=False,
+        )
+
+    def test_batch_matches_per_slip_formula(self):
+        self.assertEqual(set(self.results), {row[0] for row in EMPLOYEES})
+
+        for employee, status, ytd_gross, gross, bpjs, ytd_bpjs, ytd_pph21 in EMPLOYEES:
+            expected = per_slip_december(
+                status, ytd_gross, gross, ytd_bpjs or 0.0, bpjs, ytd_pph21 or 0.0
+            )
+            entry = self.results[employee]
+            for field, value in expected.items():
+                self.assertAlmostEqual(entry[field], value, places=2, msg=f"{employee} {field}")
+
+    def test_known_values(self):
+        # 120,000,000 - 500,000 biaya jabatan - 2,400,000 BPJS - 54,000,000 PTKP
+        tk0 = self.results["EMP-001"]
+        self.assertAlmostEqual(tk0["pkp"], 63100000)
+        # 3,000,000 + 3,100,000 x 15%
+        self.assertAlmostEqual(tk0["annual_pph"], 3465000)
+        self.assertAlmostEqual(tk0["koreksi_pph21"], 1465000)
+
+        # Below PTKP the whole Jan-Nov withholding is refunded
+        k3 = self.results["EMP-003"]
+        self.assertEqual(k3["pkp"], 0)
+        self.assertAlmostEqual(k3["koreksi_pph21"], -500000)
+
+        # Missing tax status and no earlier slips
+        self.assertEqual(self.results["EMP-004"]["status_pajak"], "TK0")
+        self.assertEqual(self.results["EMP-004"]["ytd"]["pph21"], 0.0)
+
+    def test_precomputed_entry_follows_changed_slip(self):
+        cache = MagicMock()
+        cache.get_value.return_value = self.results["EMP-002"]
+        with patch.object(frappe, "cache", return_value=cache, create=True):
+            unchanged = get_precomputed_december_correction(
+                december_slip("EMP-002", 30000000.0, 300000.0), PPH_SETTINGS
+            )
+            changed = get_precomputed_december_correction(
+                december_slip("EMP-002", 40000000.0, 300000.0), PPH_SETTINGS
+            )
+
+        self.assertIs(unchanged, self.results["EMP-002"])
+        expected = per_slip_december("K1", 275000000.0, 40000000.0, 3300000.0, 300000.0, 20000000.0)
+        self.assertAlmostEqual(changed["koreksi_pph21"], expected["koreksi_pph21"], places=2)
+
+    def test_slip_falls_back_without_precomputed_entry(self):
+        from payroll_indonesia.override.salary_slip import tax_calculator
+
+        cache = MagicMock()
+        cache.get_value.return_value = None
+        ytd = {"gross": 275000000.0, "bpjs": 3300000.0, "pph21": 20000000.0}
+        slip = december_slip("EMP-002", 30000000.0, 300000.0)
+
+        with patch.object(frappe, "cache", return_value=cache, create=True), patch.object(
+            tax_calculator,
+            "get_cached_value",
+            side_effect=lambda key: PPH_SETTINGS if key == "pph_21_settings" else None,
+        ), patch.object(tax_calculator, "cache_value"), patch.object(
+            tax_calculator, "get_ytd_totals_from_tax_summary", return_value=ytd
+        ) as get_ytd, patch.object(
+            tax_calculator,
+            "get_ptkp_amount",
+            side_effect=lambda status, settings=None: PTKP[status],
+        ), patch.object(
+            tax_calculator, "update_component_amount"
+        ) as update_component, patch.object(
+            tax_calculator, "add_tax_info_to_note"
+        ):
+            tax_calculator.calculate_december_pph(slip, frappe._dict(status_pajak="K1"))
+
+        get_ytd.assert_called_once()
+        self.assertAlmostEqual(
+            slip.koreksi_pph21, self.results["EMP-002"]["koreksi_pph21"], places=2
+        )
+        update_component.assert_called_once_with(slip, "PPh 21", slip.koreksi_pph21, "deductions")
+
+
+if __name__ == "__main__":
+    unittest.main()
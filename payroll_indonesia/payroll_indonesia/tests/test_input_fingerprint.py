@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025, PT. Innovasi Terbaik Bangsa and contributors
+# For license information, please see license.txt
+
+import unittest
+from unittest.mock import patch
+
+import frappe
+from payroll_indonesia.override.salary_slip import input_fingerprint
+from payroll_indonesia.override.salary_slip.input_fingerprint import (
+    FINGERPRINT_FIELD,
+    compute_input_fingerprint,
+    is_calculation_current,
+)
+
+SETTINGS_VERSION = ((("BPJS Settings", "2025-01-01 00:00:00"),), 3)
+
+
+def make_slip(**values):
+    slip = frappe._dict(
+        name="Sal Slip/EMP-001/00001",
+        employee="EMP-001",
+        company="Test Company",
+        start_date="2025-03-01",
+        end_date="2025-03-31",
+        gross_pay=10000000.0,
+        total_bpjs=300000.0,
+        earnings=[frappe._dict(salary_component="Gaji Pokok", amount=10000000.0)],
+        deductions=[frappe._dict(salary_component="PPh 21", amount=200000.0)],
+    )
+    slip.update(values)
+    return slip
+
+
+class TestInputFingerprint(unittest.TestCase):
+    def setUp(self):
+        self.employee = frappe._dict(status_pajak="TK0", npwp="123", ikut_bpjs_kesehatan=1)
+        patcher = patch.object(input_fingerprint, "_ytd_version", return_value=(("2", "x"), "", 0))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def fingerprint(self, slip, employee=None, settings_version=SETTINGS_VERSION):
+        return compute_input_fingerprint(slip, employee or self.employee, settings_version)
+
+    def test_fingerprint_is_stable_across_save(self):
+        """Test that values reloaded from the database hash the same"""
+        before = self.fingerprint(make_slip(bypass_annual_detection=None))
+        after = self.fingerprint(
+            make_slip(
+                bypass_annual_detection=None,
+                earnings=[frappe._dict(salary_component="Gaji Pokok", amount=10000000)],
+            )
+        )
+        self.assertEqual(before, after)
+
+    def test_fingerprint_changes_with_inputs(self):
+        """Test that earnings, employee, settings and results all count"""
+        base = self.fingerprint(make_slip())
+        changed = [
+            self.fingerprint(
+                make_slip(earnings=[frappe._dict(salary_component="Gaji Pokok", amount=1.0)])
+            ),
+            self.fingerprint(make_slip(), frappe._dict(self.employee, status_pajak="K1")),
+            self.fingerprint(make_slip(), settings_version=(SETTINGS_VERSION[0], 4)),
+            self.fingerprint(make_slip(total_bpjs=0.0)),
+        ]
+        for fingerprint in changed:
+            self.assertNotEqual(base, fingerprint)
+
+    def test_calculation_current_only_with_matching_fingerprint(self):
+        """Test the skip decision used by validate"""
+        slip = make_slip()
+        self.assertFalse(is_calculation_current(slip, self.employee, SETTINGS_VERSION))
+
+        slip[FINGERPRINT_FIELD] = self.fingerprint(slip)
+        self.assertTrue(is_calculation_current(slip, self.employee, SETTINGS_VERSION))
+
+        slip.gross_pay = 12000000.0
+        self.assertFalse(is_calculation_current(slip, self.employee, SETTINGS_VERSION))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025, PT. Innovasi Terbaik Bangsa and contributors
+# For license information, please see license.txt
+
+import unittest
+from unittest.mock import patch
+
+import frappe
+from payroll_indonesia.utilities.job_registry import (
+    claim_job,
+    get_job_claim,
+    is_job_claimed,
+    release_job,
+)
+
+
+class SiteCache:
+    """In-memory stand-in for frappe's RedisWrapper key handling
+
+    set, get and delete are the raw redis methods and take full keys;
+    exists prefixes its arguments with make_key like RedisWrapper does.
+    """
+
+    def __init__(self):
+        self.data = {}
+
+    def make_key(self, key):
+        return f"_site|{key}"
+
+    def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        return True
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def delete(self, key):
+        self.data.pop(key, None)
+
+    def exists(self, *names):
+        return sum(self.make_key(name) in self.data for name in names)
+
+
+class TestJobRegistry(unittest.TestCase):
+    def setUp(self):
+        self.cache = SiteCache()
+        patcher = patch.object(frappe, "cache", return_value=self.cache, create=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = patch.object(frappe, "safe_decode", lambda value: value, create=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_claimed_job_is_reported(self):
+        self.assertFalse(is_job_claimed("tax_summary:EMP-001"))
+
+        self.assertTrue(claim_job("tax_summary:EMP-001", queue="long"))
+        self.assertTrue(is_job_claimed("tax_summary:EMP-001"))
+        self.assertFalse(claim_job("tax_summary:EMP-001"))
+        self.assertEqual(get_job_claim("tax_summary:EMP-001")["queue"], "long")
+
+        release_job("tax_summary:EMP-001")
+        self.assertFalse(is_job_claimed("tax_summary:EMP-001"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025, PT. Innovasi Terbaik Bangsa and contributors
+# For license information, please see license.txt
+
+import threading
+import time
+import unittest
+
+from payroll_indonesia.utilities.cache_utils import memoize_with_ttl
+
+
+class TestMemoizeWithTTL(unittest.TestCase):
+    def test_negative_results_are_cached(self):
+        """None results should be served from cache instead of recomputed"""
+        calls = []
+
+        @memoize_with_ttl(ttl=60)
+        def lookup(value):
+            calls.append(value)
+            return None
+
+        self.assertIsNone(lookup("missing"))
+        self.assertIsNone(lookup("missing"))
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(lookup.cache_stats()["negative_hits"], 1)
+
+        lookup.invalidate("missing")
+        lookup("missing")
+        self.assertEqual(len(calls), 2)
+
+    def test_keys_are_typed(self):
+        """1 and "1" should not share a cache entry"""
+
+        @memoize_with_ttl(ttl=60)
+        def echo(value):
+            return value
+
+        self.assertEqual(echo(1), 1)
+        self.assertEqual(echo("1"), "1")
+        self.assertNotEqual(echo.cache_key(1), echo.cache_key("1"))
+
+    def test_single_flight(self):
+        """Concurrent misses on one key should compute once"""
+        calls = []
+
+        @memoize_with_ttl(ttl=60)
+        def slow(value):
+            calls.append(value)
+            time.sleep(0.1)
+            return value * 2
+
+        threads = [threading.Thread(target=slow, args=(21,)) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(slow(21), 42)
@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025, PT. Innovasi Terbaik Bangsa and contributors
+# For license information, please see license.txt
+
+import csv
+import datetime
+import io
+import unittest
+
+import frappe
+from payroll_indonesia.payroll_indonesia.report.payroll_period_comparison.payroll_period_comparison import (  # noqa: E501
+    DEFAULT_THRESHOLDS,
+    compare_periods,
+    get_columns,
+    get_periods,
+    iter_csv_chunks,
+)
+
+
+def totals(employee, gross_pay, bpjs, pph21, ter_category="TER A"):
+    return frappe._dict(
+        employee=employee,
+        employee_name=f"Name {employee}",
+        department="Operations",
+        slip_count=1,
+        gross_pay=gross_pay,
+        bpjs=bpjs,
+        pph21=pph21,
+        ter_category=ter_category,
+    )
+
+
+class TestPayrollPeriodComparison(unittest.TestCase):
+    def setUp(self):
+        self.previous = {
+            "EMP-001": totals("EMP-001", 10000000, 300000, 200000),
+            "EMP-002": totals("EMP-002", 8000000, 240000, 100000),
+            "EMP-003": totals("EMP-003", 6000000, 180000, 45000),
+        }
+        self.current = {
+            "EMP-001": totals("EMP-001", 10500000, 315000, 200000),
+            "EMP-002": totals("EMP-002", 12000000, 240000, 300000, "TER B"),
+            "EMP-004": totals("EMP-004", 5000000, 150000, 0),
+        }
+
+    def test_employees_joined_and_flagged(self):
+        rows = {
+            row["employee"]: row
+            for row in compare_periods(self.current, self.previous, DEFAULT_THRESHOLDS)
+        }
+
+        self.assertEqual(rows["EMP-001"]["status"], "Unchanged")
+        self.assertEqual(rows["EMP-001"]["gross_pay_change_percent"], 5.0)
+        self.assertEqual(rows["EMP-002"]["status"], "Changed")
+        self.assertEqual(
+            rows["EMP-002"]["flags"], "Gross +50.0%, PPh 21 +200.0%, TER TER A → TER B"
+        )
+        self.assertEqual(rows["EMP-003"]["status"], "Left")
+        self.assertEqual(rows["EMP-003"]["current_gross_pay"], 0.0)
+        self.assertEqual(rows["EMP-004"]["status"], "New")
+        self.assertIsNone(rows["EMP-004"]["gross_pay_change_percent"])
+
+    def test_small_changes_not_flagged(self):
+        current = dict(self.current, **{"EMP-002": totals("EMP-002", 8040000, 240000, 140000)})
+        rows = {
+            row["employee"]: row
+            for row in compare_periods(current, self.previous, DEFAULT_THRESHOLDS)
+        }
+        # PPh 21 rose 40% but by less than the minimum change amount
+        self.assertEqual(rows["EMP-002"]["status"], "Unchanged")
+
+    def test_default_previous_period(self):
+        periods = get_periods({"from_date": "2025-03-01", "to_date": "2025-03-31"})
+        self.assertEqual(periods[1], (datetime.date(2025, 2, 1), datetime.date(2025, 2, 28)))
+
+    def test_csv_chunks(self):
+        columns = get_columns()
+        rows = compare_periods(self.current, self.previous, DEFAULT_THRESHOLDS)
+        chunks = list(iter_csv_chunks(columns, rows, chunk_size=2))
+
+        self.assertEqual(len(chunks), 2)
+        parsed = list(csv.reader(io.StringIO("".join(chunks))))
+        self.assertEqual(len(parsed), len(rows) + 1)
+        self.assertEqual(parsed[1][0], "EMP-001")
+
+
+if __name__ == "__main__":
+    unittest.main()
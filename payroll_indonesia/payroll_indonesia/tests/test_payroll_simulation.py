@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025, PT. Innovasi Terbaik Bangsa and contributors
+# For license information, please see license.txt
+
+import json
+import os
+import unittest
+from unittest.mock import patch
+
+from payroll_indonesia.payroll_indonesia.tax import payroll_simulation
+from payroll_indonesia.payroll_indonesia.tax.payroll_simulation import (
+    WorkforceSnapshot,
+    apply_setting_changes,
+    compare_scenarios,
+    simulate,
+)
+
+
+def load_default_settings():
+    """Settings snapshot built from config/defaults.json"""
+    path = os.path.join(os.path.dirname(__file__), os.pardir, os.pardir, "config", "defaults.json")
+    with open(path) as f:
+        defaults = json.load(f)
+
+    return {
+        "bpjs": defaults["bpjs"],
+        "tax": {
+            "biaya_jabatan_percent": defaults["tax"]["biaya_jabatan_percent"],
+            "biaya_jabatan_max": defaults["tax"]["biaya_jabatan_max"],
+        },
+        "ptkp": defaults["ptkp"],
+        "ptkp_to_ter_mapping": defaults["ptkp_to_ter_mapping"],
+        "ter_rates": defaults["ter_rates"],
+        "tax_brackets": defaults["tax_brackets"],
+    }
+
+
+def build_snapshot():
+    # employee, status_pajak, kesehatan, ketenagakerjaan, gross, is_using_ter
+    rows = [
+        ("EMP-001", "TK0", 1, 1, 6000000, 1),
+        ("EMP-001", "TK0", 1, 1, 6000000, 1),
+        ("EMP-002", "K1", 1, 1, 15000000, 1),
+        ("EMP-002", "K1", 1, 1, 15000000, 0),
+        ("EMP-003", "TK1", 0, 1, 45000000, 0),
+        ("EMP-004", None, 1, 0, 0, 1),
+    ]
+    return WorkforceSnapshot("2025-01-01", "2025-02-28", rows)
+
+
+class TestPayrollSimulation(unittest.TestCase):
+    def setUp(self):
+        self.settings = load_default_settings()
+        self.snapshot = build_snapshot()
+
+    def test_vectorized_matches_row_by_row(self):
+        vectorized = simulate(self.snapshot, self.settings)
+        with patch.object(payroll_simulation, "np", None):
+            snapshot = build_snapshot()
+            reference = simulate(snapshot, self.settings)
+
+        for metric in payroll_simulation.METRICS:
+            for actual, expected in zip(vectorized[metric], reference[metric]):
+                self.assertAlmostEqual(float(actual), expected, places=2)
+
+    def test_ter_rate_applied_per_category(self):
+        result = simulate(self.snapshot, self.settings)
+        # TK0 maps to TER A, 6,000,000 falls in the 0.75% bracket
+        self.assertAlmostEqual(float(result["pph21"][0]), 2 * 6000000 * 0.0075, places=2)
+        self.assertEqual(float(result["pph21"][3]), 0.0)
+
+    def test_jp_cap_change_only_affects_employees_above_cap(self):
+        scenario = apply_setting_changes(self.settings, {"bpjs": {"jp_max_salary": 10042300}})
+        result = compare_scenarios(self.snapshot, self.settings, scenario, limit=0)
+
+        affected = {entry["employee"]: entry for entry in result["employees"]}
+        self.assertNotIn("EMP-001", affected)
+        self.assertNotIn("EMP-004", affected)
+        # JP employee share is 1% of the raised part of the cap, per month
+        self.assertAlmostEqual(affected["EMP-002"]["bpjs_employee_delta"], 2 * 9647, places=2)
+        self.assertAlmostEqual(affected["EMP-003"]["bpjs_employee_delta"], 9647, places=2)
+        self.assertLess(affected["EMP-003"]["pph21_delta"], 0)
+        self.assertEqual(
+            result["totals"]["delta"]["bpjs_employee"],
+            affected["EMP-002"]["bpjs_employee_delta"] + affected["EMP-003"]["bpjs_employee_delta"],
+        )
+        self.assertEqual(self.settings["bpjs"]["jp_max_salary"], 9077600.0)
+
+    def test_unknown_setting_rejected(self):
+        with self.assertRaises(Exception):
+            apply_setting_changes(self.settings, {"bpjs": {"jp_max_salry": 1}})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025, PT. Innovasi Terbaik Bangsa and contributors
+# For license information, please see license.txt
+
+import unittest
+from payroll_indonesia.payroll_indonesia.tax.progressive_tax import (
+    DEFAULT_TAX_BRACKETS,
+    compile_bracket_table,
+    get_default_bracket_table,
+)
+
+
+def linear_progressive_tax(pkp, brackets=DEFAULT_TAX_BRACKETS):
+    """Reference implementation walking the brackets one by one"""
+    total_tax = 0
+    remaining = max(pkp, 0)
+    for bracket in sorted(brackets, key=lambda x: x["income_from"]):
+        if remaining <= 0:
+            break
+        upper = bracket["income_to"] if bracket["income_to"] > 0 else float("inf")
+        taxable = min(remaining, upper - bracket["income_from"])
+        total_tax += taxable * bracket["tax_rate"] / 100
+        remaining -= taxable
+    return total_tax
+
+
+class TestProgressiveTax(unittest.TestCase):
+    def setUp(self):
+        self.table = get_default_bracket_table()
+        self.samples = [
+            -1000000,
+            0,
+            1,
+            54000000,
+            60000000,
+            60000001,
+            249999999,
+            250000000,
+            500000000,
+            4999999999,
+            5000000000,
+            12000000000,
+        ]
+
+    def test_matches_linear_walk(self):
+        """Compiled lookup should equal the bracket-by-bracket calculation"""
+        for pkp in self.samples:
+            self.assertAlmostEqual(self.table.tax(pkp), linear_progressive_tax(pkp), places=2)
+
+    def test_known_values(self):
+        """Check a few hand-calculated UU HPP results"""
+        self.assertAlmostEqual(self.table.tax(60000000), 3000000)
+        # 3,000,000 + 190,000,000 x 15% + 50,000,000 x 25%
+        self.assertAlmostEqual(self.table.tax(300000000), 44000000)
+
+    def test_breakdown_sums_to_total(self):
+        """Per-bracket breakdown should add up to the total tax"""
+        for pkp in self.samples:
+            details = self.table.breakdown(pkp)
+            self.assertAlmostEqual(sum(d["tax"] for d in details), self.table.tax(pkp), places=2)
+
+    def test_batch_matches_scalar(self):
+        """Batch variant should agree with the scalar lookup"""
+        results = list(self.table.tax_batch(self.samples))
+        for pkp, tax in zip(self.samples, results):
+            self.assertAlmostEqual(tax, self.table.tax(pkp), places=2)
+
+    def test_custom_brackets_are_memoized(self):
+        """Same bracket rows should reuse one compiled table"""
+        brackets = [
+            {"income_from": 0, "income_to": 50000000, "tax_rate": 5},
+            {"income_from": 50000000, "income_to": 0, "tax_rate": 20},
+        ]
+        first = compile_bracket_table(brackets)
+        second = compile_bracket_table(list(reversed(brackets)))
+        self.assertIs(first, second)
+        self.assertAlmostEqual(first.tax(100000000), linear_progressive_tax(100000000, brackets))
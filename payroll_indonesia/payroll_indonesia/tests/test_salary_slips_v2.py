@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025, PT. Innovasi Terbaik Bangsa and contributors
+# For license information, please see license.txt
+
+import unittest
+from unittest.mock import MagicMock, patch
+
+import frappe
+from payroll_indonesia.api import query_salary_slips_v2
+
+USER_PERMISSION_CONDITION = "`tabSalary Slip`.`employee` in ('EMP-001')"
+
+
+class TestSalarySlipsV2(unittest.TestCase):
+    def setUp(self):
+        self.addCleanup(patch.stopall)
+        self.db = MagicMock()
+        self.db.sql.return_value = []
+        patch.object(frappe, "db", self.db, create=True).start()
+        self.build_match_conditions = patch(
+            "frappe.desk.reportview.build_match_conditions",
+            return_value=USER_PERMISSION_CONDITION,
+        ).start()
+
+    def test_query_applies_user_permissions(self):
+        """Test that slips outside the user's permissions are filtered out"""
+        query_salary_slips_v2({}, fields=["name", "npwp", "department"], user="emp@example.com")
+
+        self.build_match_conditions.assert_called_once_with("Salary Slip", user="emp@example.com")
+        query = self.db.sql.call_args[0][0]
+        self.assertIn(f"AND ({USER_PERMISSION_CONDITION})", query)
+        # Match conditions reference the table by name, so it must not be aliased
+        self.assertIn("FROM `tabSalary Slip`\n", query)
+        self.assertIn("emp.name = `tabSalary Slip`.employee", query)
+
+    def test_unrestricted_user_gets_no_extra_condition(self):
+        self.build_match_conditions.return_value = ""
+        query_salary_slips_v2({"company": "PT Test"})
+
+        query = self.db.sql.call_args[0][0]
+        self.assertNotIn("()", query)
+        self.assertEqual(self.db.sql.call_args[0][1]["company"], "PT Test")
+
+
+if __name__ == "__main__":
+    unittest.main()
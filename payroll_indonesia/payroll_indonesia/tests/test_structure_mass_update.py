@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025, PT. Innovasi Terbaik Bangsa and contributors
+# For license information, please see license.txt
+
+import importlib
+import unittest
+from unittest.mock import MagicMock, patch
+
+import frappe
+from payroll_indonesia.utilities import job_registry, structure_mass_update
+from payroll_indonesia.utilities.structure_mass_update import enqueue_structure_mass_update
+
+RATES = {"BPJS JHT Employee": 2.0, "BPJS JP Employee": 1.0}
+
+STRUCTURE_ROWS = [
+    frappe._dict(
+        structure="Staff",
+        docstatus=0,
+        name="SD-001",
+        salary_component="BPJS JHT Employee",
+        amount=3.0,
+        amount_based_on_formula=0,
+        formula=None,
+    ),
+    frappe._dict(
+        structure="Staff",
+        docstatus=0,
+        name="SD-002",
+        salary_component="BPJS JP Employee",
+        amount=1.0,
+        amount_based_on_formula=0,
+        formula=None,
+    ),
+]
+
+
+def enqueue(
+    method,
+    queue="default",
+    timeout=None,
+    event=None,
+    is_async=True,
+    job_name=None,
+    now=False,
+    enqueue_after_commit=False,
+    *,
+    on_success=None,
+    on_failure=None,
+    at_front=False,
+    job_id=None,
+    deduplicate=False,
+    **kwargs,
+):
+    """frappe.enqueue's signature: its own parameters are not passed to the job"""
+    if now or not is_async:
+        return get_attr(method)(**kwargs)
+
+
+def get_attr(method):
+    module, attr = method.rsplit(".", 1)
+    return getattr(importlib.import_module(module), attr)
+
+
+class TestStructureMassUpdate(unittest.TestCase):
+    def setUp(self):
+        self.db = MagicMock()
+        self.db.sql.return_value = STRUCTURE_ROWS
+        self.cache = MagicMock()
+        self.cache.set.return_value = True
+        self.clear_document_cache = MagicMock()
+
+        self.addCleanup(patch.stopall)
+        for target, name, value in (
+            (frappe, "enqueue", enqueue),
+            (frappe, "get_attr", get_attr),
+            (frappe, "cache", lambda: self.cache),
+            (frappe, "publish_progress", MagicMock()),
+            (frappe, "db", self.db),
+            (frappe, "clear_document_cache", self.clear_document_cache),
+            (frappe, "session", frappe._dict(user="Administrator")),
+            (job_registry, "_job_key", lambda job_name: job_name),
+        ):
+            patch.object(target, name, value, create=True).start()
+
+    def test_enqueued_update_applies_planned_rows(self):
+        with patch.object(structure_mass_update, "_update_by_name") as update_by_name, patch.object(
+            structure_mass_update, "_touch_parents"
+        ):
+            job = enqueue_structure_mass_update(["bpjs_rates"], bpjs_rates=RATES, now=True)
+
+        self.assertTrue(job["queued"])
+        update_by_name.assert_called_once_with(
+            "Salary Detail", [{"name": "SD-001", "parent": "Staff", "amount": 2.0}], ["amount"]
+        )
+        progress = self.cache.hset.call_args[0][2]
+        self.assertEqual(progress["job_id"], job["job_id"])
+        self.assertEqual(progress["status"], "finished")
+        self.assertEqual(progress["results"]["bpjs_rates"]["rows_updated"], 1)
+        self.cache.delete.assert_called_once_with(job["job_id"])
+        self.clear_document_cache.assert_called_once_with("Salary Structure", "Staff")
+
+    def test_tax_slab_update_keeps_modified(self):
+        """Test that structures, which may be submitted, keep their modified timestamp"""
+        self.db.has_column.return_value = True
+        self.db.sql.return_value = [frappe._dict(name="Staff"), frappe._dict(name="Manager")]
+
+        self.assertEqual(structure_mass_update.apply_tax_slab_updates("Slab 2025"), 2)
+
+        query = self.db.sql.call_args[0][0]
+        self.assertIn("`income_tax_slab` = CASE", query)
+        self.assertNotIn("modified", query)
+        self.assertEqual(
+            {call[0] for call in self.clear_document_cache.call_args_list},
+            {("Salary Structure", "Staff"), ("Salary Structure", "Manager")},
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
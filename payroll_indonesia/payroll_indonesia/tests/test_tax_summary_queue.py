@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025, PT. Innovasi Terbaik Bangsa and contributors
+# For license information, please see license.txt
+
+import unittest
+from unittest.mock import MagicMock, patch
+
+import frappe
+from payroll_indonesia.utilities import tax_summary_queue
+from payroll_indonesia.utilities.tax_summary_queue import (
+    MAX_PENDING_ATTEMPTS,
+    drain_tax_summary_queue,
+    queue_tax_summary_update,
+)
+
+SLIP = "Sal Slip/EMP-001/00003"
+
+
+def make_slip(docstatus=1):
+    return frappe._dict(
+        name=SLIP,
+        employee="EMP-001",
+        docstatus=docstatus,
+        start_date="2025-03-01",
+        end_date="2025-03-31",
+    )
+
+
+class TestTaxSummaryQueue(unittest.TestCase):
+    def setUp(self):
+        self.addCleanup(patch.stopall)
+        self.callbacks = []
+        self.db = MagicMock()
+        self.db.after_commit.add.side_effect = self.callbacks.append
+        self.cache = MagicMock()
+        patch.object(frappe, "db", self.db, create=True).start()
+        patch.object(frappe, "cache", return_value=self.cache, create=True).start()
+        patch.object(tax_summary_queue, "claim_job", return_value=True).start()
+        patch.object(tax_summary_queue, "release_job").start()
+        self.schedule = patch.object(tax_summary_queue, "_schedule_drain").start()
+
+    def test_entry_written_after_commit(self):
+        """Test that a slip is only queued once its transaction commits"""
+        self.assertTrue(queue_tax_summary_update(make_slip()))
+        self.cache.hset.assert_not_called()
+        self.schedule.assert_not_called()
+
+        for callback in self.callbacks:
+            callback()
+
+        self.cache.hset.assert_called_once()
+        slip, entry = self.cache.hset.call_args[0][1:]
+        self.assertEqual(slip, SLIP)
+        self.assertEqual(entry["action"], "update")
+        self.assertEqual((entry["year"], entry["month"]), (2025, 3))
+        self.schedule.assert_called_once_with(now=True)
+
+    def drain(self, entry, docstatus):
+        patch.object(tax_summary_queue, "_take_pending", return_value={SLIP: entry}).start()
+        patch.object(tax_summary_queue, "_load_summaries", return_value={}).start()
+        patch.object(tax_summary_queue, "get_pending_count", return_value=1).start()
+        requeue = patch.object(tax_summary_queue, "_requeue").start()
+        patch.object(frappe, "get_all", return_value=[(SLIP, docstatus)], create=True).start()
+        return drain_tax_summary_queue(), requeue
+
+    def test_uncommitted_slip_is_retried(self):
+        """Test that a slip whose submit is not committed yet stays queued"""
+        entry = {"action": "update", "employee": "EMP-001", "year": 2025, "month": 3}
+        result, requeue = self.drain(entry, 0)
+
+        self.assertEqual(result["processed"], 0)
+        self.assertEqual(result["deferred"], 1)
+        requeue.assert_called_once_with({SLIP: dict(entry, attempts=1)})
+        self.schedule.assert_not_called()
+
+    def test_retry_gives_up_after_max_attempts(self):
+        entry = {
+            "action": "update",
+            "employee": "EMP-001",
+            "year": 2025,
+            "month": 3,
+            "attempts": MAX_PENDING_ATTEMPTS,
+        }
+        result, requeue = self.drain(entry, 0)
+
+        self.assertEqual(result["deferred"], 1)
+        requeue.assert_called_once_with({})
+
+
+if __name__ == "__main__":
+    unittest.main()
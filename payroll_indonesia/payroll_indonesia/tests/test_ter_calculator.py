@@ -8,6 +8,7 @@ from frappe.utils import flt, getdate, add_months
 from payroll_indonesia.override.salary_slip.ter_calculator import (
     calculate_monthly_pph_with_ter,
     get_ptkp_category,
+    get_ter_integrity_diff,
 )
 
 
@@ -155,6 +156,39 @@ class TestTERCalculator(unittest.TestCase):
         self.assertEqual(flt(self.test_salary_slip.monthly_tax), 0)
 
 
+class TestTERIntegrityDiff(unittest.TestCase):
+    def test_consistent_slip_has_no_diff(self):
+        """Test that a consistent slip yields an empty diff"""
+        doc = frappe._dict(
+            gross_pay=10000000,
+            monthly_gross_for_ter=10000000,
+            annual_taxable_income=120000000,
+            ter_rate=5.0,
+            ter_category="TER A",
+            is_using_ter=1,
+        )
+        diff = get_ter_integrity_diff(doc, {"gross_pay": 10000000}, 10000000, 0.05, "TER A")
+        self.assertEqual(diff, {})
+
+    def test_diff_reports_mismatches_without_changing_doc(self):
+        """Test that mismatches are reported and the document is left untouched"""
+        doc = frappe._dict(
+            gross_pay=10000000,
+            monthly_gross_for_ter=0,
+            annual_taxable_income=120000000,
+            ter_rate=5.0,
+            ter_category="TER B",
+            is_using_ter=0,
+        )
+        diff = get_ter_integrity_diff(doc, {"gross_pay": 10000000}, 10000000, 0.05, "TER A")
+
+        self.assertEqual(diff["monthly_gross_for_ter"], (0, 10000000))
+        self.assertEqual(diff["ter_category"], ("TER B", "TER A"))
+        self.assertEqual(diff["is_using_ter"], (0, 1))
+        self.assertNotIn("ter_rate", diff)
+        self.assertEqual(doc.monthly_gross_for_ter, 0)
+
+
 def run_ter_calculator_tests():
     """Run TER calculator tests"""
     import frappe.test_runner
@@ -53,6 +53,7 @@ __all__ = [
     "get_ytd_tax_info",
     "get_ytd_totals",
     "get_ytd_totals_from_tax_summary",
+    "get_tax_summary_name",
     "get_employee_details",
 ]
 
@@ -1665,6 +1666,29 @@ def get_ytd_totals(
         return {"ytd_gross": 0, "ytd_tax": 0, "ytd_bpjs": 0, "ytd_biaya_jabatan": 0, "ytd_netto": 0}
 
 
+@memoize_with_ttl(
+    ttl=CACHE_MEDIUM,
+    namespace="tax_summary",
+    key=lambda employee, year: f"{employee}:{cint(year)}",
+    shared=True,
+)
+def get_tax_summary_name(employee: str, year: int) -> Optional[str]:
+    """
+    Get the Employee Tax Summary of an employee for a year
+
+    "No summary yet" is cached briefly as well and dropped when the summary
+    is saved, see EmployeeTaxSummary.on_update.
+
+    Args:
+        employee: Employee ID
+        year: Tax year
+
+    Returns:
+        str: Employee Tax Summary name, or None if there is none
+    """
+    return frappe.db.get_value("Employee Tax Summary", {"employee": employee, "year": cint(year)})
+
+
 def get_ytd_totals_from_tax_summary(
     employee: str, year: int, month: int, include_current: bool = False
 ) -> Dict[str, Any]:
@@ -1682,14 +1706,9 @@ def get_ytd_totals_from_tax_summary(
     """
     try:
         # Find Employee Tax Summary for this year
-        tax_summary = frappe.db.get_value(
-            "Employee Tax Summary",
-            {"employee": employee, "year": year},
-            ["name", "ytd_tax"],
-            as_dict=1,
-        )
+        summary_name = get_tax_summary_name(employee, year)
 
-        if not tax_summary:
+        if not summary_name:
             return {"has_data": False}
 
         # Prepare filter for monthly details
@@ -1698,7 +1717,7 @@ def get_ytd_totals_from_tax_summary(
         # Efficient query to get monthly details with all fields at once
         monthly_details = frappe.get_all(
             "Employee Tax Summary Detail",
-            filters={"parent": tax_summary.name, "month": month_filter},
+            filters={"parent": summary_name, "month": month_filter},
             fields=[
                 "gross_pay",
                 "bpjs_deductions",
@@ -1753,7 +1772,7 @@ def get_ytd_totals_from_tax_summary(
             "is_using_ter": is_using_ter,
             "ter_rate": highest_ter_rate,
             "source": "tax_summary",
-            "summary_name": tax_summary.name,
+            "summary_name": summary_name,
         }
 
         return result
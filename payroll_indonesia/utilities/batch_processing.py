@@ -6,9 +6,15 @@
 import frappe
 from frappe import _
 from frappe.utils import now, getdate, add_days, cint
-from frappe.utils.background_jobs import get_jobs, get_job_status, enqueue
+from frappe.utils.background_jobs import get_jobs, get_job_status
 from typing import Dict, List, Any, Optional, Callable
 
+from payroll_indonesia.utilities.job_registry import (
+    enqueue_registered,
+    get_registered_batch_jobs,
+    is_job_claimed,
+)
+
 
 # ======== Logging Utilities ========
 
@@ -71,6 +77,12 @@ def get_batch_jobs(job_prefix: str = None) -> List[Dict[str, Any]]:
     Returns:
         List[Dict[str, Any]]: List of jobs with their status
     """
+    # Batches enqueued through the job registry are read from their status hash
+    if job_prefix:
+        registered_jobs = get_registered_batch_jobs(job_prefix)
+        if registered_jobs:
+            return registered_jobs
+
     all_jobs = get_jobs()
 
     # Filter jobs by prefix if specified
@@ -159,11 +171,7 @@ def is_job_active(job_name: str) -> bool:
     Returns:
         bool: True if the job is active
     """
-    return frappe.get_all(
-        "Background Jobs",
-        filters={"job_name": job_name, "status": ["in", ["queued", "started"]]},
-        limit=1,
-    )
+    return is_job_claimed(job_name)
 
 
 def cleanup_old_batch_jobs(days: int = 7) -> Dict[str, Any]:
@@ -280,19 +288,22 @@ def process_in_batches(
         for i, batch in enumerate(batches):
             job_name = f"{batch_id}_sub{i+1}"
 
-            # Queue the batch processing job
-            enqueue(
+            # Queue the batch processing job, skipping sub-batches already queued
+            if not enqueue_registered(
                 process_func,
+                job_name=job_name,
                 queue=queue,
                 timeout=timeout,
-                is_async=True,
-                job_name=job_name,
                 items=batch,
                 batch_id=batch_id,
                 sub_batch=i + 1,
                 total_batches=len(batches),
                 **kwargs,
-            )
+            ):
+                log_batch_event(
+                    f"Sub-batch {job_name} is already queued, skipping", batch_id=batch_id
+                )
+                continue
 
             batch_jobs.append(job_name)
 
@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025, PT. Innovasi Terbaik Bangsa and contributors
+# For license information, please see license.txt
+
+"""
+Cache observability for CacheManager and memoized functions.
+
+CacheManager keeps per-namespace counters (hits, misses, sets, evictions,
+expired) in every process and publishes them to a Redis hash about once a
+minute. get_cache_metrics aggregates those snapshots into site-wide figures,
+with current size and approximate bytes per namespace, and
+log_cache_metrics records them in Payroll Log on a schedule when enabled
+with "payroll_indonesia_log_cache_metrics": 1 in site_config.json.
+"""
+
+import json
+import time
+from typing import Any, Dict, List
+
+import frappe
+from frappe.utils import now
+
+from payroll_indonesia.utilities.cache_utils import (
+    STAT_FIELDS,
+    STATS_REDIS_KEY,
+    CacheManager,
+    get_memoize_stats,
+)
+
+__all__ = ["get_cache_metrics", "log_cache_metrics", "reset_cache_metrics"]
+
+# Snapshots of processes that have not published for this long are dropped
+STALE_SNAPSHOT_SECONDS = 86400
+
+# site_config.json flag enabling the scheduled Payroll Log entry
+LOG_METRICS_CONFIG_KEY = "payroll_indonesia_log_cache_metrics"
+
+
+def _with_ratio(counters: Dict[str, Any]) -> Dict[str, Any]:
+    lookups = counters.get("hits", 0) + counters.get("misses", 0)
+    counters["hit_ratio"] = round(counters.get("hits", 0) / lookups, 4) if lookups else 0.0
+    return counters
+
+
+def _load_snapshots() -> List[Dict[str, Any]]:
+    """Published snapshots of live processes, dropping stale ones."""
+    cache = frappe.cache()
+    snapshots, stale = [], []
+    cutoff = time.time() - STALE_SNAPSHOT_SECONDS
+
+    for field, raw in (cache.hgetall(STATS_REDIS_KEY) or {}).items():
+        try:
+            snapshot = json.loads(raw)
+        except (TypeError, ValueError):
+            stale.append(field)
+            continue
+        if snapshot.get("published", 0) < cutoff:
+            stale.append(field)
+            continue
+        snapshots.append(snapshot)
+
+    for field in stale:
+        cache.hdel(STATS_REDIS_KEY, field)
+    return snapshots
+
+
+def _aggregate(snapshots: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Sum namespace counters and memoize counters over processes."""
+    namespaces, memoized = {}, {}
+    for snapshot in snapshots:
+        for namespace, counters in (snapshot.get("namespaces") or {}).items():
+            total = namespaces.setdefault(
+                namespace, dict.fromkeys(STAT_FIELDS + ("size", "approx_bytes"), 0)
+            )
+            for field in STAT_FIELDS + ("size", "approx_bytes"):
+                total[field] += counters.get(field, 0)
+            total["ttl"] = counters.get("ttl")
+
+        for name, counters in (snapshot.get("memoized") or {}).items():
+            total = memoized.setdefault(name, {})
+            for field in ("hits", "negative_hits", "misses", "waits", "errors", "compute_time"):
+                total[field] = total.get(field, 0) + counters.get(field, 0)
+
+    totals = dict.fromkeys(STAT_FIELDS + ("size", "approx_bytes"), 0)
+    for counters in namespaces.values():
+        _with_ratio(counters)
+        for field in totals:
+            totals[field] += counters[field]
+
+    return {
+        "processes": len(snapshots),
+        "namespaces": dict(sorted(namespaces.items())),
+        "totals": _with_ratio(totals),
+        "memoized": dict(sorted(memoized.items())),
+    }
+
+
+def collect_cache_metrics() -> Dict[str, Any]:
+    """
+    Collect cache metrics of this process and of the whole site
+
+    Returns:
+        dict: process (live counters of this worker) and site (aggregate of
+            the snapshots published by every worker)
+    """
+    CacheManager.publish_stats()
+
+    process = CacheManager.get_stats()
+    for counters in process["namespaces"].values():
+        _with_ratio(counters)
+    process["memoized"] = get_memoize_stats()
+
+    return {"collected": now(), "process": process, "site": _aggregate(_load_snapshots())}
+
+
+@frappe.whitelist()
+def get_cache_metrics() -> Dict[str, Any]:
+    """
+    Inspect cache effectiveness (System Manager only)
+
+    Returns:
+        dict: Per-namespace hits, misses, hit_ratio, sets, evictions, expired,
+            size, approx_bytes and ttl, for this worker and for the site
+    """
+    frappe.only_for("System Manager")
+    return collect_cache_metrics()
+
+
+@frappe.whitelist()
+def reset_cache_metrics() -> Dict[str, Any]:
+    """
+    Reset this worker's counters and the published snapshots (System Manager only)
+
+    Other workers keep their own counters and publish them again within a
+    minute of their next cache access.
+
+    Returns:
+        dict: Status
+    """
+    frappe.only_for("System Manager")
+    CacheManager.reset_stats()
+    frappe.cache().delete_value(STATS_REDIS_KEY)
+    return {"status": "success"}
+
+
+def log_cache_metrics() -> None:
+    """Scheduled job recording the site-wide cache metrics in Payroll Log."""
+    if not frappe.conf.get(LOG_METRICS_CONFIG_KEY):
+        return
+
+    try:
+        metrics = collect_cache_metrics()
+        site = metrics["site"]
+        log = frappe.get_doc(
+            {
+                "doctype": "Payroll Log",
+                "log_type": "Cache Metrics",
+                "log_time": metrics["collected"],
+                "notes": json.dumps(site, indent=1, sort_keys=True),
+            }
+        )
+        log.insert(ignore_permissions=True)
+        frappe.db.commit()
+    except Exception as e:
+        frappe.log_error(f"Error logging cache metrics: {str(e)}", "Cache Metrics Error")
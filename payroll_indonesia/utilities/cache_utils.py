@@ -8,7 +8,39 @@ from frappe.utils import now_datetime, add_to_date
 import hashlib
 import json
 import functools
-from typing import Any, Optional, Dict, List, Union
+import os
+import socket
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Callable, Optional, Dict, Iterable, List, Union
+
+from payroll_indonesia.constants import CACHE_BRIEF, CACHE_MEDIUM
+
+# Counters kept per cache namespace
+STAT_FIELDS = ("hits", "misses", "sets", "evictions", "expired")
+
+# Redis hash holding the published counters of every process
+STATS_REDIS_KEY = "payroll_indonesia:cache_stats"
+
+# Seconds between publishing the counters of a process
+STATS_PUBLISH_INTERVAL = 60
+
+
+def _approx_size(value: Any, depth: int = 0) -> int:
+    """Approximate memory used by a cached value, following containers a few levels."""
+    size = sys.getsizeof(value, 0)
+    if depth >= 4:
+        return size
+    if isinstance(value, dict):
+        for key, item in value.items():
+            size += _approx_size(key, depth + 1) + _approx_size(item, depth + 1)
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        for item in value:
+            size += _approx_size(item, depth + 1)
+    return size
 
 
 # Main cache implementation as a class
@@ -19,6 +51,11 @@ class CacheManager:
     _storage = {}
     _clear_timestamps = {}
 
+    # Per-namespace counters: hits, misses, sets, evictions, expired
+    _stats = {}
+    _stats_since = None
+    _last_publish = 0.0
+
     # Default TTL values for different cache types
     DEFAULT_TTL = {
         "ter_rate": 1800,  # 30 minutes
@@ -57,6 +94,7 @@ class CacheManager:
         entry = cls._storage.get(cache_key)
 
         if not entry:
+            cls._count(namespace, "misses")
             return None
 
         # Check if entry has expired
@@ -65,8 +103,12 @@ class CacheManager:
             "ttl", cls.DEFAULT_TTL["default"]
         ):
             del cls._storage[cache_key]
+            cls._count(namespace, "expired")
+            cls._count(namespace, "misses")
             return None
 
+        cls._count(namespace, "hits")
+
         # Log hit if debug mode is on
         if frappe.conf.get("developer_mode"):
             frappe.logger().debug(f"Cache hit for key: {cache_key}")
@@ -105,6 +147,7 @@ class CacheManager:
             "ttl": ttl,
             "namespace": namespace,
         }
+        cls._count(namespace, "sets")
 
         # Log if debug mode is on
         if frappe.conf.get("developer_mode"):
@@ -122,6 +165,7 @@ class CacheManager:
         """
         if prefix is None:
             # Clear all caches
+            cls._count_evictions(cls._storage.values())
             cls._storage.clear()
             cls._clear_timestamps.clear()
             frappe.logger().info("All caches cleared")
@@ -136,6 +180,7 @@ class CacheManager:
 
         # Clear all entries with matching prefix
         keys_to_delete = [k for k in cls._storage if k.startswith(prefix)]
+        cls._count_evictions(cls._storage[key] for key in keys_to_delete)
         for key in keys_to_delete:
             del cls._storage[key]
 
@@ -151,6 +196,7 @@ class CacheManager:
     def clear_all(cls) -> None:
         """Clear all caches related to payroll calculations"""
         # Clear our unified cache
+        cls._count_evictions(cls._storage.values())
         cls._storage.clear()
         cls._clear_timestamps.clear()
 
@@ -207,6 +253,7 @@ class CacheManager:
         if (now - last_clear).total_seconds() > namespace_ttl:
             # Clear all entries for this namespace
             keys_to_delete = [k for k, v in cls._storage.items() if v.get("namespace") == namespace]
+            cls._count(namespace, "evictions", len(keys_to_delete))
 
             for key in keys_to_delete:
                 del cls._storage[key]
@@ -217,6 +264,87 @@ class CacheManager:
                 f"Auto-cleared cache namespace: {namespace}, keys: {len(keys_to_delete)}"
             )
 
+    @classmethod
+    def _count(cls, namespace: str, field: str, amount: int = 1) -> None:
+        """Bump a per-namespace counter and publish the counters now and then."""
+        counters = cls._stats.get(namespace)
+        if counters is None:
+            counters = cls._stats[namespace] = dict.fromkeys(STAT_FIELDS, 0)
+            if cls._stats_since is None:
+                cls._stats_since = now_datetime()
+        counters[field] += amount
+
+        if time.monotonic() - cls._last_publish > STATS_PUBLISH_INTERVAL:
+            cls.publish_stats()
+
+    @classmethod
+    def _count_evictions(cls, entries: Iterable[Dict[str, Any]]) -> None:
+        per_namespace = {}
+        for entry in entries:
+            namespace = entry.get("namespace", "default")
+            per_namespace[namespace] = per_namespace.get(namespace, 0) + 1
+        for namespace, count in per_namespace.items():
+            cls._count(namespace, "evictions", count)
+
+    @classmethod
+    def get_stats(cls) -> Dict[str, Any]:
+        """
+        Get cache counters of this process with current size per namespace
+
+        Counters are approximate under concurrent threads, sizes are
+        measured on the current entries.
+
+        Returns:
+            dict: since, pid and per-namespace hits, misses, sets, evictions,
+                expired, size, approx_bytes and ttl
+        """
+        namespaces = {name: dict(counters) for name, counters in cls._stats.items()}
+        for entry in list(cls._storage.values()):
+            namespace = entry.get("namespace", "default")
+            counters = namespaces.setdefault(namespace, dict.fromkeys(STAT_FIELDS, 0))
+            counters["size"] = counters.get("size", 0) + 1
+            counters["approx_bytes"] = counters.get("approx_bytes", 0) + _approx_size(
+                entry.get("value")
+            )
+
+        for namespace, counters in namespaces.items():
+            counters.setdefault("size", 0)
+            counters.setdefault("approx_bytes", 0)
+            counters["ttl"] = cls.DEFAULT_TTL.get(namespace, cls.DEFAULT_TTL["default"])
+
+        return {
+            "since": str(cls._stats_since) if cls._stats_since else None,
+            "pid": os.getpid(),
+            "host": socket.gethostname(),
+            "namespaces": namespaces,
+        }
+
+    @classmethod
+    def reset_stats(cls) -> None:
+        """Reset the counters of this process."""
+        cls._stats.clear()
+        cls._stats_since = None
+
+    @classmethod
+    def publish_stats(cls) -> None:
+        """
+        Store this process's counters in Redis so other processes can read them
+
+        Every worker has its own in-process cache, so the inspection endpoint
+        and the scheduled log aggregate the snapshots published here.
+        """
+        cls._last_publish = time.monotonic()
+        try:
+            snapshot = cls.get_stats()
+            snapshot["published"] = time.time()
+            snapshot["memoized"] = get_memoize_stats()
+            frappe.cache().hset(
+                STATS_REDIS_KEY, f"{snapshot['host']}:{snapshot['pid']}", json.dumps(snapshot)
+            )
+        except Exception as e:
+            # Metrics must never break caching
+            frappe.logger().debug(f"Could not publish cache stats: {e}")
+
     @staticmethod
     def _normalize_key(obj: Any) -> str:
         """
@@ -240,51 +368,322 @@ class CacheManager:
             return hashlib.md5(str(obj).encode()).hexdigest()
 
 
-# Create decorator for memoization with TTL
-def memoize_with_ttl(ttl=None, namespace=None):
+# Stored in place of a None result so negative lookups can be cached
+NEGATIVE_RESULT = "__payroll_indonesia_memo_none__"
+
+# Default lifetime of cached None results, see memoize_with_ttl
+NEGATIVE_TTL = CACHE_BRIEF
+
+# Longest key part kept readable, longer ones are hashed
+MAX_KEY_PART_LENGTH = 200
+
+# Polling interval while waiting for another process to fill a shared key
+SINGLE_FLIGHT_POLL_SECONDS = 0.05
+
+
+class MemoizeStats:
+    """Hit, miss and compute-time counters of one memoized function."""
+
+    __slots__ = (
+        "name",
+        "hits",
+        "negative_hits",
+        "misses",
+        "waits",
+        "errors",
+        "compute_time",
+        "_lock",
+    )
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.hits = 0
+            self.negative_hits = 0
+            self.misses = 0
+            self.waits = 0
+            self.errors = 0
+            self.compute_time = 0.0
+
+    def add(self, field: str, value: Union[int, float] = 1) -> None:
+        with self._lock:
+            setattr(self, field, getattr(self, field) + value)
+
+    def as_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.negative_hits + self.misses
+            return {
+                "hits": self.hits,
+                "negative_hits": self.negative_hits,
+                "misses": self.misses,
+                "waits": self.waits,
+                "errors": self.errors,
+                "compute_time": round(self.compute_time, 6),
+                "avg_compute_ms": (
+                    round(self.compute_time / self.misses * 1000, 3) if self.misses else 0.0
+                ),
+                "hit_ratio": (
+                    round((self.hits + self.negative_hits) / lookups, 4) if lookups else 0.0
+                ),
+            }
+
+
+# Memoized function name -> counters
+_memoize_registry: Dict[str, MemoizeStats] = {}
+
+
+def get_memoize_stats() -> Dict[str, Dict[str, Any]]:
+    """
+    Get the counters of every memoized function in this process
+
+    Returns:
+        dict: Function name -> hits, negative_hits, misses, waits, errors,
+            compute_time, avg_compute_ms and hit_ratio
+    """
+    return {name: stats.as_dict() for name, stats in sorted(_memoize_registry.items())}
+
+
+def reset_memoize_stats() -> None:
+    """Reset the counters of every memoized function in this process."""
+    for stats in _memoize_registry.values():
+        stats.reset()
+
+
+class _KeyLocks:
+    """Per-key in-process locks, dropped again once no caller holds them."""
+
+    def __init__(self):
+        self._guard = threading.Lock()
+        self._locks = {}
+
+    @contextmanager
+    def hold(self, key: str):
+        with self._guard:
+            entry = self._locks.get(key)
+            if entry is None:
+                entry = self._locks[key] = [threading.Lock(), 0]
+            entry[1] += 1
+
+        waited = not entry[0].acquire(blocking=False)
+        if waited:
+            entry[0].acquire()
+        try:
+            yield waited
+        finally:
+            entry[0].release()
+            with self._guard:
+                entry[1] -= 1
+                if not entry[1]:
+                    self._locks.pop(key, None)
+
+
+_key_locks = _KeyLocks()
+
+
+def _typed_key_part(value: Any) -> str:
+    """
+    Stable cache key part for an argument
+
+    Scalars keep their type so 1 and "1" differ, documents are keyed by
+    doctype, name and modified, containers by a hash of their JSON form.
+    """
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return f"{type(value).__name__}={value}"
+
+    doctype = getattr(value, "doctype", None)
+    name = getattr(value, "name", None)
+    if isinstance(doctype, str) and isinstance(name, str):
+        return f"doc={doctype}/{name}@{getattr(value, 'modified', None)}"
+
+    try:
+        dumped = json.dumps(value, sort_keys=True, default=str)
+    except (TypeError, ValueError):
+        raise TypeError(
+            f"Cannot build a stable cache key for {type(value).__name__}, "
+            "pass key= to memoize_with_ttl"
+        )
+    return f"{type(value).__name__}#{hashlib.md5(dumped.encode()).hexdigest()}"
+
+
+def _default_memo_key(*args, **kwargs) -> str:
+    parts = [_typed_key_part(arg) for arg in args]
+    parts.extend(f"{k}:{_typed_key_part(v)}" for k, v in sorted(kwargs.items()))
+    return ",".join(parts)
+
+
+def memoize_with_ttl(
+    ttl: Optional[int] = None,
+    namespace: Optional[str] = None,
+    key: Optional[Callable[..., Any]] = None,
+    negative_ttl: Optional[int] = None,
+    shared: bool = False,
+    single_flight: bool = True,
+    lock_timeout: int = 10,
+):
     """
     Decorator to memoize a function with TTL (time-to-live) caching
 
+    None results are cached as well, under a sentinel and with the shorter
+    negative_ttl, so "nothing found" lookups are not repeated on every call.
+    Concurrent callers missing the same key wait for a single computation:
+    in-process through a per-key lock and, for shared caches, across
+    workers through a Redis lock.
+
+    The wrapper exposes cache_key(), invalidate() and cache_clear() taking
+    the function's arguments, and cache_stats() returning its counters.
+
     Args:
         ttl (int, optional): Time-to-live in seconds
         namespace (str, optional): Cache namespace to use
+        key (callable, optional): Called with the function's arguments,
+            returns the key part; defaults to a typed key of all arguments
+        negative_ttl (int, optional): Time-to-live of None results, defaults
+            to NEGATIVE_TTL capped at ttl; 0 disables negative caching
+        shared (bool): Store results in Redis, shared by all workers,
+            instead of the in-process cache
+        single_flight (bool): Let only one caller compute a missing key
+        lock_timeout (int): Seconds a shared computation may hold its lock
 
     Returns:
         function: Decorated function with caching
     """
+    if negative_ttl is None:
+        negative_ttl = min(NEGATIVE_TTL, ttl) if ttl else NEGATIVE_TTL
+    if shared and not ttl:
+        ttl = CACHE_MEDIUM
 
     def decorator(func):
-        @functools.wraps(func)
-        def wrapper(*args, **kwargs):
-            # Generate a cache key from function name, args and kwargs
-            key_parts = [func.__module__, func.__name__]
-
-            # Add args to key
-            for arg in args:
-                key_parts.append(str(arg))
-
-            # Add sorted kwargs to key for stable hashing
-            sorted_kwargs = sorted(kwargs.items())
-            for k, v in sorted_kwargs:
-                key_parts.append(f"{k}:{v}")
-
-            # Generate the cache key
-            cache_key = ":".join(key_parts)
-
-            # Set namespace prefix
-            if namespace:
-                cache_key = f"{namespace}:{cache_key}"
-
-            # Try to get value from cache
-            cached_result = get_cached_value(cache_key, ttl)
-            if cached_result is not None:
-                return cached_result
-
-            # Calculate and cache result
-            result = func(*args, **kwargs)
-            cache_value(cache_key, result, ttl)
+        qualified_name = f"{func.__module__}.{func.__qualname__}"
+        prefix = ":".join(filter(None, [namespace, func.__module__, func.__qualname__])) + ":"
+        stats = _memoize_registry.setdefault(qualified_name, MemoizeStats(qualified_name))
+
+        def cache_key(*args, **kwargs) -> str:
+            part = str(key(*args, **kwargs)) if key else _default_memo_key(*args, **kwargs)
+            if len(part) > MAX_KEY_PART_LENGTH:
+                part = hashlib.md5(part.encode()).hexdigest()
+            return f"{prefix}{part}"
+
+        def read(cache_key_: str) -> Any:
+            if not shared:
+                return get_cached_value(cache_key_, ttl)
+            try:
+                return frappe.cache().get_value(cache_key_)
+            except Exception as e:
+                frappe.logger().debug(f"Shared memo read failed for {cache_key_}: {e}")
+                return None
+
+        def write(cache_key_: str, result: Any) -> None:
+            value, lifetime = (NEGATIVE_RESULT, negative_ttl) if result is None else (result, ttl)
+            if result is None and not negative_ttl:
+                return
+            if not shared:
+                cache_value(cache_key_, value, lifetime)
+                return
+            try:
+                frappe.cache().set_value(cache_key_, value, expires_in_sec=lifetime)
+            except Exception as e:
+                frappe.logger().debug(f"Shared memo write failed for {cache_key_}: {e}")
+
+        def unwrap(cached: Any) -> Any:
+            if cached == NEGATIVE_RESULT:
+                stats.add("negative_hits")
+                return None
+            stats.add("hits")
+            return cached
+
+        def compute(cache_key_: str, args, kwargs) -> Any:
+            stats.add("misses")
+            started = time.perf_counter()
+            try:
+                result = func(*args, **kwargs)
+            except Exception:
+                stats.add("errors")
+                raise
+            finally:
+                stats.add("compute_time", time.perf_counter() - started)
+            write(cache_key_, result)
             return result
 
+        def compute_shared(cache_key_: str, args, kwargs) -> Any:
+            """Compute under a Redis lock, or wait for the worker holding it."""
+            cache = frappe.cache()
+            lock_key = cache.make_key(f"{cache_key_}:lock")
+            token = uuid.uuid4().hex
+            try:
+                acquired = cache.set(lock_key, token, nx=True, ex=int(lock_timeout))
+            except Exception:
+                acquired = True
+                token = None
+
+            if not acquired:
+                stats.add("waits")
+                deadline = time.monotonic() + lock_timeout
+                while time.monotonic() < deadline:
+                    time.sleep(SINGLE_FLIGHT_POLL_SECONDS)
+                    cached = read(cache_key_)
+                    if cached is not None:
+                        return unwrap(cached)
+                # Holder died or is too slow, compute without the lock
+                return compute(cache_key_, args, kwargs)
+
+            try:
+                return compute(cache_key_, args, kwargs)
+            finally:
+                if token:
+                    try:
+                        held = cache.get(lock_key)
+                        if held and (held.decode() if isinstance(held, bytes) else held) == token:
+                            cache.delete(lock_key)
+                    except Exception:
+                        pass
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            cache_key_ = cache_key(*args, **kwargs)
+
+            cached = read(cache_key_)
+            if cached is not None:
+                return unwrap(cached)
+
+            if not single_flight:
+                return compute(cache_key_, args, kwargs)
+
+            with _key_locks.hold(cache_key_) as waited:
+                if waited:
+                    stats.add("waits")
+                    cached = read(cache_key_)
+                    if cached is not None:
+                        return unwrap(cached)
+
+                if shared:
+                    return compute_shared(cache_key_, args, kwargs)
+                return compute(cache_key_, args, kwargs)
+
+        def invalidate(*args, **kwargs) -> None:
+            """Drop the cached result for these arguments."""
+            cache_key_ = cache_key(*args, **kwargs)
+            if shared:
+                frappe.cache().delete_value(cache_key_)
+            else:
+                entry = CacheManager._storage.pop(cache_key_, None)
+                if entry:
+                    CacheManager._count(entry.get("namespace", "default"), "evictions")
+
+        def cache_clear() -> None:
+            """Drop every cached result of this function."""
+            if shared:
+                frappe.cache().delete_keys(prefix)
+            else:
+                clear_cache(prefix)
+
+        wrapper.cache_key = cache_key
+        wrapper.invalidate = invalidate
+        wrapper.cache_clear = cache_clear
+        wrapper.cache_stats = stats.as_dict
         return wrapper
 
     return decorator
@@ -523,6 +922,7 @@ def clear_salary_slip_caches() -> Dict[str, Any]:
             "cleared_count": cleared_count,
             "prefixes": prefixes_to_clear,
             "doctype_cache_cleared": "Salary Slip",
+            "cache_stats": CacheManager.get_stats()["namespaces"],
         }
 
     except Exception as e:
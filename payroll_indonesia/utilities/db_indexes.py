@@ -0,0 +1,294 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025, PT. Innovasi Terbaik Bangsa and contributors
+# For license information, please see license.txt
+
+"""
+Composite indexes for the payroll query patterns.
+
+PAYROLL_INDEXES declares the indexes the hot queries rely on.
+ensure_payroll_indexes creates the missing ones and runs on every migrate.
+An index counts as present when any existing index starts with the same
+columns, so indexes added by hand under another name are not duplicated.
+
+get_index_report lists missing declared indexes and existing indexes on the
+same tables that are redundant (a leading prefix of another index) or, when
+the server collects user statistics, never read. explain_key_queries runs
+EXPLAIN on the key queries with sample values from the site and flags full
+table scans.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+import frappe
+from frappe.utils import cint
+
+from payroll_indonesia.payroll_indonesia.utils import debug_log
+
+__all__ = [
+    "PAYROLL_INDEXES",
+    "ensure_payroll_indexes",
+    "get_index_report",
+    "explain_key_queries",
+    "check_payroll_indexes",
+]
+
+# Index name -> (DocType, columns)
+PAYROLL_INDEXES: Dict[str, Tuple[str, Tuple[str, ...]]] = {
+    "pi_employee_docstatus_start_date": ("Salary Slip", ("employee", "docstatus", "start_date")),
+    "pi_parent_parentfield_component": (
+        "Salary Detail",
+        ("parent", "parentfield", "salary_component"),
+    ),
+    "pi_employee_year": ("Employee Tax Summary", ("employee", "year")),
+    "pi_parent_month": ("Employee Monthly Tax Detail", ("parent", "month")),
+    "pi_status_pajak_income_from": ("PPh 21 TER Table", ("status_pajak", "income_from")),
+}
+
+# Query name -> (index the query should use, SQL with sample value placeholders)
+KEY_QUERIES: Dict[str, Tuple[str, str]] = {
+    "salary_slips_ytd": (
+        "pi_employee_docstatus_start_date",
+        """
+        SELECT name, gross_pay FROM `tabSalary Slip`
+        WHERE employee = %(employee)s AND docstatus = 1
+            AND start_date BETWEEN %(year_start)s AND %(year_end)s
+        """,
+    ),
+    "salary_slip_components": (
+        "pi_parent_parentfield_component",
+        """
+        SELECT amount FROM `tabSalary Detail`
+        WHERE parent = %(salary_slip)s AND parentfield = 'deductions'
+            AND salary_component = 'PPh 21'
+        """,
+    ),
+    "tax_summary_lookup": (
+        "pi_employee_year",
+        """
+        SELECT name FROM `tabEmployee Tax Summary`
+        WHERE employee = %(employee)s AND year = %(year)s
+        """,
+    ),
+    "tax_summary_months": (
+        "pi_parent_month",
+        """
+        SELECT gross_pay, tax_amount FROM `tabEmployee Monthly Tax Detail`
+        WHERE parent = %(tax_summary)s AND month < %(month)s
+        """,
+    ),
+    "ter_rate_lookup": (
+        "pi_status_pajak_income_from",
+        """
+        SELECT rate FROM `tabPPh 21 TER Table`
+        WHERE status_pajak = %(status_pajak)s AND income_from <= %(income)s
+        ORDER BY income_from DESC LIMIT 1
+        """,
+    ),
+}
+
+
+def _table_indexes(doctype: str) -> Dict[str, List[str]]:
+    """Existing indexes of a DocType table: name -> ordered columns."""
+    indexes = {}
+    for row in frappe.db.sql(f"SHOW INDEX FROM `tab{doctype}`", as_dict=1):
+        indexes.setdefault(row.Key_name, []).append((row.Seq_in_index, row.Column_name))
+    return {name: [column for _, column in sorted(cols)] for name, cols in indexes.items()}
+
+
+def _covering_index(indexes: Dict[str, List[str]], columns: Tuple[str, ...]) -> Optional[str]:
+    """Name of an existing index starting with the given columns, if any."""
+    for name, index_columns in indexes.items():
+        if tuple(index_columns[: len(columns)]) == tuple(columns):
+            return name
+    return None
+
+
+def ensure_payroll_indexes() -> Dict[str, List[str]]:
+    """
+    Create the declared indexes that are missing
+
+    Tables or columns that do not exist on the site (e.g. before HRMS is
+    installed) are skipped.
+
+    Returns:
+        dict: created, present and skipped index names
+    """
+    result = {"created": [], "present": [], "skipped": []}
+    for index_name, (doctype, columns) in PAYROLL_INDEXES.items():
+        try:
+            if not frappe.db.table_exists(doctype) or not all(
+                frappe.db.has_column(doctype, column) for column in columns
+            ):
+                result["skipped"].append(index_name)
+                continue
+
+            if _covering_index(_table_indexes(doctype), columns):
+                result["present"].append(index_name)
+                continue
+
+            frappe.db.add_index(doctype, list(columns), index_name)
+            result["created"].append(index_name)
+            debug_log(f"Created index {index_name} on {doctype}", "Index Manager")
+        except Exception as e:
+            result["skipped"].append(index_name)
+            frappe.log_error(
+                f"Could not create index {index_name} on {doctype}: {str(e)}",
+                "Index Manager Error",
+            )
+
+    return result
+
+
+def _unused_indexes(tables: List[str]) -> Optional[Dict[str, List[str]]]:
+    """Indexes without reads, None when the server has no index statistics."""
+    try:
+        # INDEX_STATISTICS exists on every MariaDB but stays empty unless
+        # userstat is on, which would report every index as unused
+        if not cint(frappe.db.sql("SELECT @@userstat")[0][0]):
+            return None
+
+        rows = frappe.db.sql(
+            """
+            SELECT DISTINCT s.TABLE_NAME AS table_name, s.INDEX_NAME AS index_name
+            FROM information_schema.STATISTICS s
+            LEFT JOIN information_schema.INDEX_STATISTICS i
+                ON i.TABLE_SCHEMA = s.TABLE_SCHEMA
+                AND i.TABLE_NAME = s.TABLE_NAME
+                AND i.INDEX_NAME = s.INDEX_NAME
+            WHERE s.TABLE_SCHEMA = DATABASE()
+                AND s.TABLE_NAME IN %(tables)s
+                AND s.INDEX_NAME != 'PRIMARY'
+                AND i.INDEX_NAME IS NULL
+            """,
+            {"tables": tuple(tables)},
+            as_dict=1,
+        )
+    except Exception:
+        # No userstat variable: MySQL or another server without user statistics
+        return None
+
+    unused = {}
+    for row in rows:
+        unused.setdefault(row.table_name, []).append(row.index_name)
+    return unused
+
+
+def get_index_report() -> Dict[str, Any]:
+    """
+    Report missing, redundant and unused indexes on the payroll tables
+
+    Returns:
+        dict: missing (declared but absent), present (declared index -> the
+            existing index covering it), redundant (table -> indexes that
+            are a leading prefix of another index) and unused (table ->
+            indexes never read, None without server index statistics)
+    """
+    report = {"missing": [], "present": {}, "redundant": {}}
+    tables = []
+
+    for doctype in sorted({doctype for doctype, _ in PAYROLL_INDEXES.values()}):
+        if not frappe.db.table_exists(doctype):
+            continue
+        tables.append(f"tab{doctype}")
+        indexes = _table_indexes(doctype)
+
+        for index_name, (index_doctype, columns) in PAYROLL_INDEXES.items():
+            if index_doctype != doctype:
+                continue
+            covering = _covering_index(indexes, columns)
+            if covering:
+                report["present"][index_name] = covering
+            else:
+                report["missing"].append(index_name)
+
+        redundant = [
+            name
+            for name, columns in indexes.items()
+            if name != "PRIMARY"
+            and any(
+                other != name
+                and len(other_columns) > len(columns)
+                and other_columns[: len(columns)] == columns
+                for other, other_columns in indexes.items()
+            )
+        ]
+        if redundant:
+            report["redundant"][doctype] = sorted(redundant)
+
+    report["unused"] = _unused_indexes(tables) if tables else {}
+    return report
+
+
+def _sample_values() -> Dict[str, Any]:
+    """Representative filter values taken from the site's own data."""
+    slip = frappe.db.sql(
+        "SELECT name, employee, start_date FROM `tabSalary Slip` ORDER BY creation DESC LIMIT 1",
+        as_dict=1,
+    )
+    summary = frappe.db.sql(
+        "SELECT name, employee, year FROM `tabEmployee Tax Summary` LIMIT 1", as_dict=1
+    )
+    slip = slip[0] if slip else frappe._dict()
+    summary = summary[0] if summary else frappe._dict()
+    year = summary.year or (slip.start_date.year if slip.start_date else 2025)
+
+    return {
+        "employee": slip.employee or summary.employee or "",
+        "salary_slip": slip.name or "",
+        "tax_summary": summary.name or "",
+        "year": year,
+        "year_start": f"{year}-01-01",
+        "year_end": f"{year}-12-31",
+        "month": 12,
+        "status_pajak": "TER A",
+        "income": 10000000,
+    }
+
+
+def explain_key_queries() -> Dict[str, Dict[str, Any]]:
+    """
+    Run EXPLAIN on the key payroll queries
+
+    Returns:
+        dict: Query name -> expected index (the existing index covering the
+            declared one, if any), the key MariaDB chose, access type,
+            estimated rows, full_scan (access type ALL) and
+            uses_expected_index
+    """
+    values = _sample_values()
+    results = {}
+
+    for query_name, (index_name, query) in KEY_QUERIES.items():
+        doctype, columns = PAYROLL_INDEXES[index_name]
+        expected_index = index_name
+        try:
+            expected_index = _covering_index(_table_indexes(doctype), columns) or index_name
+            plan = frappe.db.sql(f"EXPLAIN {query}", values, as_dict=1)
+        except Exception as e:
+            results[query_name] = {"expected_index": expected_index, "error": str(e)}
+            continue
+
+        first = plan[0] if plan else frappe._dict()
+        results[query_name] = {
+            "expected_index": expected_index,
+            "key": first.key,
+            "type": first.type,
+            "rows": first.rows,
+            "full_scan": any(row.type == "ALL" for row in plan),
+            "uses_expected_index": any(row.key == expected_index for row in plan),
+        }
+
+    return results
+
+
+@frappe.whitelist()
+def check_payroll_indexes() -> Dict[str, Any]:
+    """
+    Index report and EXPLAIN check of the key queries (System Manager only)
+
+    Returns:
+        dict: report (see get_index_report) and explain (see
+            explain_key_queries)
+    """
+    frappe.only_for("System Manager")
+    return {"report": get_index_report(), "explain": explain_key_queries()}
@@ -0,0 +1,235 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025, PT. Innovasi Terbaik Bangsa and contributors
+# For license information, please see license.txt
+
+"""
+Redis-backed registry of payroll background jobs keyed by logical job name.
+
+A job is claimed with an atomic SET NX EX before it is enqueued and released
+when it finishes, so checking whether a job is already queued or running is
+a single key lookup instead of a scan over RQ queues or Background Jobs
+records. The TTL makes sure a claim held by a crashed worker expires.
+
+Jobs belonging to a batch are also recorded in a per-batch hash holding the
+status of each job, which lets batch status be read without scanning.
+"""
+
+import json
+from typing import Any, Callable, Dict, List, Optional, Union
+
+import frappe
+from frappe.utils import now
+
+__all__ = [
+    "DEFAULT_JOB_TTL",
+    "claim_job",
+    "release_job",
+    "is_job_claimed",
+    "get_job_claim",
+    "enqueue_registered",
+    "run_registered_job",
+    "get_registered_batch_jobs",
+]
+
+# Key prefixes in Redis
+JOB_KEY_PREFIX = "payroll_indonesia:job:"
+BATCH_KEY_PREFIX = "payroll_indonesia:job_batch:"
+
+# Default claim lifetime, should exceed the longest job timeout
+DEFAULT_JOB_TTL = 3600
+
+# Batch status hashes are kept for a day for status reporting
+BATCH_TTL = 86400
+
+RUNNER_METHOD = "payroll_indonesia.utilities.job_registry.run_registered_job"
+
+
+def _job_name_key(job_name: str) -> str:
+    return f"{JOB_KEY_PREFIX}{job_name}"
+
+
+def _job_key(job_name: str) -> str:
+    # Site-prefixed key for the raw set/get/delete calls
+    return frappe.cache().make_key(_job_name_key(job_name))
+
+
+def _batch_key(batch_id: str) -> str:
+    return f"{BATCH_KEY_PREFIX}{batch_id}"
+
+
+def claim_job(job_name: str, ttl: int = DEFAULT_JOB_TTL, **meta) -> bool:
+    """
+    Atomically claim a logical job name
+
+    Args:
+        job_name: Logical job name
+        ttl: Claim lifetime in seconds
+        **meta: Extra details stored with the claim (queue, batch_id, ...)
+
+    Returns:
+        bool: True if the claim was acquired, False if already held
+    """
+    value = json.dumps(dict(meta, job_name=job_name, status="queued", creation=now()))
+    return bool(frappe.cache().set(_job_key(job_name), value, nx=True, ex=int(ttl)))
+
+
+def release_job(job_name: str) -> None:
+    """
+    Release a claimed job name so it can be enqueued again
+
+    Args:
+        job_name: Logical job name
+    """
+    frappe.cache().delete(_job_key(job_name))
+
+
+def is_job_claimed(job_name: str) -> bool:
+    """
+    Check if a job is queued or running
+
+    Args:
+        job_name: Logical job name
+
+    Returns:
+        bool: True if the job is currently claimed
+    """
+    # RedisWrapper.exists adds the site prefix itself
+    return bool(frappe.cache().exists(_job_name_key(job_name)))
+
+
+def get_job_claim(job_name: str) -> Optional[Dict[str, Any]]:
+    """
+    Get the details stored with a job claim
+
+    Args:
+        job_name: Logical job name
+
+    Returns:
+        dict: Claim details or None if not claimed
+    """
+    value = frappe.cache().get(_job_key(job_name))
+    if not value:
+        return None
+
+    try:
+        return json.loads(frappe.safe_decode(value))
+    except ValueError:
+        return None
+
+
+def _set_batch_status(batch_id: Optional[str], job_name: str, status: str, **details) -> None:
+    """Record the status of a job in its batch hash."""
+    if not batch_id:
+        return
+
+    cache = frappe.cache()
+    entry = cache.hget(_batch_key(batch_id), job_name) or {}
+    entry.update(details, job_name=job_name, status=status)
+    entry.setdefault("creation", now())
+    cache.hset(_batch_key(batch_id), job_name, entry)
+    cache.expire(cache.make_key(_batch_key(batch_id)), BATCH_TTL)
+
+
+def enqueue_registered(
+    method: Union[str, Callable],
+    job_name: str,
+    queue: str = "long",
+    timeout: int = 1800,
+    ttl: Optional[int] = None,
+    enqueue_after_commit: bool = False,
+    now: bool = False,
+    **kwargs,
+) -> bool:
+    """
+    Enqueue a background job unless a job with the same name is claimed
+
+    Args:
+        method: Dotted method path or callable to run
+        job_name: Logical job name used for deduplication
+        queue: RQ queue name
+        timeout: Job timeout in seconds
+        ttl: Claim lifetime in seconds (defaults to twice the timeout)
+        enqueue_after_commit: Enqueue only after the current transaction commits
+        now: Run the job immediately in this process instead of enqueuing it
+        **kwargs: Arguments passed to method. Names of frappe.enqueue's own
+            parameters (job_id, at_front, ...) are consumed by enqueue and
+            must not be used. A batch_id argument also records
+            the job in that batch's status hash.
+
+    Returns:
+        bool: True if the job was enqueued, False if it was already claimed
+    """
+    ttl = ttl or max(int(timeout) * 2, DEFAULT_JOB_TTL)
+    batch_id = kwargs.get("batch_id")
+    if not claim_job(job_name, ttl, queue=queue, batch_id=batch_id):
+        return False
+
+    try:
+        frappe.enqueue(
+            method=RUNNER_METHOD,
+            queue=queue,
+            timeout=timeout,
+            is_async=True,
+            job_name=job_name,
+            enqueue_after_commit=enqueue_after_commit,
+            now=now,
+            registered_method=method,
+            registered_job_name=job_name,
+            **kwargs,
+        )
+    except Exception:
+        release_job(job_name)
+        raise
+
+    if not now:
+        _set_batch_status(batch_id, job_name, "queued", queue=queue)
+    return True
+
+
+def run_registered_job(
+    registered_method: Union[str, Callable], registered_job_name: str, **kwargs
+) -> Any:
+    """
+    Run a registered job and release its claim when done
+
+    Args:
+        registered_method: Dotted method path or callable to run
+        registered_job_name: Logical job name holding the claim
+        **kwargs: Arguments passed to the method
+
+    Returns:
+        Any: Result of the wrapped method
+    """
+    method = (
+        frappe.get_attr(registered_method)
+        if isinstance(registered_method, str)
+        else registered_method
+    )
+
+    batch_id = kwargs.get("batch_id")
+    frappe.flags.current_registered_job = registered_job_name
+    _set_batch_status(batch_id, registered_job_name, "started")
+
+    status = "failed"
+    try:
+        result = method(**kwargs)
+        status = "finished"
+        return result
+    finally:
+        frappe.flags.current_registered_job = None
+        release_job(registered_job_name)
+        _set_batch_status(batch_id, registered_job_name, status)
+
+
+def get_registered_batch_jobs(batch_id: str) -> List[Dict[str, Any]]:
+    """
+    Get the jobs recorded for a batch with their status
+
+    Args:
+        batch_id: Batch ID
+
+    Returns:
+        list: Job dicts with job_name, status, creation and queue
+    """
+    jobs = frappe.cache().hgetall(_batch_key(batch_id)) or {}
+    return sorted(jobs.values(), key=lambda job: job.get("job_name") or "")
@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025, PT. Innovasi Terbaik Bangsa and contributors
+# For license information, please see license.txt
+
+"""
+Content-hash manifest for idempotent after_migrate steps.
+
+The manifest fingerprints the inputs of the setup steps run on every
+migrate: defaults.json, the fixture JSON files, the modified timestamps of
+the settings singles and the company list. Each step declares the manifest
+groups it depends on and records the hash it last applied in DefaultValue,
+so a migrate where nothing changed skips the step after a file read and a
+couple of small queries.
+
+Every step hash also covers the app version and the source of the step's
+own module plus any modules it declares, so an upgrade that changes what a
+step does re-runs it even when its data inputs are unchanged.
+
+The recorded hash is computed after the step has run, because the steps
+themselves save settings and would otherwise invalidate their own entry.
+"""
+
+import hashlib
+import importlib
+import json
+import os
+from typing import Any, Callable, Dict, Iterable, Optional
+
+import frappe
+
+import payroll_indonesia
+
+__all__ = [
+    "get_manifest",
+    "get_step_hash",
+    "run_step",
+    "reset_manifest",
+]
+
+# DefaultValue key prefix for applied step hashes
+MANIFEST_KEY_PREFIX = "payroll_indonesia_manifest:"
+
+# Settings singles whose changes should re-run the migrate steps
+SETTINGS_DOCTYPES = ("Payroll Indonesia Settings", "BPJS Settings", "PPh 21 Settings")
+
+
+def _file_hash(path: str) -> str:
+    """SHA-256 of a file's contents, empty string if it cannot be read."""
+    try:
+        with open(path, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except OSError:
+        return ""
+
+
+def _defaults_manifest() -> Dict[str, str]:
+    app_path = frappe.get_app_path("payroll_indonesia")
+    return {"defaults.json": _file_hash(os.path.join(app_path, "config", "defaults.json"))}
+
+
+def _fixtures_manifest() -> Dict[str, str]:
+    fixtures_path = os.path.join(frappe.get_app_path("payroll_indonesia"), "fixtures")
+    try:
+        names = sorted(name for name in os.listdir(fixtures_path) if name.endswith(".json"))
+    except OSError:
+        names = []
+    return {f"fixtures/{name}": _file_hash(os.path.join(fixtures_path, name)) for name in names}
+
+
+def _settings_manifest() -> Dict[str, str]:
+    rows = frappe.db.sql(
+        """
+        SELECT doctype, value FROM `tabSingles`
+        WHERE field = 'modified' AND doctype IN %s
+        """,
+        (SETTINGS_DOCTYPES,),
+    )
+    modified = dict(rows)
+    return {
+        f"settings/{doctype}": str(modified.get(doctype) or "") for doctype in SETTINGS_DOCTYPES
+    }
+
+
+def _companies_manifest() -> Dict[str, str]:
+    rows = frappe.db.sql("SELECT name, abbr FROM `tabCompany` ORDER BY name")
+    return {"companies": hashlib.sha256(json.dumps(rows, default=str).encode()).hexdigest()}
+
+
+MANIFEST_GROUPS: Dict[str, Callable[[], Dict[str, str]]] = {
+    "defaults": _defaults_manifest,
+    "fixtures": _fixtures_manifest,
+    "settings": _settings_manifest,
+    "companies": _companies_manifest,
+}
+
+
+def get_manifest(groups: Optional[Iterable[str]] = None) -> Dict[str, str]:
+    """
+    Build the content-hash manifest
+
+    Args:
+        groups: Manifest groups to include (defaults, fixtures, settings,
+            companies), all when omitted
+
+    Returns:
+        dict: Input name -> content hash or version
+    """
+    manifest = {}
+    for group in groups or MANIFEST_GROUPS:
+        manifest.update(MANIFEST_GROUPS[group]())
+    return manifest
+
+
+def _code_manifest(modules: Iterable[str]) -> Dict[str, str]:
+    """App version and source hashes of the modules implementing a step."""
+    manifest = {"version": payroll_indonesia.__version__}
+    for module in modules:
+        path = getattr(importlib.import_module(module), "__file__", None) or ""
+        manifest[f"code/{module}"] = _file_hash(path)
+    return manifest
+
+
+def get_step_hash(groups: Iterable[str], modules: Iterable[str] = ()) -> str:
+    """
+    Hash of the manifest groups and code a step depends on
+
+    Args:
+        groups: Manifest groups
+        modules: Dotted names of the modules implementing the step
+
+    Returns:
+        str: SHA-256 of the manifest subset
+    """
+    manifest = get_manifest(groups)
+    manifest.update(_code_manifest(modules))
+    return hashlib.sha256(json.dumps(manifest, sort_keys=True).encode()).hexdigest()
+
+
+def run_step(
+    step: str,
+    func: Callable[[], Any],
+    groups: Iterable[str],
+    succeeded: Optional[Callable[[Any], bool]] = None,
+    force: bool = False,
+    modules: Iterable[str] = (),
+) -> Any:
+    """
+    Run a migrate step only if its inputs changed since it last succeeded
+
+    Args:
+        step: Step name used as manifest key
+        func: Step function, called without arguments
+        groups: Manifest groups the step depends on
+        succeeded: Called with the step result, the hash is recorded only
+            when it returns True (defaults to a truthy result)
+        force: Run even if the inputs are unchanged
+        modules: Modules the step calls into, hashed together with the
+            module defining func and the app version
+
+    Returns:
+        Any: Step result, or None if the step was skipped
+    """
+    groups = tuple(groups)
+    modules = tuple(dict.fromkeys((func.__module__,) + tuple(modules)))
+    key = f"{MANIFEST_KEY_PREFIX}{step}"
+
+    if not force and frappe.db.get_default(key) == get_step_hash(groups, modules):
+        frappe.logger().info(f"[PI-Install] {step}: inputs unchanged, skipping")
+        return None
+
+    result = func()
+
+    if (succeeded or bool)(result):
+        frappe.db.set_default(key, get_step_hash(groups, modules))
+        frappe.db.commit()
+    else:
+        frappe.logger().warning(f"[PI-Install] {step}: not recorded, will run again next migrate")
+
+    return result
+
+
+def reset_manifest(step: Optional[str] = None) -> None:
+    """
+    Forget applied step hashes so the next migrate runs the steps again
+
+    Args:
+        step: Step to reset, all steps when omitted
+    """
+    if step:
+        frappe.defaults.clear_default(f"{MANIFEST_KEY_PREFIX}{step}")
+        return
+
+    frappe.db.sql(
+        """
+        DELETE FROM `tabDefaultValue`
+        WHERE parent = '__default' AND defkey LIKE %s
+        """,
+        f"{MANIFEST_KEY_PREFIX}%",
+    )
+    frappe.defaults.clear_cache("__default")
@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025, PT. Innovasi Terbaik Bangsa and contributors
+# For license information, please see license.txt
+
+"""
+Read-replica routing for heavy, read-only payroll queries.
+
+Queries inside a replica_reads() block (or a function decorated with
+replica_read_only) run on the read replica configured for Frappe with
+"read_from_replica" and "replica_host" in site_config.json. Everything else,
+including any write, stays on the primary.
+
+The block falls back to the primary when:
+
+- no replica is configured, or "payroll_indonesia_replica_reads" is 0
+- the current transaction has uncommitted writes, which the replica cannot
+  see yet
+- the replica lags behind by more than "payroll_indonesia_replica_max_lag"
+  seconds (default 30, -1 skips the check), or its lag cannot be read
+- connecting to the replica fails
+
+Only wrap pure reads: errors raised inside a block are re-raised after the
+primary connection is restored, so error logging in the caller still works.
+"""
+
+import functools
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, Optional
+
+import frappe
+from frappe.utils import cint, flt
+
+__all__ = ["replica_reads", "replica_read_only", "get_replica_lag"]
+
+# site_config.json switch for this app's routing, on by default
+REPLICA_READS_CONFIG_KEY = "payroll_indonesia_replica_reads"
+
+# site_config.json maximum replica lag in seconds, -1 disables the check
+MAX_LAG_CONFIG_KEY = "payroll_indonesia_replica_max_lag"
+DEFAULT_MAX_LAG = 30
+
+# Seconds a measured lag is reused before the replica is asked again
+LAG_CHECK_INTERVAL = 10
+
+_lag_state = {"checked": 0.0, "lag": None}
+
+
+def _routing_enabled() -> bool:
+    conf = frappe.conf
+    if not conf.get("read_from_replica") or not conf.get("replica_host"):
+        return False
+    if not cint(conf.get(REPLICA_READS_CONFIG_KEY, 1)):
+        return False
+    flags = frappe.flags
+    return not (flags.get("in_migrate") or flags.get("in_install") or flags.get("in_test"))
+
+
+def _on_replica() -> bool:
+    local = frappe.local
+    replica = getattr(local, "replica_db", None)
+    return replica is not None and getattr(local, "db", None) is replica
+
+
+def get_replica_lag() -> Optional[float]:
+    """
+    Replication lag of the current connection in seconds
+
+    Must be called while connected to the replica. The lag is cached for
+    LAG_CHECK_INTERVAL seconds per process.
+
+    Returns:
+        float: Seconds behind the primary, None if unknown (not a replica or
+            the database user cannot read the replica status)
+    """
+    if time.monotonic() - _lag_state["checked"] < LAG_CHECK_INTERVAL:
+        return _lag_state["lag"]
+
+    lag = None
+    for statement in ("SHOW REPLICA STATUS", "SHOW SLAVE STATUS"):
+        try:
+            rows = frappe.db.sql(statement, as_dict=1)
+        except Exception:
+            continue
+        if rows:
+            value = rows[0].get("Seconds_Behind_Master", rows[0].get("Seconds_Behind_Source"))
+            lag = flt(value) if value is not None else None
+        break
+
+    _lag_state.update(checked=time.monotonic(), lag=lag)
+    return lag
+
+
+def _switch_to_replica() -> bool:
+    """Point frappe.db at the replica, connecting on first use per request."""
+    local = frappe.local
+    if getattr(local, "replica_db", None) is None:
+        return bool(frappe.connect_replica())
+
+    local.primary_db = local.db
+    local.db = local.replica_db
+    return True
+
+
+def _restore_primary() -> None:
+    local = frappe.local
+    if getattr(local, "primary_db", None) is not None:
+        local.db = local.primary_db
+
+
+@contextmanager
+def replica_reads(max_lag: Optional[float] = None) -> Iterator[bool]:
+    """
+    Run the enclosed read-only queries on the read replica when it is safe
+
+    Args:
+        max_lag: Maximum acceptable lag in seconds, defaults to the
+            "payroll_indonesia_replica_max_lag" site config
+
+    Yields:
+        bool: True if the block runs on the replica, False on the primary
+    """
+    if _on_replica():
+        # Nested block or a frappe.read_only endpoint, already routed
+        yield True
+        return
+
+    switched = False
+    if _routing_enabled() and not cint(getattr(frappe.db, "transaction_writes", 0)):
+        try:
+            switched = _switch_to_replica()
+        except Exception as e:
+            frappe.logger().warning(f"Read replica unavailable, using primary: {str(e)}")
+
+    if switched:
+        if max_lag is None:
+            max_lag = flt(frappe.conf.get(MAX_LAG_CONFIG_KEY, DEFAULT_MAX_LAG))
+        if max_lag >= 0:
+            lag = get_replica_lag()
+            if lag is None or lag > max_lag:
+                _restore_primary()
+                switched = False
+
+    try:
+        yield switched
+    finally:
+        if switched:
+            _restore_primary()
+
+
+def replica_read_only(fn: Callable) -> Callable:
+    """
+    Decorator running a read-only function inside replica_reads()
+
+    Args:
+        fn: Function that only reads from the database
+
+    Returns:
+        Callable: Wrapped function
+    """
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs) -> Any:
+        with replica_reads():
+            return fn(*args, **kwargs)
+
+    return wrapper
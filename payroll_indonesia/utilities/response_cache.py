@@ -0,0 +1,223 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025, PT. Innovasi Terbaik Bangsa and contributors
+# For license information, please see license.txt
+
+"""
+ETag response cache for read-only API endpoints.
+
+Each cached endpoint supplies a version function returning a cheap
+fingerprint of the documents it reads (usually their modified timestamps).
+The ETag is a hash of the endpoint, its arguments, the caller's permission
+scope, that fingerprint and a per-employee generation counter. Payloads are
+stored in Redis under the ETag, and a request carrying a matching
+If-None-Match header is answered with 304 Not Modified.
+
+The generation counter is bumped on salary slip cancel/amend and on
+Employee Tax Summary update, which covers changes written with
+update_modified=False that the timestamps alone would miss.
+"""
+
+import functools
+import hashlib
+import json
+from typing import Any, Callable, Dict, Optional
+
+import frappe
+from frappe.utils import cint, getdate
+
+from payroll_indonesia.constants import CACHE_MEDIUM
+
+__all__ = [
+    "cached_response",
+    "get_employee_generation",
+    "invalidate_employee_responses",
+    "invalidate_for_doc",
+]
+
+RESPONSE_KEY_PREFIX = "payroll_indonesia:response:"
+GENERATION_KEY = "payroll_indonesia:response_generation"
+
+
+def get_employee_generation(employee: Optional[str]) -> int:
+    """
+    Get the response cache generation of an employee
+
+    Args:
+        employee: Employee code
+
+    Returns:
+        int: Generation counter, 0 if never invalidated
+    """
+    if not employee:
+        return 0
+    return cint(frappe.cache().hget(GENERATION_KEY, employee))
+
+
+def invalidate_employee_responses(employee: Optional[str]) -> None:
+    """
+    Invalidate all cached responses that depend on an employee
+
+    Args:
+        employee: Employee code
+    """
+    if not employee:
+        return
+    frappe.cache().hset(GENERATION_KEY, employee, get_employee_generation(employee) + 1)
+
+
+def invalidate_for_doc(doc: Any, method: Optional[str] = None) -> None:
+    """
+    Document hook invalidating cached responses for the document's employee
+
+    Used on Salary Slip cancel and insert of an amended slip, and on
+    Employee Tax Summary update.
+    """
+    if method == "after_insert" and not doc.get("amended_from"):
+        return
+    invalidate_employee_responses(doc.get("employee"))
+
+
+def _permission_scope() -> str:
+    """Hash of the caller's roles and user permissions."""
+    user = frappe.session.user
+    scope = {"roles": sorted(frappe.get_roles(user))}
+    try:
+        from frappe.core.doctype.user_permission.user_permission import get_user_permissions
+
+        user_permissions = get_user_permissions(user) or {}
+        scope["user_permissions"] = {
+            doctype: sorted(str(perm.get("doc")) for perm in perms)
+            for doctype, perms in user_permissions.items()
+        }
+    except Exception:
+        # Fall back to a per-user scope when user permissions cannot be read
+        scope["user"] = user
+
+    return hashlib.md5(json.dumps(scope, sort_keys=True).encode()).hexdigest()
+
+
+def _request_etag() -> Optional[str]:
+    """Get the If-None-Match value of the current HTTP request, if any."""
+    if not getattr(frappe.local, "request", None):
+        return None
+    header = frappe.get_request_header("If-None-Match")
+    return header.strip().strip('"').replace("W/", "").strip('"') if header else None
+
+
+def _set_response_headers(etag: str, not_modified: bool = False) -> None:
+    """Attach caching headers to the outgoing HTTP response."""
+    if not getattr(frappe.local, "request", None):
+        return
+
+    headers = getattr(frappe.local, "response_headers", None)
+    if headers is not None:
+        headers.set("ETag", f'"{etag}"')
+        headers.set("Cache-Control", "private, no-cache")
+
+    if not_modified:
+        frappe.local.response.http_status_code = 304
+
+
+def cached_response(version: Callable[..., Any], ttl: int = CACHE_MEDIUM) -> Callable:
+    """
+    Decorate a read-only API function with an ETag response cache
+
+    Args:
+        version: Called with the endpoint's arguments, returns a
+            (fingerprint, employee) tuple describing the data it reads
+        ttl: Payload lifetime in Redis, in seconds
+
+    Returns:
+        Callable: Decorator
+    """
+
+    def decorator(func: Callable) -> Callable:
+        endpoint = f"{func.__module__}.{func.__name__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            try:
+                fingerprint, employee = version(*args, **kwargs)
+            except Exception:
+                # Version lookup failed, let the endpoint handle the request itself
+                return func(*args, **kwargs)
+
+            etag = hashlib.sha1(
+                json.dumps(
+                    [
+                        endpoint,
+                        [str(arg) for arg in args],
+                        {key: str(value) for key, value in sorted(kwargs.items())},
+                        _permission_scope(),
+                        str(fingerprint),
+                        get_employee_generation(employee),
+                    ]
+                ).encode()
+            ).hexdigest()
+
+            cache = frappe.cache()
+            cache_key = f"{RESPONSE_KEY_PREFIX}{etag}"
+
+            if _request_etag() == etag and cache.get_value(cache_key) is not None:
+                _set_response_headers(etag, not_modified=True)
+                return None
+
+            payload = cache.get_value(cache_key)
+            if payload is None:
+                payload = func(*args, **kwargs)
+                if not (isinstance(payload, dict) and payload.get("status") == "error"):
+                    cache.set_value(cache_key, payload, expires_in_sec=ttl)
+
+            _set_response_headers(etag)
+            return payload
+
+        return wrapper
+
+    return decorator
+
+
+def salary_slip_version(name: str, *args, **kwargs):
+    """Version of a single salary slip and its employee record."""
+    row = frappe.db.sql(
+        """
+        SELECT ss.employee, ss.modified, ss.docstatus, emp.modified
+        FROM `tabSalary Slip` ss
+        LEFT JOIN `tabEmployee` emp ON emp.name = ss.employee
+        WHERE ss.name = %s
+        """,
+        name,
+    )
+    if not row:
+        return None, None
+    employee, slip_modified, docstatus, employee_modified = row[0]
+    return (str(slip_modified), docstatus, str(employee_modified)), employee
+
+
+def employee_slips_version(employee: str, year: Optional[Any] = None, *args, **kwargs):
+    """Version of all salary slips of an employee, optionally within a year."""
+    conditions = "employee = %(employee)s"
+    values: Dict[str, Any] = {"employee": employee}
+    if year:
+        conditions += " AND start_date >= %(year_start)s AND end_date <= %(year_end)s"
+        values.update({"year_start": f"{cint(year)}-01-01", "year_end": f"{cint(year)}-12-31"})
+
+    row = frappe.db.sql(
+        f"""
+        SELECT COUNT(*), MAX(modified), SUM(docstatus)
+        FROM `tabSalary Slip`
+        WHERE {conditions}
+        """,
+        values,
+    )
+    employee_modified = frappe.db.get_value("Employee", employee, "modified")
+    return (tuple(str(value) for value in row[0]), str(employee_modified)), employee
+
+
+def tax_summary_version(employee: str, year: Optional[Any] = None, *args, **kwargs):
+    """Version of an employee's tax summary and salary slips for a year."""
+    year = cint(year) or getdate().year
+    summary_modified = frappe.db.get_value(
+        "Employee Tax Summary", {"employee": employee, "year": year}, "modified"
+    )
+    slips, _employee = employee_slips_version(employee, year)
+    return (str(summary_modified), slips, year), employee
@@ -0,0 +1,599 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025, PT. Innovasi Terbaik Bangsa and contributors
+# For license information, please see license.txt
+
+"""
+Set-based mass updates of salary structures and related records.
+
+Each update kind computes every required change with one query and applies
+it through batched UPDATE/INSERT statements, committing after each batch:
+
+- bpjs_rates: BPJS component amounts in draft active salary structures
+- tax_slab: income tax slab and tax calculation method of active structures
+- assignments: income tax slab of submitted assignments whose structure has
+  a PPh 21 component
+- component_accounts: Salary Component Account rows for a company
+
+Plans are diffs against the current database state, so a job interrupted
+half-way is resumed simply by running it again: already applied batches no
+longer show up in the plan. Long updates run as a registered background job
+that publishes its progress to Redis and the desk.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional
+
+import frappe
+from frappe.utils import cint, flt, now
+
+from payroll_indonesia.payroll_indonesia.utils import debug_log
+
+__all__ = [
+    "plan_bpjs_rate_updates",
+    "apply_bpjs_rate_updates",
+    "apply_tax_slab_updates",
+    "apply_assignment_updates",
+    "apply_component_account_updates",
+    "enqueue_structure_mass_update",
+    "run_structure_mass_update",
+    "get_structure_update_status",
+]
+
+# Rows written per statement and per commit
+BATCH_SIZE = 500
+
+# Redis hash of job id -> progress state
+STATUS_KEY = "payroll_indonesia:structure_update_status"
+
+RUN_METHOD = "payroll_indonesia.utilities.structure_mass_update.run_structure_mass_update"
+
+UPDATE_KINDS = ("bpjs_rates", "tax_slab", "assignments", "component_accounts")
+
+
+def _batches(items: List[Any], size: int = BATCH_SIZE) -> Iterable[List[Any]]:
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
+def _update_by_name(
+    doctype: str,
+    rows: List[Dict[str, Any]],
+    fields: Iterable[str],
+    update_modified: bool = True,
+) -> None:
+    """
+    Update several fields of many rows with one UPDATE ... CASE statement
+
+    Args:
+        doctype: DocType of the rows
+        rows: Dicts with name and the new field values
+        fields: Fields to update
+        update_modified: Also set modified and modified_by
+    """
+    set_parts, values = [], []
+    for field in fields:
+        set_parts.append(f"`{field}` = CASE name {' '.join(['WHEN %s THEN %s'] * len(rows))} END")
+        for row in rows:
+            values.extend([row["name"], row[field]])
+
+    if update_modified:
+        set_parts.append("modified = %s, modified_by = %s")
+        values.extend([now(), frappe.session.user])
+
+    frappe.db.sql(
+        f"""
+        UPDATE `tab{doctype}`
+        SET {', '.join(set_parts)}
+        WHERE name IN %s
+        """,
+        tuple(values) + (tuple(row["name"] for row in rows),),
+    )
+
+
+def _touch_parents(doctype: str, names: Iterable[str]) -> None:
+    """Bump modified of parent documents whose child rows were updated."""
+    names = tuple(set(names))
+    if names:
+        frappe.db.sql(
+            f"UPDATE `tab{doctype}` SET modified = %s, modified_by = %s WHERE name IN %s",
+            (now(), frappe.session.user, names),
+        )
+
+
+def _clear_document_cache(doctype: str, names: Iterable[str]) -> None:
+    """Drop cached copies of documents changed by raw SQL."""
+    for name in set(names):
+        frappe.clear_document_cache(doctype, name)
+
+
+def _apply_in_batches(
+    rows: List[Dict[str, Any]],
+    apply,
+    progress: Optional[Dict[str, Any]] = None,
+    commit: bool = True,
+    touched=None,
+) -> int:
+    """
+    Apply rows batch by batch, committing and reporting progress after each batch
+
+    touched(batch) returns the DocType and names of the documents a batch
+    changed; their document cache is cleared once the batch is committed, so
+    get_cached_doc and get_cached_value readers see the new values.
+    """
+    applied = 0
+    for batch in _batches(rows):
+        apply(batch)
+        if commit:
+            frappe.db.commit()
+        if touched:
+            _clear_document_cache(*touched(batch))
+        applied += len(batch)
+        if progress is not None:
+            progress["done"] = progress.get("done", 0) + len(batch)
+            _publish_progress(progress)
+    return applied
+
+
+# BPJS component amounts
+
+
+def plan_bpjs_rate_updates(rates: Dict[str, float]) -> Dict[str, Any]:
+    """
+    Compute BPJS component amount changes for all active salary structures
+
+    Args:
+        rates: Salary component -> amount (percentage) to set
+
+    Returns:
+        dict: updates (Salary Detail rows with name, parent and amount),
+            missing (structure -> components it lacks) and submitted
+            (submitted structures that are left for manual amendment)
+    """
+    plan = {"updates": [], "missing": {}, "submitted": []}
+    rates = {component: flt(rate) for component, rate in rates.items() if component}
+    if not rates:
+        return plan
+
+    rows = frappe.db.sql(
+        """
+        SELECT ss.name AS structure, ss.docstatus, sd.name, sd.salary_component,
+            sd.amount, sd.amount_based_on_formula, sd.formula
+        FROM `tabSalary Structure` ss
+        LEFT JOIN `tabSalary Detail` sd
+            ON sd.parent = ss.name
+            AND sd.parenttype = 'Salary Structure'
+            AND sd.salary_component IN %(components)s
+        WHERE ss.is_active = 'Yes' AND ss.docstatus < 2
+        """,
+        {"components": tuple(rates)},
+        as_dict=1,
+    )
+
+    found = {}
+    for row in rows:
+        if row.docstatus == 1:
+            if row.structure not in plan["submitted"]:
+                plan["submitted"].append(row.structure)
+            continue
+
+        components = found.setdefault(row.structure, set())
+        if not row.name or row.salary_component in components:
+            continue
+        components.add(row.salary_component)
+
+        if cint(row.amount_based_on_formula) and row.formula:
+            continue
+        if flt(row.amount) != rates[row.salary_component]:
+            plan["updates"].append(
+                {
+                    "name": row.name,
+                    "parent": row.structure,
+                    "amount": rates[row.salary_component],
+                }
+            )
+
+    for structure, components in found.items():
+        missing = sorted(set(rates) - components)
+        if missing:
+            plan["missing"][structure] = missing
+
+    return plan
+
+
+def apply_bpjs_rate_updates(
+    rates: Dict[str, float], progress: Optional[Dict[str, Any]] = None
+) -> Dict[str, int]:
+    """
+    Set BPJS component amounts in all draft active salary structures
+
+    Args:
+        rates: Salary component -> amount (percentage) to set
+        progress: Progress state updated while applying (optional)
+
+    Returns:
+        dict: Counts of updated rows, structures, missing and submitted
+    """
+    plan = plan_bpjs_rate_updates(rates)
+    if progress is not None:
+        progress["total"] = progress.get("total", 0) + len(plan["updates"])
+
+    def apply(batch):
+        _update_by_name("Salary Detail", batch, ["amount"])
+        _touch_parents("Salary Structure", (row["parent"] for row in batch))
+
+    updated = _apply_in_batches(
+        plan["updates"],
+        apply,
+        progress,
+        touched=lambda batch: ("Salary Structure", (row["parent"] for row in batch)),
+    )
+
+    for structure, missing in plan["missing"].items():
+        debug_log(
+            f"Salary Structure {structure} missing BPJS components: {', '.join(missing)}",
+            "BPJS Settings",
+        )
+
+    return {
+        "rows_updated": updated,
+        "structures_updated": len({row["parent"] for row in plan["updates"]}),
+        "missing_components": len(plan["missing"]),
+        "submitted_skipped": len(plan["submitted"]),
+    }
+
+
+# Income tax slab on structures and assignments
+
+
+def apply_tax_slab_updates(tax_slab: str, progress: Optional[Dict[str, Any]] = None) -> int:
+    """
+    Set the income tax slab and manual tax calculation on all active structures
+
+    Args:
+        tax_slab: Income Tax Slab name
+        progress: Progress state updated while applying (optional)
+
+    Returns:
+        int: Number of updated salary structures
+    """
+    fields = ["tax_calculation_method"]
+    if frappe.db.has_column("Salary Structure", "income_tax_slab"):
+        fields.append("income_tax_slab")
+
+    rows = frappe.db.sql(
+        f"""
+        SELECT name
+        FROM `tabSalary Structure`
+        WHERE is_active = 'Yes' AND docstatus < 2
+            AND ({' OR '.join(f"IFNULL(`{field}`, '') != %s" for field in fields)})
+        """,
+        tuple("Manual" if field == "tax_calculation_method" else tax_slab for field in fields),
+        as_dict=1,
+    )
+    values = {"tax_calculation_method": "Manual", "income_tax_slab": tax_slab}
+    rows = [dict(row, **{field: values[field] for field in fields}) for row in rows]
+    if progress is not None:
+        progress["total"] = progress.get("total", 0) + len(rows)
+
+    # Keep modified untouched, as the previous per-document update did; the
+    # structures may be submitted
+    return _apply_in_batches(
+        rows,
+        lambda batch: _update_by_name("Salary Structure", batch, fields, update_modified=False),
+        progress,
+        touched=lambda batch: ("Salary Structure", (row["name"] for row in batch)),
+    )
+
+
+def apply_assignment_updates(tax_slab: str, progress: Optional[Dict[str, Any]] = None) -> int:
+    """
+    Set the income tax slab on submitted assignments that have none
+
+    Only assignments whose salary structure has a PPh 21 component are updated.
+
+    Args:
+        tax_slab: Income Tax Slab name
+        progress: Progress state updated while applying (optional)
+
+    Returns:
+        int: Number of updated salary structure assignments
+    """
+    names = frappe.db.sql_list("""
+        SELECT ssa.name
+        FROM `tabSalary Structure Assignment` ssa
+        WHERE ssa.docstatus = 1
+            AND IFNULL(ssa.income_tax_slab, '') = ''
+            AND EXISTS (
+                SELECT 1 FROM `tabSalary Detail` sd
+                WHERE sd.parent = ssa.salary_structure
+                    AND sd.parenttype = 'Salary Structure'
+                    AND sd.salary_component = 'PPh 21'
+            )
+        """)
+    if progress is not None:
+        progress["total"] = progress.get("total", 0) + len(names)
+
+    def apply(batch):
+        # Keep modified untouched, as the previous per-document update did
+        frappe.db.sql(
+            """
+            UPDATE `tabSalary Structure Assignment`
+            SET income_tax_slab = %s
+            WHERE name IN %s
+            """,
+            (tax_slab, tuple(batch)),
+        )
+
+    return _apply_in_batches(
+        names, apply, progress, touched=lambda batch: ("Salary Structure Assignment", batch)
+    )
+
+
+# Salary Component Account rows
+
+
+def _component_account_field() -> str:
+    """Account column of Salary Component Account (differs between HRMS versions)."""
+    if frappe.db.has_column("Salary Component Account", "default_account"):
+        return "default_account"
+    return "account"
+
+
+def apply_component_account_updates(
+    company: str,
+    components: Optional[Iterable[str]] = None,
+    progress: Optional[Dict[str, Any]] = None,
+    commit: bool = True,
+) -> int:
+    """
+    Point Salary Component Account rows of a company to the mapped GL accounts
+
+    Args:
+        company: Company name
+        components: Salary components to update, all existing components if omitted
+        progress: Progress state updated while applying (optional)
+        commit: Commit after each batch, disable inside document hooks
+
+    Returns:
+        int: Number of salary components whose account row was changed or added
+    """
+    from payroll_indonesia.config.gl_account_mapper import get_gl_accounts_for_company
+
+    if not company or company == "%":
+        return 0
+
+    if components is None:
+        components = frappe.get_all("Salary Component", pluck="name")
+    elif not components:
+        return 0
+    else:
+        components = frappe.get_all(
+            "Salary Component", filters={"name": ["in", list(set(components))]}, pluck="name"
+        )
+    if not components:
+        return 0
+
+    account_field = _component_account_field()
+    desired = get_gl_accounts_for_company(company, components)
+
+    existing = frappe.db.sql(
+        f"""
+        SELECT name, parent, `{account_field}` AS account
+        FROM `tabSalary Component Account`
+        WHERE parenttype = 'Salary Component' AND company = %s AND parent IN %s
+        """,
+        (company, tuple(components)),
+        as_dict=1,
+    )
+    max_idx = dict(
+        frappe.db.sql(
+            """
+            SELECT parent, MAX(idx)
+            FROM `tabSalary Component Account`
+            WHERE parenttype = 'Salary Component' AND parent IN %s
+            GROUP BY parent
+            """,
+            (tuple(components),),
+        )
+    )
+
+    rows_by_component = {row.parent: row for row in existing}
+    updates, inserts = [], []
+    for component in components:
+        account = desired.get(component)
+        if not account:
+            continue
+        row = rows_by_component.get(component)
+        if row is None:
+            inserts.append((component, account))
+        elif row.account != account:
+            updates.append({"name": row.name, "parent": component, account_field: account})
+
+    if progress is not None:
+        progress["total"] = progress.get("total", 0) + len(updates) + len(inserts)
+
+    def apply_updates(batch):
+        _update_by_name("Salary Component Account", batch, [account_field])
+        _touch_parents("Salary Component", (row["parent"] for row in batch))
+
+    def apply_inserts(batch):
+        timestamp, user = now(), frappe.session.user
+        frappe.db.bulk_insert(
+            "Salary Component Account",
+            fields=[
+                "name",
+                "creation",
+                "modified",
+                "owner",
+                "modified_by",
+                "docstatus",
+                "parent",
+                "parentfield",
+                "parenttype",
+                "idx",
+                "company",
+                account_field,
+            ],
+            values=[
+                (
+                    frappe.generate_hash(length=10),
+                    timestamp,
+                    timestamp,
+                    user,
+                    user,
+                    0,
+                    component,
+                    "accounts",
+                    "Salary Component",
+                    cint(max_idx.get(component)) + 1,
+                    company,
+                    account,
+                )
+                for component, account in batch
+            ],
+        )
+        _touch_parents("Salary Component", (component for component, _account in batch))
+
+    changed = _apply_in_batches(
+        updates,
+        apply_updates,
+        progress,
+        commit,
+        touched=lambda batch: ("Salary Component", (row["parent"] for row in batch)),
+    )
+    changed += _apply_in_batches(
+        inserts,
+        apply_inserts,
+        progress,
+        commit,
+        touched=lambda batch: ("Salary Component", (component for component, _account in batch)),
+    )
+    return changed
+
+
+# Background job
+
+
+def _publish_progress(progress: Dict[str, Any]) -> None:
+    """Store job progress in Redis and push it to the desk."""
+    frappe.cache().hset(STATUS_KEY, progress["job_id"], progress)
+    total = progress.get("total") or 0
+    if total:
+        frappe.publish_progress(
+            min(100, progress.get("done", 0) * 100 / total),
+            title="Salary Structure Update",
+            description=f"{progress.get('done', 0)} of {total} rows",
+        )
+
+
+def enqueue_structure_mass_update(
+    kinds: Iterable[str],
+    bpjs_rates: Optional[Dict[str, float]] = None,
+    tax_slab: Optional[str] = None,
+    company: Optional[str] = None,
+    components: Optional[List[str]] = None,
+    now: bool = False,
+) -> Dict[str, Any]:
+    """
+    Run a mass update in the background, deduplicated per update kind
+
+    Args:
+        kinds: Update kinds to run, see UPDATE_KINDS
+        bpjs_rates: Component -> amount, for bpjs_rates
+        tax_slab: Income Tax Slab name, for tax_slab and assignments
+        company: Company name, for component_accounts
+        components: Salary components, for component_accounts (optional)
+        now: Run the update immediately in this process (optional)
+
+    Returns:
+        dict: job_id and whether it was queued (False if already running)
+    """
+    from payroll_indonesia.utilities.job_registry import enqueue_registered
+
+    kinds = [kind for kind in UPDATE_KINDS if kind in set(kinds)]
+    job_id = f"structure_update:{'+'.join(kinds)}:{company or ''}"
+    queued = enqueue_registered(
+        RUN_METHOD,
+        job_name=job_id,
+        queue="long",
+        timeout=3600,
+        enqueue_after_commit=True,
+        now=now,
+        # Not job_id: frappe.enqueue consumes it instead of passing it on
+        update_id=job_id,
+        kinds=kinds,
+        bpjs_rates=bpjs_rates,
+        tax_slab=tax_slab,
+        company=company,
+        components=components,
+    )
+    if queued and not now:
+        frappe.cache().hset(
+            STATUS_KEY, job_id, {"job_id": job_id, "status": "queued", "kinds": kinds}
+        )
+    return {"job_id": job_id, "queued": queued}
+
+
+def run_structure_mass_update(
+    update_id: str,
+    kinds: List[str],
+    bpjs_rates: Optional[Dict[str, float]] = None,
+    tax_slab: Optional[str] = None,
+    company: Optional[str] = None,
+    components: Optional[List[str]] = None,
+) -> Dict[str, Any]:
+    """
+    Background job applying the requested mass updates
+
+    Args:
+        update_id: Job ID used for progress reporting
+        kinds: Update kinds to run
+        bpjs_rates: Component -> amount, for bpjs_rates
+        tax_slab: Income Tax Slab name, for tax_slab and assignments
+        company: Company name, for component_accounts
+        components: Salary components, for component_accounts (optional)
+
+    Returns:
+        dict: Final progress state with per-kind results
+    """
+    progress = {"job_id": update_id, "status": "running", "kinds": kinds, "done": 0, "total": 0}
+    progress["results"] = results = {}
+    _publish_progress(progress)
+
+    try:
+        if "bpjs_rates" in kinds and bpjs_rates:
+            results["bpjs_rates"] = apply_bpjs_rate_updates(bpjs_rates, progress)
+        if "tax_slab" in kinds and tax_slab:
+            results["tax_slab"] = apply_tax_slab_updates(tax_slab, progress)
+        if "assignments" in kinds and tax_slab:
+            results["assignments"] = apply_assignment_updates(tax_slab, progress)
+        if "component_accounts" in kinds and company:
+            results["component_accounts"] = apply_component_account_updates(
+                company, components, progress
+            )
+        progress["status"] = "finished"
+    except Exception as e:
+        frappe.db.rollback()
+        progress.update(status="failed", error=str(e))
+        frappe.log_error(
+            f"Error in salary structure mass update {update_id}: {str(e)}\n\n"
+            f"Traceback: {frappe.get_traceback()}",
+            "Salary Structure Update Error",
+        )
+    finally:
+        _publish_progress(progress)
+
+    return progress
+
+
+@frappe.whitelist()
+def get_structure_update_status(job_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Get the progress of a salary structure mass update
+
+    Args:
+        job_id: Job ID returned by enqueue_structure_mass_update
+
+    Returns:
+        dict: Progress state, or None if unknown
+    """
+    return frappe.cache().hget(STATUS_KEY, job_id)
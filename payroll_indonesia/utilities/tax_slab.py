@@ -178,10 +178,13 @@ def update_salary_structures():
     Update all Salary Structures to bypass Income Tax Slab validation
     with improved error handling for missing salary details.
 
+    Structures that still need the default slab are updated set-based in
+    batches, see structure_mass_update.apply_tax_slab_updates.
+
     Returns:
         int: Number of successfully updated Salary Structures.
     """
-    success_count = 0
+    from payroll_indonesia.utilities.structure_mass_update import apply_tax_slab_updates
 
     try:
         # Get default tax slab
@@ -190,41 +193,7 @@ def update_salary_structures():
             debug_log("Failed to get default tax slab", "Tax Slab Error")
             return 0
 
-        # Get active salary structures
-        structures = frappe.get_all(
-            "Salary Structure", filters={"is_active": 1}, fields=["name", "docstatus"]
-        )
-
-        debug_log(f"Found {len(structures)} active salary structures to update", "Tax Slab")
-
-        # Update each structure
-        for structure in structures:
-            try:
-                # Only update if it's not submitted
-                if structure.docstatus == 0:
-                    # Update the structure
-                    doc = frappe.get_doc("Salary Structure", structure.name)
-                    doc.income_tax_slab = default_tax_slab
-                    doc.tax_calculation_method = "Manual"
-                    doc.flags.ignore_validate = True  # Skip validation
-                    doc.save(ignore_permissions=True)
-                    success_count += 1
-                else:
-                    # For submitted documents, use direct DB update
-                    frappe.db.set_value(
-                        "Salary Structure",
-                        structure.name,
-                        {"income_tax_slab": default_tax_slab, "tax_calculation_method": "Manual"},
-                        update_modified=False,
-                    )
-                    success_count += 1
-            except Exception as e:
-                frappe.log_error(
-                    f"Error updating structure {structure.name}: {str(e)}",
-                    "Salary Structure Update Error",
-                )
-
-        frappe.db.commit()
+        success_count = apply_tax_slab_updates(default_tax_slab)
         debug_log(f"Updated {success_count} salary structures", "Tax Slab")
         return success_count
 
@@ -239,10 +208,13 @@ def update_existing_assignments():
     Update existing Salary Structure Assignments with default Income Tax Slab
     to bypass validation errors.
 
+    Only assignments whose structure has a PPh 21 component are updated,
+    set-based in batches, see structure_mass_update.apply_assignment_updates.
+
     Returns:
         int: Number of successfully updated Salary Structure Assignments.
     """
-    success_count = 0
+    from payroll_indonesia.utilities.structure_mass_update import apply_assignment_updates
 
     try:
         # Get default tax slab
@@ -251,64 +223,7 @@ def update_existing_assignments():
             debug_log("Failed to get default tax slab", "Tax Slab Error")
             return 0
 
-        # Get assignments needing update
-        assignments = frappe.get_all(
-            "Salary Structure Assignment",
-            filters=[["income_tax_slab", "in", ["", None]], ["docstatus", "=", 1]],
-            fields=["name", "salary_structure"],
-        )
-
-        debug_log(f"Found {len(assignments)} salary structure assignments to update", "Tax Slab")
-
-        # Find structures with PPh 21 component - using parameterized query
-        tax_structures = []
-        try:
-            # Use parameterized query for SQL safety
-            query = """
-                SELECT DISTINCT parent
-                FROM `tabSalary Detail`
-                WHERE salary_component = %s
-                AND parenttype = %s
-            """
-            structures_with_tax = frappe.db.sql(query, ["PPh 21", "Salary Structure"], as_dict=1)
-
-            if structures_with_tax:
-                tax_structures = [s.parent for s in structures_with_tax]
-        except Exception as e:
-            frappe.log_error(
-                f"Error finding salary structures with PPh 21: {str(e)}",
-                "Tax Structure Query Error",
-            )
-
-        # Process assignments
-        batch_size = 50
-        for i in range(0, len(assignments), batch_size):
-            batch = assignments[i : i + batch_size]
-            updated_in_batch = 0
-
-            for assignment in batch:
-                try:
-                    # Only update if the structure has PPh 21 component
-                    if assignment.salary_structure in tax_structures:
-                        frappe.db.set_value(
-                            "Salary Structure Assignment",
-                            assignment.name,
-                            "income_tax_slab",
-                            default_tax_slab,
-                            update_modified=False,
-                        )
-                        updated_in_batch += 1
-                        success_count += 1
-                except Exception as e:
-                    frappe.log_error(
-                        f"Error updating assignment {assignment.name}: {str(e)}",
-                        "Assignment Update Error",
-                    )
-                    continue
-
-            # Commit after each batch
-            frappe.db.commit()
-
+        success_count = apply_assignment_updates(default_tax_slab)
         debug_log(f"Updated {success_count} salary structure assignments", "Tax Slab")
         return success_count
 
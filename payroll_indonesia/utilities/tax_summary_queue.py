@@ -0,0 +1,324 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025, PT. Innovasi Terbaik Bangsa and contributors
+# For license information, please see license.txt
+
+"""
+Coalescing queue for Employee Tax Summary updates.
+
+Salary slip submit and cancel no longer enqueue one background job per slip.
+Instead each slip is recorded in a Redis hash keyed by slip name, holding the
+pending action (update or revert), employee and year. A later action for the
+same slip replaces the earlier one, so submit followed by cancel collapses
+into a single revert.
+
+Entries are only written once the submitting or cancelling transaction
+commits, so a drain never sees a slip whose new docstatus is not visible
+yet. A single drain job is enqueued for the first pending slip. The drain groups pending slips by (employee, year),
+applies all of them to the summary in memory and saves each summary once.
+A scheduled drain picks up anything left behind by a failed or lost job.
+
+Pending entries are taken off the hash atomically by a Lua script. An
+action queued while a drain runs therefore always stays queued for the next
+drain. An entry whose slip does not have the expected docstatus yet is put
+back and retried up to MAX_PENDING_ATTEMPTS times before it is dropped.
+"""
+
+import pickle
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+import frappe
+from frappe.utils import cint, getdate
+
+from payroll_indonesia.utilities.job_registry import claim_job, release_job
+from payroll_indonesia.utilities.salary_slip_validator import debug_log
+
+__all__ = [
+    "queue_tax_summary_update",
+    "queue_tax_summary_revert",
+    "drain_tax_summary_queue",
+    "get_pending_count",
+]
+
+# Redis hash of pending slips, and job registry names for the drain flags
+PENDING_KEY = "payroll_indonesia:tax_summary_pending"
+SCHEDULED_KEY = "tax_summary_drain_scheduled"
+LOCK_KEY = "tax_summary_drain_lock"
+
+# Maximum slips handled by one drain run; the rest go to a follow-up job
+DRAIN_BATCH_SIZE = 500
+
+# Lock and schedule flag lifetime in seconds, guards against crashed workers
+DRAIN_LOCK_TIMEOUT = 1800
+SCHEDULE_FLAG_TIMEOUT = 600
+
+# Drains an entry may wait for its slip's docstatus before it is dropped
+MAX_PENDING_ATTEMPTS = 5
+
+DRAIN_METHOD = "payroll_indonesia.utilities.tax_summary_queue.drain_tax_summary_queue"
+
+ACTION_UPDATE = "update"
+ACTION_REVERT = "revert"
+
+# Reads and deletes up to ARGV[1] entries of the pending hash in one step
+TAKE_PENDING_SCRIPT = """
+local entries = redis.call('HGETALL', KEYS[1])
+local taken = {}
+for i = 1, math.min(#entries, tonumber(ARGV[1]) * 2), 2 do
+    redis.call('HDEL', KEYS[1], entries[i])
+    taken[#taken + 1] = entries[i]
+    taken[#taken + 1] = entries[i + 1]
+end
+return taken
+"""
+
+
+def _queue(doc: Any, action: str) -> bool:
+    """Record a pending action for a salary slip and schedule a drain."""
+    end_date = getattr(doc, "end_date", None)
+    if not end_date or not getattr(doc, "employee", None):
+        return False
+
+    slip = doc.name
+    entry = {
+        "action": action,
+        "employee": doc.employee,
+        "year": getdate(end_date).year,
+        "month": getdate(doc.start_date).month if doc.get("start_date") else None,
+    }
+
+    def record():
+        frappe.cache().hset(PENDING_KEY, slip, entry)
+        _schedule_drain(now=True)
+
+    # Only queue once the slip's docstatus is committed and visible to a drain
+    frappe.db.after_commit.add(record)
+    return True
+
+
+def _schedule_drain(now: bool = False) -> None:
+    """Enqueue one drain job unless one is already waiting to run."""
+    if not claim_job(SCHEDULED_KEY, SCHEDULE_FLAG_TIMEOUT):
+        return
+
+    frappe.enqueue(
+        method=DRAIN_METHOD,
+        queue="long",
+        timeout=3600,
+        job_name="tax_summary_queue_drain",
+        enqueue_after_commit=not now,
+    )
+
+
+def queue_tax_summary_update(doc: Any) -> bool:
+    """
+    Queue a tax summary update for a submitted salary slip
+
+    Args:
+        doc: Salary Slip document
+
+    Returns:
+        bool: True if the slip was queued
+    """
+    if getattr(doc, "docstatus", None) != 1:
+        return False
+    return _queue(doc, ACTION_UPDATE)
+
+
+def queue_tax_summary_revert(doc: Any) -> bool:
+    """
+    Queue a tax summary reversion for a cancelled salary slip
+
+    Args:
+        doc: Salary Slip document
+
+    Returns:
+        bool: True if the slip was queued
+    """
+    if getattr(doc, "docstatus", None) != 2:
+        return False
+    return _queue(doc, ACTION_REVERT)
+
+
+def get_pending_count() -> int:
+    """
+    Get the number of salary slips waiting for a tax summary update
+
+    Returns:
+        int: Pending slip count
+    """
+    cache = frappe.cache()
+    return cint(cache.hlen(cache.make_key(PENDING_KEY)))
+
+
+def _take_pending(limit: int) -> Dict[str, Dict[str, Any]]:
+    """Atomically remove up to limit pending entries from the queue and return them."""
+    cache = frappe.cache()
+    values = cache.eval(TAKE_PENDING_SCRIPT, 1, cache.make_key(PENDING_KEY), limit) or []
+    return {
+        frappe.safe_decode(values[i]): pickle.loads(values[i + 1]) for i in range(0, len(values), 2)
+    }
+
+
+def _requeue(entries: Dict[str, Dict[str, Any]]) -> None:
+    """Put entries back unless a newer action was queued meanwhile."""
+    cache = frappe.cache()
+    key = cache.make_key(PENDING_KEY)
+    for slip, entry in entries.items():
+        cache.hsetnx(key, slip, pickle.dumps(entry))
+
+
+def _retry_later(entries: List[Tuple[str, Dict[str, Any]]]) -> None:
+    """Put back entries whose slip is not in the expected state yet."""
+    retry = {}
+    for slip, entry in entries:
+        attempts = cint(entry.get("attempts")) + 1
+        if attempts > MAX_PENDING_ATTEMPTS:
+            debug_log(
+                f"Dropping pending tax summary {entry['action']} for {slip} "
+                f"after {MAX_PENDING_ATTEMPTS} attempts, docstatus does not match"
+            )
+            continue
+        retry[slip] = dict(entry, attempts=attempts)
+    _requeue(retry)
+
+
+def _load_summaries(groups: Dict[Tuple[str, int], Any]) -> Dict[Tuple[str, int], str]:
+    """Find existing summary names for all (employee, year) pairs in one query."""
+    employees = list({employee for employee, _year in groups})
+    years = list({year for _employee, year in groups})
+
+    rows = frappe.get_all(
+        "Employee Tax Summary",
+        filters={"employee": ["in", employees], "year": ["in", years]},
+        fields=["name", "employee", "year"],
+    )
+    return {(row.employee, cint(row.year)): row.name for row in rows}
+
+
+def _apply_group(
+    employee: str, year: int, entries: List[Tuple[str, Dict[str, Any]]], summary_name: Optional[str]
+) -> List[Tuple[str, Dict[str, Any]]]:
+    """
+    Apply all pending slips of one employee and year and save once
+
+    Returns:
+        list: Entries whose slip does not have the expected docstatus yet
+    """
+    from payroll_indonesia.payroll_indonesia.doctype.employee_tax_summary.employee_tax_summary import (
+        _create_new_tax_summary,
+    )
+
+    docstatus = dict(
+        frappe.get_all(
+            "Salary Slip",
+            filters={"name": ["in", [slip for slip, _entry in entries]]},
+            fields=["name", "docstatus"],
+            as_list=True,
+        )
+    )
+
+    expected = {ACTION_UPDATE: 1, ACTION_REVERT: 2}
+    deferred = [
+        (slip, entry) for slip, entry in entries if docstatus.get(slip) != expected[entry["action"]]
+    ]
+    updates = [
+        slip
+        for slip, entry in entries
+        if entry["action"] == ACTION_UPDATE and docstatus.get(slip) == 1
+    ]
+    reverts = [
+        (slip, entry)
+        for slip, entry in entries
+        if entry["action"] == ACTION_REVERT and docstatus.get(slip) == 2
+    ]
+    if not updates and not reverts:
+        return deferred
+
+    if summary_name:
+        summary = frappe.get_doc("Employee Tax Summary", summary_name)
+    elif updates:
+        summary = _create_new_tax_summary(employee, year)
+    else:
+        debug_log(f"No Employee Tax Summary to revert for employee={employee}, year={year}")
+        return deferred
+
+    if not summary:
+        raise frappe.ValidationError(f"Could not create tax summary for {employee}, {year}")
+
+    changed = False
+    for slip, entry in reverts:
+        if not entry.get("month"):
+            continue
+        changed = summary.reset_monthly_data(entry["month"], slip) or changed
+
+    for slip in updates:
+        summary.add_monthly_data(frappe.get_doc("Salary Slip", slip), save=False)
+        changed = True
+
+    if changed:
+        summary.calculate_ytd_from_monthly()
+        summary._save_with_error_handling()
+
+    return deferred
+
+
+def drain_tax_summary_queue(limit: int = DRAIN_BATCH_SIZE) -> Dict[str, Any]:
+    """
+    Apply pending salary slip changes to Employee Tax Summary in bulk
+
+    Args:
+        limit: Maximum number of slips to process in this run
+
+    Returns:
+        dict: Counts of processed slips, saved summaries, failures and slips
+            deferred because their docstatus was not committed yet
+    """
+    # Allow the next submit to schedule a fresh drain for later arrivals
+    release_job(SCHEDULED_KEY)
+
+    if not claim_job(LOCK_KEY, DRAIN_LOCK_TIMEOUT):
+        return {"status": "skipped", "message": "Drain already running"}
+
+    result = {"status": "success", "processed": 0, "summaries": 0, "failed": 0, "deferred": 0}
+    try:
+        pending = _take_pending(cint(limit) or DRAIN_BATCH_SIZE)
+        if not pending:
+            return result
+
+        groups = defaultdict(list)
+        for slip, entry in pending.items():
+            groups[(entry["employee"], cint(entry["year"]))].append((slip, entry))
+
+        summaries = _load_summaries(groups)
+
+        for (employee, year), entries in groups.items():
+            try:
+                deferred = _apply_group(employee, year, entries, summaries.get((employee, year)))
+                frappe.db.commit()
+                if deferred:
+                    _retry_later(deferred)
+                    result["deferred"] += len(deferred)
+                if len(deferred) < len(entries):
+                    result["summaries"] += 1
+                result["processed"] += len(entries) - len(deferred)
+            except Exception as e:
+                frappe.db.rollback()
+                result["failed"] += len(entries)
+                frappe.log_error(
+                    f"Error updating Employee Tax Summary for {employee}, {year} "
+                    f"from {len(entries)} salary slips: {str(e)}\n\n"
+                    f"Traceback: {frappe.get_traceback()}",
+                    "Employee Tax Summary Queue Error",
+                )
+                # Retry on the next scheduled drain
+                _requeue(dict(entries))
+
+    finally:
+        release_job(LOCK_KEY)
+
+    # More work than fits in one run, continue in a follow-up job
+    if get_pending_count() > result["failed"] + result["deferred"]:
+        _schedule_drain(now=True)
+
+    return result